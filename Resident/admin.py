@@ -5,7 +5,7 @@ from .models import Resident
 class ResidentAdmin(admin.ModelAdmin):
     list_display = ('resident_id', 'person', 'village__village',  'added_by', 'status', 'created_at', 'updated_at')
     search_fields = ('person__first_name', 'person__last_name', 'village__village', 'village__cell', 'village__sector')
-    list_filter = ('has_account', 'is_deleted', 'village__province', 'village__district', 'village__sector')
+    list_filter = ('has_account', 'is_deleted', 'village__province_ref', 'village__district_ref', 'village__sector_ref')
     ordering = ('village__province', 'village__district', 'village__sector', 'person__first_name')
 
     actions = ['soft_delete_residents', 'restore_residents']
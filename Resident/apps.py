@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ResidentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Resident'
+
+    def ready(self):
+        import Resident.signal
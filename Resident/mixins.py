@@ -3,7 +3,7 @@ from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
 from drf_spectacular.utils import extend_schema
 from .tasks import send_new_resident_email
 from account.models import User, Person
-from .utils import get_resident_location
+from .utils import get_user_context
 
 class VillageRolePermissionMixin:
     """
@@ -25,10 +25,10 @@ class VillageRolePermissionMixin:
         if user.role == 'admin':
             return qs
 
-        village = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if user.role == 'leader':
-            return qs.filter(village=village) if village else qs.none()
+            return qs.filter(village_id=village_id) if village_id else qs.none()
 
         if user.role == 'resident':
             return qs.filter(added_by=user)
@@ -94,12 +94,12 @@ class VillageRolePermissionMixin:
 
     def perform_destroy(self, instance):
         user = self.request.user
-        Village = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if user.role == 'resident' and instance.added_by != user:
             raise PermissionDenied("You can only delete your own content.")
 
-        if user.role == 'leader' and instance.Village != Village:
+        if user.role == 'leader' and instance.village_id != village_id:
             raise PermissionDenied("You cannot delete content from another village.")
 
         # Admin can delete anything
@@ -1,7 +1,7 @@
 # account/permissions.py
 
 from rest_framework import permissions
-from .utils import get_resident_location
+from .utils import get_user_context
 
 class IsInResidentVillage(permissions.BasePermission):
     """
@@ -9,7 +9,7 @@ class IsInResidentVillage(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        Village = get_resident_location(request.user)
-        if not Village:
+        village_id = get_user_context(request).village_id
+        if not village_id:
             return False
-        return hasattr(obj, 'Village') and obj.Village == Village
+        return getattr(obj, 'village_id', None) == village_id
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from .models import Resident
 from account.models import Person, User
 from Village.models import Village
+from event.dataloader import BatchListSerializer, LoaderField
 
 
 class PersonSerializer(serializers.ModelSerializer):
@@ -37,9 +38,17 @@ class ResidentDetailSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'is_deleted', 'deleted_at'
         ]
 
+def user_ids_by_person(person_ids):
+    user_ids = {}
+    for person_id, user_id in User.objects.filter(person_id__in=person_ids).order_by("pk").values_list("person_id", "pk"):
+        user_ids.setdefault(person_id, user_id)
+    return user_ids
+
+
 class ResidentDetailsSerializer(serializers.ModelSerializer):
     person = PersonSerializer()   
-    user_id = serializers.SerializerMethodField() 
+    # Users of the whole list are fetched at once
+    user_id = LoaderField(user_ids_by_person, source="person_id")
     added_by = UserSerializer()
 
     class Meta:
@@ -50,6 +59,4 @@ class ResidentDetailsSerializer(serializers.ModelSerializer):
             'person','village','added_by',
             'created_at'
         ]
-    def get_user_id(self, obj):
-            user = User.objects.filter(person=obj.person).first()
-            return user.user_id if user else None
+        list_serializer_class = BatchListSerializer
@@ -4,6 +4,7 @@ from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParamet
 from .models import Resident
 from .resident_serializers import ResidentDetailSerializer
 from account.models import User
+from event.query_budget import query_budget
 
 
 # 1. Get by Resident ID
@@ -26,6 +27,7 @@ from account.models import User
     #     )
     # ]
 )
+@query_budget(queries=6)
 class ResidentDetailView(generics.RetrieveAPIView):
     queryset = Resident.objects.all()
     serializer_class = ResidentDetailSerializer
@@ -68,6 +70,7 @@ class ResidentDetailView(generics.RetrieveAPIView):
     #     )
     # ]
 )
+@query_budget(queries=8)
 class ResidentByUserView(generics.RetrieveAPIView):
     serializer_class = ResidentDetailSerializer
 
@@ -91,6 +94,7 @@ class ResidentByUserView(generics.RetrieveAPIView):
 
 from Village.models import Village
 from .resident_serializers import VillageSerializer,ResidentDetailsSerializer
+@query_budget(queries=4)
 class ResidentsByVillageView(generics.ListAPIView):
     serializer_class = ResidentDetailsSerializer
 
@@ -110,10 +114,10 @@ class ResidentsByVillageView(generics.ListAPIView):
     def get(self, request, village_id, *args, **kwargs):
         try:
             # Get village once
-            village = Village.objects.get(village_id=village_id)
+            village = Village.objects.select_related("leader").get(village_id=village_id)
 
             # Fetch residents
-            residents = Resident.objects.filter(village=village, is_deleted=False)
+            residents = Resident.objects.filter(village=village, is_deleted=False).select_related("person", "added_by")
             resident_serializer = self.get_serializer(residents, many=True)
 
             # Serialize village separately (you can reuse your VillageSerializer)
@@ -2,7 +2,7 @@
 from rest_framework import serializers
 from .models import Resident
 from Village.models import Village
-from Village.serializers import LocationSerializer
+from Village.serializers import VillageRecordField
 from account.models import Person, User
 
 
@@ -22,7 +22,7 @@ class UserSerilaizer(serializers.ModelSerializer):
 
 class ResidentSerializer(serializers.ModelSerializer):
     person = PersonSerializer()
-    village=LocationSerializer(read_only=True)
+    village=VillageRecordField()
     added_by = UserSerilaizer(read_only=True)
     added_by_email = serializers.ReadOnlyField(source="added_by.email")
     person_name = serializers.ReadOnlyField(source="person.full_name")
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from account.token_claims import revoke_claims
+
+from .models import Resident
+from .utils import forget_residencies
+
+
+@receiver(post_save, sender=Resident)
+@receiver(post_delete, sender=Resident)
+def invalidate_user_context(sender, instance, **kwargs):
+    """
+    Drop the cached residency of the person; again on commit, in case a request
+    cached the rows as they were before this transaction committed. The
+    residency claims of the person's tokens are stale too.
+    """
+    person_ids = [instance.person_id]
+    forget_residencies(person_ids)
+    transaction.on_commit(lambda: forget_residencies(person_ids))
+    revoke_claims(person_ids=person_ids)
@@ -1,3 +1,79 @@
-from django.test import TestCase
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from account.jwt_serializers import UserSerializer
+from account.models import User
+from Village.models import Village
+from Village.registry import get_village_registry, reset_village_registry
+
+from .models import Resident
+from .utils import UserContext, get_user_context
+
+
+class UserContextTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_village_registry()
+        self.addCleanup(reset_village_registry)
+        self.village = Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Bugamba", village="Kirwa", leader=None,
+        )
+        self.user = User.objects.create_user(phone_number="0788000010", password="Pass1234@", first_name="Aline")
+        self.resident = Resident.objects.create(person=self.user.person, village=self.village, status="APPROVED")
+
+    def test_warm_context_needs_no_queries(self):
+        self.assertEqual(UserContext(self.user).village_id, self.village.pk)
+        with self.assertNumQueries(0):
+            context = UserContext(self.user)
+        self.assertTrue(context.is_approved_resident)
+
+        request = SimpleNamespace(user=self.user)
+        self.assertIs(get_user_context(request), get_user_context(request))
+
+    def test_resident_changes_invalidate_the_context(self):
+        self.assertTrue(UserContext(self.user).is_approved_resident)
+        self.resident.status = "PENDING"
+        self.resident.save()
+        self.assertEqual(UserContext(self.user).residency_status, "PENDING")
+        self.resident.soft_delete()
+        self.assertIsNone(UserContext(self.user).village_id)
+
+    def test_leader_context_and_profile(self):
+        self.user.role = "leader"
+        self.user.save()
+        self.village.leader = self.user
+        self.village.save()
+        self.assertEqual(UserContext(self.user).led_village_id, self.village.pk)
+
+        self.client.force_authenticate(user=self.user)
+        village = self.client.get(reverse("user_profile")).data["data"]["village"]
+        self.assertEqual((village["name"], village["status"]), ("Kirwa", "APPROVED"))
+
+    def test_leader_changes_invalidate_the_context(self):
+        User.objects.filter(pk=self.user.pk).update(role="leader")
+        self.user.refresh_from_db()
+        self.village.leader = self.user
+        self.village.save()
+        self.assertEqual(UserContext(self.user).led_village_id, self.village.pk)
+        with self.assertNumQueries(0):
+            UserContext(self.user)
+
+        self.village.leader = None
+        self.village.save()
+        self.assertIsNone(UserContext(self.user).led_village_id)
+
+    def test_user_list_loads_residencies_in_one_query(self):
+        for i in range(3):
+            user = User.objects.create_user(phone_number=f"078800002{i}", password="Pass1234@")
+            Resident.objects.create(person=user.person, village=self.village, status="PENDING")
+        users = list(User.objects.select_related("person").order_by("phone_number"))
+        cache.clear()
+        get_village_registry()
+
+        with self.assertNumQueries(1):
+            data = UserSerializer(users, many=True).data
+        self.assertEqual([row["village"]["status"] for row in data], ["APPROVED"] + ["PENDING"] * 3)
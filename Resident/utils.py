@@ -1,17 +1,134 @@
 # Resident/utils.py
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+
+# Seconds a user's residency (or led village) stays cached across requests;
+# Resident and Village signals drop it sooner
+USER_CONTEXT_TTL = 60
+NO_RESIDENCY = ()
+NO_LED_VILLAGE = ()
+
+
+def residency_cache_key(person_id):
+    return f"resident-residency:{person_id}"
+
+
+def forget_residencies(person_ids):
+    """Drop the cached residency of these people, e.g. after a queryset update."""
+    cache.delete_many([residency_cache_key(person_id) for person_id in person_ids])
+
+
+def load_residency(person_id):
+    """(resident pk, status, village pk) of a person's active residency, or NO_RESIDENCY."""
+    if person_id is None:
+        return NO_RESIDENCY
+    return load_residencies([person_id])[person_id]
+
+
+def load_residencies(person_ids):
+    """{person id: residency} for many people; the cache misses cost one query."""
+    keys = {residency_cache_key(person_id): person_id for person_id in person_ids}
+    residencies = {keys[key]: tuple(residency) for key, residency in cache.get_many(keys).items()}
+    missing = [person_id for person_id in keys.values() if person_id not in residencies]
+    if missing:
+        from .models import Resident  # Import here to avoid circular imports
+        rows = Resident.objects.filter(person_id__in=missing, is_deleted=False) \
+            .order_by("pk").values_list("person_id", "pk", "status", "village_id")
+        found = {}
+        for person_id, *residency in rows:
+            found.setdefault(person_id, tuple(residency))
+        found = {person_id: found.get(person_id, NO_RESIDENCY) for person_id in missing}
+        cache.set_many({residency_cache_key(person_id): residency for person_id, residency in found.items()},
+                       USER_CONTEXT_TTL)
+        residencies.update(found)
+    return residencies
+
+
+def led_village_cache_key(user_pk):
+    return f"resident-led-village:{user_pk}"
+
+
+def forget_led_villages(user_pks):
+    """Drop the cached led village of these users, e.g. after a leader change."""
+    cache.delete_many([led_village_cache_key(user_pk) for user_pk in user_pks])
+
+
+def load_led_village(user_pk):
+    """(village pk,) of the village a user leads, or NO_LED_VILLAGE."""
+    key = led_village_cache_key(user_pk)
+    led_village = cache.get(key)
+    if led_village is None:
+        from Village.models import Village
+
+        led_village = tuple(Village.objects.filter(leader_id=user_pk).values_list("pk", flat=True)[:1])
+        cache.set(key, led_village, USER_CONTEXT_TTL)
+    return tuple(led_village)
+
+
+class UserContext:
+    """
+    What the permission checks need to know about a user: the role, the active
+    residency and its village, and the village the user leads.
+
+    The residency and the led village come from short-lived cache entries
+    dropped by the Resident and Village signals (or from the token claims, see
+    account.token_claims), so a warm context costs no queries. Compare foreign key ids (obj.village_id != ctx.village_id)
+    rather than Village instances to keep it that way.
+    """
+
+    __slots__ = ("user", "role", "residency_id", "residency_status", "village_id", "led_village_id", "_village")
+
+    def __init__(self, user, residency=None, led_village=None):
+        self.user = user
+        self.role = getattr(user, "role", None)
+        self.residency_id = self.residency_status = self.village_id = self.led_village_id = None
+        self._village = None
+        if not user.is_authenticated or isinstance(user, AnonymousUser):
+            return
+
+        if residency is None:
+            residency = load_residency(user.person_id)
+        if residency:
+            self.residency_id, self.residency_status, self.village_id = residency
+        if self.role == "leader":
+            if led_village is None:
+                led_village = load_led_village(user.pk)
+            self.led_village_id = led_village[0] if led_village else None
+
+    @property
+    def is_approved_resident(self):
+        return self.residency_status == "APPROVED"
+
+    @property
+    def village(self):
+        """The Village of the active residency, fetched once; for writes that need the instance."""
+        if self._village is None and self.village_id is not None:
+            from Village.models import Village
+
+            self._village = Village.objects.get(pk=self.village_id)
+        return self._village
+
+    @property
+    def village_record(self):
+        """Registry record of the residency village, or None."""
+        if self.village_id is None:
+            return None
+        from Village.registry import get_village_registry
+
+        return get_village_registry().get(self.village_id)
+
+
+def get_user_context(request):
+    """The UserContext of request.user, built once per request."""
+    context = getattr(request, "_user_context", None)
+    if context is None or context.user is not request.user:
+        context = UserContext(request.user)
+        request._user_context = context
+    return context
+
 
 def get_resident_location(user):
     """
     Get the village location for a user, handling AnonymousUser
     """
-    # Return None for AnonymousUser or unauthenticated users
-    if not user.is_authenticated or isinstance(user, AnonymousUser):
-        return None
-    
-    try:
-        from .models import Resident  # Import here to avoid circular imports
-        resident = Resident.objects.get(person__user=user, is_deleted=False)
-        return resident.village
-    except Resident.DoesNotExist:
-        return None
\ No newline at end of file
+    return UserContext(user).village
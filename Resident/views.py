@@ -14,11 +14,14 @@ from account.permisions import IsAdminUser, IsLeaderOrAdmin, IsVerifiedUser
 from .tasks import notify_village_leader_new_resident
 from event.utils import success_response, error_response
 from .mixins import VillageRolePermissionMixin
+from .utils import forget_residencies
+from account.token_claims import revoke_claims
 from django_filters.rest_framework import DjangoFilterBackend
 from .response import errorss__response
 from django.db import transaction
 from django.utils import timezone
 from .tasks import notify_village_leaders_of_migration
+from event.query_budget import query_budget
 
 @extend_schema_view(
     list=extend_schema(
@@ -104,6 +107,7 @@ from .tasks import notify_village_leaders_of_migration
 
 
 
+@query_budget(queries=3)
 class ResidentViewSet(VillageRolePermissionMixin,viewsets.ModelViewSet):
     """
     ViewSet for managing Resident records with role-based access control.
@@ -123,12 +127,13 @@ class ResidentViewSet(VillageRolePermissionMixin,viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        residents = Resident.objects.filter(is_deleted=False).select_related("person", "added_by__person")
         if user.role == "admin":
-            return Resident.objects.filter(is_deleted=False)
+            return residents
         elif user.role == "leader":
-            return Resident.objects.filter(is_deleted=False, village__leader=user)
+            return residents.filter(village__leader=user)
         else:
-            return Resident.objects.filter(is_deleted=False, person=user.person)
+            return residents.filter(person=user.person)
 
 # Resident/views.py
     @extend_schema(
@@ -306,6 +311,9 @@ class ResidentViewSet(VillageRolePermissionMixin,viewsets.ModelViewSet):
             if not queryset.exists():
                 return error_response("No valid residents found to update", 404)
             queryset.update(status=new_status)
+            person_ids = list(queryset.values_list("person_id", flat=True))
+            forget_residencies(person_ids)
+            revoke_claims(person_ids=person_ids)
             serializer = ResidentSerializer(queryset, many=True)
             return success_response(serializer.data, f"Updated status of {queryset.count()} residents")
 
@@ -174,6 +174,24 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Africa/Kigali"
 
+# CACHE
+# Set CACHE_REDIS_URL so all workers share one cache; version keys bumped by
+# signals (e.g. the village hierarchy) only reach every worker through it.
+# Without it Django's per-process local memory cache is used.
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+            "OPTIONS": {"IGNORE_EXCEPTIONS": True},
+        }
+    }
+# Seconds a worker serves the village hierarchy and registry before re-reading
+# the table. Only needed when the cache is per-process; with Redis the version
+# key reaches every worker, so None (no age bound).
+VILLAGE_HIERARCHY_MAX_AGE = None if CACHE_REDIS_URL else 60
+
 # CORS SETTINGS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",   # Vite frontend
@@ -190,3 +208,17 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 
+
+# VILLAGE BOUNDARIES
+VILLAGE_BOUNDARY_SHAPEFILE = BASE_DIR / "Village level boundary" / "RWA_adm5.shp"
+VILLAGE_BOUNDARY_COMPILED_DIR = BASE_DIR / "Village level boundary" / "compiled"
+# Build the village index at startup (enabled by gunicorn.conf.py)
+VILLAGE_INDEX_WARMUP = config("VILLAGE_INDEX_WARMUP", default=False, cast=bool)
+# Seconds between checks for a newly activated compiled boundary version, 0 to disable
+VILLAGE_BOUNDARY_RELOAD_INTERVAL = config("VILLAGE_BOUNDARY_RELOAD_INTERVAL", default=30, cast=int)
+VILLAGE_LOCATE_CACHE = {
+    "PRECISION": config("VILLAGE_LOCATE_CACHE_PRECISION", default=4, cast=int),  # ~11 m
+    "SIZE": config("VILLAGE_LOCATE_CACHE_SIZE", default=10000, cast=int),
+    "SHARED": config("VILLAGE_LOCATE_CACHE_SHARED", default=False, cast=bool),
+    "TIMEOUT": 60 * 60 * 24,
+}
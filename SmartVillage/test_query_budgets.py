@@ -0,0 +1,223 @@
+"""
+Query budgets of every GET endpoint (see event/query_budget.py).
+
+Seeds a village with full pages of residents, events, alerts, complaints,
+suggestions, volunteering events, visitors and contacts, plus the test
+village boundary shapefile of Village/tests.py for the geo endpoints, then
+requests each list and detail endpoint of the project's urls.py files as an
+admin. Each must answer 2xx within the budget declared on its view.
+"""
+import datetime
+import math
+import re
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from rest_framework.test import APITestCase
+
+from account.models import User
+from alert.models import CommunityAlert
+from complaint.models import Complaint
+from contacts.models import Contact
+from event.models import Event
+from event.query_budget import get_query_budget
+from Resident.models import Resident
+from team_contact.models import ContactMessage, ContactReply, TeamMember
+from Village.geo_index import get_village_index
+from Village.hierarchy import reset_hierarchy
+from Village.models import GeocodingJob, Village
+from Village.registry import reset_village_registry
+from Village.tests import BoundaryShapefileMixin
+from villagesInfo.models import Comment, Suggestion, Vote
+from vistor.models import Visitor
+from VolunteerActivity.models import VolunteeringEvent, VolunteerParticipation
+
+# More rows than a page (PAGE_SIZE), so per-row queries exceed any budget
+ROWS = settings.REST_FRAMEWORK["PAGE_SIZE"] + 2
+LOCAL_APPS = ("account", "alert", "complaint", "contacts", "event", "Resident",
+              "team_contact", "Village", "villagesInfo", "vistor", "VolunteerActivity")
+# A point inside Kirwa in the test shapefile (see Village/tests.py)
+LONGITUDE, LATITUDE = 29.805, -1.385
+TILE_ZOOM = 8
+# Query strings some endpoints need to do their work
+QUERY_PARAMS = {
+    "Village-typeahead": {"q": "kir"},
+    "villages_nearby": {"latitude": LATITUDE, "longitude": LONGITUDE},
+    "village_neighbours": {"village_id": "{village_id}"},
+    "village_boundaries": {"district": "Burera"},
+}
+
+
+def get_endpoints(patterns=None, prefix=""):
+    """(route, URL pattern) of every GET endpoint declared by a local app."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from get_endpoints(pattern.url_patterns, prefix + str(pattern.pattern))
+            continue
+        callback = pattern.callback
+        view = getattr(callback, "cls", None) or callback
+        if view.__module__.split(".")[0] not in LOCAL_APPS or "format" in pattern.pattern.regex.groupindex:
+            continue
+        actions = getattr(callback, "actions", None)
+        if actions is not None and "get" not in actions:
+            continue
+        if actions is None and hasattr(callback, "cls") and not hasattr(callback.cls, "get"):
+            continue
+        yield prefix + str(pattern.pattern), pattern
+
+
+class QueryBudgetTest(BoundaryShapefileMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.village = Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Bugamba", village="Kirwa", leader=None,
+        )
+        for name in ("Gitare", "Rusekera"):
+            Village.objects.create(
+                province="Amajyaruguru", district="Burera", sector="Kinyababa", cell="Bugamba", village=name,
+                leader=None,
+            )
+        cls.admin = User.objects.create_user(phone_number="0788100000", password="Pass1234@", first_name="Admin")
+        cls.leader = User.objects.create_user(phone_number="0788100001", password="Pass1234@", first_name="Leader")
+        User.objects.filter(pk=cls.admin.pk).update(role="admin", is_verified=True, is_staff=True)
+        User.objects.filter(pk=cls.leader.pk).update(role="leader", is_verified=True)
+        cls.admin.refresh_from_db()
+        cls.leader.refresh_from_db()
+        Village.objects.filter(pk=cls.village.pk).update(leader=cls.leader)
+
+        today = datetime.date.today()
+        cls.residents = []
+        for i in range(ROWS):
+            user = User.objects.create_user(
+                phone_number=f"07882000{i:02d}", password="Pass1234@", first_name=f"Resident{i}",
+            )
+            User.objects.filter(pk=user.pk).update(is_verified=True)
+            cls.residents.append(Resident.objects.create(
+                person=user.person, village=cls.village, status="APPROVED", added_by=cls.leader,
+            ))
+            Event.objects.create(
+                title=f"Meeting {i}", description="Monthly meeting", exact_place_of_village="Office",
+                date=today, start_time="09:00", end_time="10:00", organizer=cls.leader, village=cls.village,
+                status="APPROVED",
+            )
+            CommunityAlert.objects.create(
+                title=f"Alert {i}", description="Broken pipe", alert_type="infrastructure",
+                urgency_level="low", reporter=user, village=cls.village, incident_date=today,
+                incident_time="08:00",
+            )
+            Complaint.objects.create(complainant=user, description="Noise", location=cls.village)
+            suggestion = Suggestion.objects.create(
+                resident=cls.residents[-1], village=cls.village, title=f"Idea {i}",
+                description="A second tap", category="infrastructure",
+            )
+            Vote.objects.create(suggestion=suggestion, user=user)
+            Comment.objects.create(suggestion=suggestion, user=user, text="Agreed")
+            volunteering = VolunteeringEvent.objects.create(
+                title=f"Clean-up {i}", description="Market clean-up", date=today, village=cls.village,
+                organizer=user, status="APPROVED",
+            )
+            VolunteerParticipation.objects.create(user=user, event=volunteering, status="APPROVED")
+            Visitor.objects.create(
+                resident=cls.residents[-1], village=cls.village, name=f"Visitor {i}",
+                phone_number="0788000000", id_number=f"ID{i}", purpose_of_visit="Family",
+                expected_duration="1 day",
+            )
+            TeamMember.objects.create(name=f"Member {i}", role="Developer", bio="Builds things")
+            message = ContactMessage.objects.create(
+                name=f"Sender {i}", email=f"sender{i}@example.com", inquiry_type="general", message="Hello",
+            )
+            ContactReply.objects.create(message=message, replied_by=cls.admin, reply_message="Thanks")
+            Contact.objects.create(
+                name=f"Health post {i}", category="health", created_by=cls.admin,
+                village=cls.village if i == 0 else None,
+            )
+
+        cls.objects = {
+            "AdminUserViewSet": cls.residents[0].person.user_set.get(),
+            "ComplaintViewSet": Complaint.objects.first(),
+            "CommunityAlertViewSet": CommunityAlert.objects.first(),
+            "EventViewSet": Event.objects.first(),
+            "LocationViewSet": cls.village,
+            "LeaderViewSet": cls.leader,
+            "VolunteeringEventViewSet": VolunteeringEvent.objects.first(),
+            "VolunteerParticipationViewSet": VolunteerParticipation.objects.first(),
+            "TeamMemberViewSet": TeamMember.objects.first(),
+            "ContactMessageViewSet": ContactMessage.objects.first(),
+            "VisitorViewSet": Visitor.objects.first(),
+            "ContactDetailView": Contact.objects.first(),
+        }
+        cls.url_kwargs = {
+            "village_id": cls.village.village_id,
+            "resident_id": cls.residents[0].resident_id,
+            "user_id": cls.residents[0].person.user_set.get().user_id,
+            "suggestion_id": Suggestion.objects.first().pk,
+            "job_id": GeocodingJob.objects.create(
+                created_by=cls.admin, latitude_column="lat", longitude_column="lng",
+            ).job_id,
+            # The zoom 8 tile holding the point
+            "z": TILE_ZOOM,
+            "x": int((LONGITUDE + 180) / 360 * 2 ** TILE_ZOOM),
+            "y": int((1 - math.asinh(math.tan(math.radians(LATITUDE))) / math.pi) / 2 * 2 ** TILE_ZOOM),
+        }
+
+    def setUp(self):
+        super().setUp()
+        # Boundaries for the geo endpoints: Kirwa is linked, the other test villages created
+        call_command("compile_boundaries", stdout=StringIO())
+        call_command("load_villages", stdout=StringIO())
+        # Not warmed: the health check warms the index itself, within its budget
+        pack = get_village_index().packs.districts()["Burera"]
+        self.url_kwargs = dict(self.url_kwargs, slug=pack["slug"], content_hash=pack["hash"])
+        cache.clear()
+        reset_hierarchy()
+        reset_village_registry()
+        self.addCleanup(reset_village_registry)
+        self.addCleanup(reset_hierarchy)
+        self.client.force_authenticate(user=self.admin)
+
+    def url_for(self, route, pattern):
+        view = getattr(pattern.callback, "cls", pattern.callback)
+
+        def value(name):
+            if name in ("pk", "resident_id") and view.__name__ in self.objects:
+                return str(self.objects[view.__name__].pk)
+            return str(self.url_kwargs[name])
+
+        if route.startswith("^"):
+            path = re.sub(r"\(\?P<(\w+)>[^)]*\)", lambda m: value(m.group(1)), route.strip("^$"))
+        else:
+            path = re.sub(r"<(?:\w+:)?(\w+)>", lambda m: value(m.group(1)), route)
+        return "/" + path
+
+    def test_endpoints_stay_within_their_query_budget(self):
+        for route, pattern in get_endpoints():
+            with self.subTest(route=route):
+                budget = get_query_budget(pattern.callback)
+                self.assertIsNotNone(budget, f"{route} declares no query_budget")
+
+                url = self.url_for(route, pattern)
+                params = {
+                    key: str(value).format(**self.url_kwargs)
+                    for key, value in QUERY_PARAMS.get(pattern.name, {}).items()
+                }
+                # The first request builds the per-worker caches (village registry, hierarchy)
+                self.client.get(url, params)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, params)
+                # An endpoint that errors out cheaply proves nothing about its budget
+                self.assertTrue(200 <= response.status_code < 300, f"{url} answered {response.status_code}")
+
+                sql_ms = sum(float(query["time"]) for query in queries.captured_queries) * 1000
+                self.assertLessEqual(
+                    len(queries), budget.queries,
+                    f"{url} ran {len(queries)} queries:\n" + "\n".join(q["sql"] for q in queries.captured_queries),
+                )
+                self.assertLessEqual(sql_ms, budget.sql_ms, f"{url} spent {sql_ms:.1f} ms in SQL")
@@ -1,8 +1,44 @@
 from django.contrib import admin
-from .models import Village
+from .models import Cell, District, GeocodingJob, Province, Sector, Village
 @admin.register(Village)
 class LocationAdmin(admin.ModelAdmin):
     list_display = ("village_id","village","cell", "sector", "district", "province", "leader")
     search_fields = ("village", "sector", "district", "province", "leader__email")
-    list_filter = ("province", "district", "sector","cell")
+    list_filter = ("province_ref", "district_ref", "sector_ref", "cell_ref")
+    raw_id_fields = ("province_ref", "district_ref", "sector_ref", "cell_ref")
     ordering = ("id","province", "district", "sector", "cell", "village")
+
+
+@admin.register(GeocodingJob)
+class GeocodingJobAdmin(admin.ModelAdmin):
+    list_display = ("job_id", "status", "progress", "rows_processed", "rows_located", "created_by", "created_at")
+    list_filter = ("status",)
+    readonly_fields = ("job_id", "task_id", "progress", "rows_processed", "rows_located", "boundary_version", "error")
+    ordering = ("-created_at",)
+
+
+@admin.register(Province)
+class ProvinceAdmin(admin.ModelAdmin):
+    list_display = ("id", "name")
+    search_fields = ("name",)
+
+
+@admin.register(District)
+class DistrictAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "province")
+    list_filter = ("province",)
+    search_fields = ("name",)
+
+
+@admin.register(Sector)
+class SectorAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "district")
+    list_filter = ("district__province",)
+    search_fields = ("name", "district__name")
+
+
+@admin.register(Cell)
+class CellAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "sector")
+    search_fields = ("name", "sector__name")
+    raw_id_fields = ("sector",)
@@ -0,0 +1,101 @@
+# Village/admin_units.py
+"""
+Province/District/Sector/Cell rows behind the integer keys of Village.
+
+Village keeps its province..cell names for the API; the *_ref foreign keys
+point at the normalized rows so filters and rollups join and compare small
+integers. A pre_save signal resolves the keys of every saved Village, and
+sync_admin_units() backfills them in bulk (after load_villages, or for rows
+written before the tables existed).
+"""
+from django.db import transaction
+
+from .models import Cell, District, Province, Sector, Village
+
+REF_FIELDS = ("province_ref", "district_ref", "sector_ref", "cell_ref")
+# (model, parent field) from the top of the hierarchy down
+UNIT_LEVELS = ((Province, None), (District, "province"), (Sector, "district"), (Cell, "sector"))
+UNIT_MODELS = {"province": Province, "district": District, "sector": Sector, "cell": Cell}
+
+
+def unit_ids(level, name):
+    """
+    Ids of the units of a level ("province".."cell") called name, in any case.
+    Sector and cell names repeat across parents, so there can be several.
+    """
+    return list(UNIT_MODELS[level].objects.filter(name__iexact=name).values_list("id", flat=True))
+
+
+def resolve_cell(province, district, sector, cell):
+    """The Cell for a chain of names, created along with its parents when new."""
+    found = Cell.objects.select_related("sector__district__province").filter(
+        name=cell,
+        sector__name=sector,
+        sector__district__name=district,
+        sector__district__province__name=province,
+    ).first()
+    if found is not None:
+        return found
+
+    with transaction.atomic():
+        province_unit, _ = Province.objects.get_or_create(name=province)
+        district_unit, _ = District.objects.get_or_create(province=province_unit, name=district)
+        sector_unit, _ = Sector.objects.get_or_create(district=district_unit, name=sector)
+        cell_unit, _ = Cell.objects.get_or_create(sector=sector_unit, name=cell)
+    return cell_unit
+
+
+def assign_admin_units(village):
+    """Point village's *_ref keys at the units named by its string fields."""
+    cell = resolve_cell(village.province, village.district, village.sector, village.cell)
+    village.cell_ref = cell
+    village.sector_ref = cell.sector
+    village.district_ref = cell.sector.district
+    village.province_ref = cell.sector.district.province
+
+
+def _unit_ids(model, parent, wanted):
+    """{(parent id, name): id} covering wanted, bulk-creating the missing units."""
+    def existing():
+        fields = (f"{parent}_id", "name", "id") if parent else ("name", "id")
+        rows = model.objects.values_list(*fields)
+        return {row[:-1] if parent else row[0]: row[-1] for row in rows}
+
+    ids = existing()
+    missing = [key for key in wanted if key not in ids]
+    if missing:
+        model.objects.bulk_create(
+            [model(**{f"{parent}_id": key[0], "name": key[1]}) if parent else model(name=key) for key in missing],
+            ignore_conflicts=True,
+        )
+        ids = existing()
+    return ids, len(missing)
+
+
+def sync_admin_units():
+    """
+    Create the units named by every Village and backfill the *_ref keys of the
+    villages that do not match them yet. Returns (units created, villages updated).
+    """
+    rows = list(Village.objects.values_list(
+        "id", "province", "district", "sector", "cell", *(f"{field}_id" for field in REF_FIELDS)
+    ))
+
+    created = 0
+    keys = [row[1] for row in rows]
+    chains = [[] for _ in rows]
+    for (model, parent), level in zip(UNIT_LEVELS, range(1, 5)):
+        if parent:
+            keys = [(chain[-1], row[level]) for chain, row in zip(chains, rows)]
+        ids, level_created = _unit_ids(model, parent, set(keys))
+        created += level_created
+        for chain, key in zip(chains, keys):
+            chain.append(ids[key])
+
+    stale = [
+        Village(id=row[0], **{f"{field}_id": unit for field, unit in zip(REF_FIELDS, chain)})
+        for row, chain in zip(rows, chains)
+        if tuple(chain) != row[5:]
+    ]
+    Village.objects.bulk_update(stale, REF_FIELDS, batch_size=1000)
+    return created, len(stale)
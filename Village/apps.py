@@ -1,6 +1,26 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class VillageConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Village'
+
+    def ready(self):
+        import Village.signal
+
+        # Set by gunicorn.conf.py, so the index is built once in the master
+        # process rather than by the first request in every worker
+        if getattr(settings, "VILLAGE_INDEX_WARMUP", False):
+            from .geo_index import warm_village_index
+
+            try:
+                index = warm_village_index()
+            except FileNotFoundError as e:
+                logger.warning("Village index warm-up skipped, boundary data not found: %s", e)
+            else:
+                logger.info("Village index warmed: %d villages (%s)", len(index), index.version)
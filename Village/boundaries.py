@@ -0,0 +1,471 @@
+# Village/boundaries.py
+"""
+Reading the RWA_adm5 shapefile and the compiled boundary artifact.
+
+``manage.py compile_boundaries`` writes each compile to its own version
+directory and then points ``ACTIVE`` at it:
+
+    <compiled>/ACTIVE                 name of the version workers should serve
+    <compiled>/versions/<version>/    one compiled artifact
+
+Workers notice a changed ``ACTIVE`` and swap to the new version without a
+restart (see geo_index). A compiled artifact directory holds:
+
+    manifest.json     format version, record count, source file
+    attributes.json   [province, district, sector, cell, village] per record
+    bounds.npy        float64 (n, 4) minx, miny, maxx, maxy per record
+    centroids.npy     float64 (n, 2) centroid lon, lat per record
+    boundary_ids.npy  int64 (n) shapefile ID_5 per record
+    adjacency_*.npy   village adjacency graph in CSR form (see build_adjacency)
+    offsets.npy       int64 (n + 1) byte offsets into geometries.wkb
+    geometries.wkb    concatenated WKB polygons
+    grid*.npy         regular lookup grid over the national extent (see BoundaryGrid)
+    layers/           simplified map layers (see boundary_layers)
+    packs/            per-district offline lookup packs (see boundary_packs)
+
+The numpy arrays and the WKB blob are memory-mapped, so every worker on a
+host shares one copy through the page cache.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import shapefile
+import shapely
+from shapely.geometry import shape
+from django.conf import settings
+from django.utils import timezone
+
+# Shapefile attribute columns holding the administrative names, in hierarchy order
+SHAPEFILE_NAME_FIELDS = ("NAME_1", "NAME_2", "NAME_3", "NAME_4", "NAME_5")
+# Stable per-village id in the shapefile
+SHAPEFILE_ID_FIELD = "ID_5"
+ADMIN_LEVELS = ("province", "district", "sector", "cell", "village")
+
+COMPILED_FORMAT = 5
+MANIFEST_FILE = "manifest.json"
+ACTIVE_FILE = "ACTIVE"
+VERSIONS_DIR = "versions"
+
+# Village columns derived from the polygon, in the column order of geometry_metrics()
+GEOMETRY_FIELDS = (
+    "centroid_longitude", "centroid_latitude", "area_km2",
+    "min_longitude", "min_latitude", "max_longitude", "max_latitude",
+)
+
+METERS_PER_DEGREE = 111_320.0
+
+# Polygons closer than this (~1 m) are neighbours; absorbs slivers and gaps along shared borders
+ADJACENCY_TOLERANCE = 1e-5
+
+# ~275 m at Rwanda's latitude; about 600k cells over the national extent
+DEFAULT_GRID_CELL_SIZE = 0.0025
+
+
+def get_shapefile_path():
+    """
+    Path of the RWA_adm5 village boundary shapefile.
+    """
+    default = os.path.join(settings.BASE_DIR, "Village level boundary", "RWA_adm5.shp")
+    return str(getattr(settings, "VILLAGE_BOUNDARY_SHAPEFILE", default))
+
+
+def get_compiled_dir():
+    """
+    Directory holding the compiled boundary artifact.
+    """
+    default = os.path.join(settings.BASE_DIR, "Village level boundary", "compiled")
+    return str(getattr(settings, "VILLAGE_BOUNDARY_COMPILED_DIR", default))
+
+
+def read_shapefile(path=None):
+    """
+    Read village polygons and their administrative names.
+
+    Returns (geometries, attributes, boundary_ids) where attributes is a list of
+    dicts keyed by ADMIN_LEVELS and boundary_ids holds the ID_5 of each record.
+    """
+    path = path or get_shapefile_path()
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Shapefile not found: {path}")
+
+    geometries, attributes, boundary_ids = [], [], []
+    with shapefile.Reader(path) as sf:
+        for shape_record in sf.iterShapeRecords(fields=[SHAPEFILE_ID_FIELD, *SHAPEFILE_NAME_FIELDS]):
+            record = shape_record.record
+            geometries.append(shape(shape_record.shape.__geo_interface__))
+            attributes.append({
+                level: record[field]
+                for level, field in zip(ADMIN_LEVELS, SHAPEFILE_NAME_FIELDS)
+            })
+            boundary_ids.append(int(record[SHAPEFILE_ID_FIELD]))
+    return geometries, attributes, np.asarray(boundary_ids, dtype=np.int64)
+
+
+def geometry_metrics(geometries):
+    """
+    Centroid, area and bounding box of each polygon as an (n, 7) array in
+    GEOMETRY_FIELDS order. Area is in km², scaled for the latitude of the centroid.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    centroids = shapely.centroid(geometries)
+    longitudes, latitudes = shapely.get_x(centroids), shapely.get_y(centroids)
+    km_per_degree = METERS_PER_DEGREE / 1000
+    area = shapely.area(geometries) * km_per_degree ** 2 * np.cos(np.radians(latitudes))
+    return np.column_stack([
+        np.round(longitudes, 6), np.round(latitudes, 6), np.round(area, 4), np.round(shapely.bounds(geometries), 6),
+    ])
+
+
+def iter_village_records(path=None):
+    """
+    Lazily yield (boundary_id, attributes, geometry) for every village in the
+    shapefile, where geometry maps GEOMETRY_FIELDS to the polygon's centroid,
+    area and bbox.
+    """
+    path = path or get_shapefile_path()
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Shapefile not found: {path}")
+
+    with shapefile.Reader(path) as sf:
+        for shape_record in sf.iterShapeRecords(fields=[SHAPEFILE_ID_FIELD, *SHAPEFILE_NAME_FIELDS]):
+            record = shape_record.record
+            metrics = geometry_metrics([shape(shape_record.shape.__geo_interface__)])[0]
+            yield int(record[SHAPEFILE_ID_FIELD]), {
+                level: record[field]
+                for level, field in zip(ADMIN_LEVELS, SHAPEFILE_NAME_FIELDS)
+            }, {
+                field: None if np.isnan(value) else float(value)
+                for field, value in zip(GEOMETRY_FIELDS, metrics)
+            }
+
+
+def build_adjacency(geometries, tolerance=ADJACENCY_TOLERANCE):
+    """
+    Village adjacency graph as CSR arrays (indptr, indices): the neighbours of
+    record i are indices[indptr[i]:indptr[i + 1]], sorted. Villages sharing a
+    border or a corner, within tolerance degrees, are neighbours.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    tree = shapely.STRtree(geometries)
+    left, right = tree.query(geometries, predicate="dwithin", distance=tolerance)
+    keep = left != right
+    pairs = np.concatenate([
+        np.column_stack([left[keep], right[keep]]),
+        np.column_stack([right[keep], left[keep]]),
+    ])
+    pairs = np.unique(pairs, axis=0)
+
+    indptr = np.zeros(len(geometries) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(pairs[:, 0], minlength=len(geometries)), out=indptr[1:])
+    return indptr, pairs[:, 1].astype(np.int32)
+
+
+class BoundaryGrid:
+    """
+    Regular lookup grid over the extent of all village polygons.
+
+    Each cell of ``cells`` holds:
+      * ``>= 0``  the record index of the single polygon fully containing the cell,
+      * ``-1``    no polygon touches the cell,
+      * ``<= -2`` a border cell; its candidate records are
+        ``candidates[offsets[k]:offsets[k + 1]]`` with ``k = -value - 2``.
+
+    Interior points therefore resolve with one array index and only border
+    cells need exact polygon tests.
+    """
+
+    EMPTY = -1
+
+    def __init__(self, origin, cell_size, cells, offsets, candidates):
+        self.origin_x, self.origin_y = origin
+        self.cell_size = cell_size
+        self.cells = cells
+        self.height, self.width = cells.shape
+        self.offsets = offsets
+        self.candidates = candidates
+
+    @classmethod
+    def build(cls, geometries, cell_size=DEFAULT_GRID_CELL_SIZE):
+        geometries = np.asarray(geometries, dtype=object)
+        minx, miny, maxx, maxy = shapely.total_bounds(geometries)
+        width = max(int(np.ceil((maxx - minx) / cell_size)), 1)
+        height = max(int(np.ceil((maxy - miny) / cell_size)), 1)
+
+        flat_ids, records, interior = [], [], []
+        for record, (geometry, bounds) in enumerate(zip(geometries, shapely.bounds(geometries))):
+            x0, x1 = (np.floor((bounds[[0, 2]] - minx) / cell_size).astype(int)).clip(0, width - 1)
+            y0, y1 = (np.floor((bounds[[1, 3]] - miny) / cell_size).astype(int)).clip(0, height - 1)
+            xs, ys = np.meshgrid(np.arange(x0, x1 + 1), np.arange(y0, y1 + 1))
+            xs, ys = xs.ravel(), ys.ravel()
+            boxes = shapely.box(
+                minx + xs * cell_size, miny + ys * cell_size,
+                minx + (xs + 1) * cell_size, miny + (ys + 1) * cell_size,
+            )
+            shapely.prepare(geometry)
+            touching = shapely.intersects(geometry, boxes)
+            flat_ids.append(ys[touching] * width + xs[touching])
+            records.append(np.full(int(touching.sum()), record))
+            interior.append(shapely.contains_properly(geometry, boxes[touching]))
+
+        flat_ids = np.concatenate(flat_ids)
+        records = np.concatenate(records)
+        interior = np.concatenate(interior)
+        order = np.lexsort((records, flat_ids))
+        flat_ids, records, interior = flat_ids[order], records[order], interior[order]
+
+        cells = np.full(width * height, cls.EMPTY, dtype=np.int32)
+        touched, starts, counts = np.unique(flat_ids, return_index=True, return_counts=True)
+        single = (counts == 1) & interior[starts]
+        cells[touched[single]] = records[starts[single]]
+
+        border = ~single
+        cells[touched[border]] = -(np.arange(int(border.sum()), dtype=np.int32) + 2)
+        candidates = records[np.repeat(border, counts)].astype(np.int32)
+        offsets = np.zeros(int(border.sum()) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts[border])
+        return cls((minx, miny), cell_size, cells.reshape(height, width), offsets, candidates)
+
+    def save(self, directory):
+        np.save(os.path.join(directory, "grid.npy"), self.cells)
+        np.save(os.path.join(directory, "grid_offsets.npy"), self.offsets)
+        np.save(os.path.join(directory, "grid_candidates.npy"), self.candidates)
+        return {
+            "origin": [self.origin_x, self.origin_y],
+            "cell_size": self.cell_size,
+            "shape": [self.height, self.width],
+        }
+
+    @classmethod
+    def load(cls, directory, meta):
+        return cls(
+            meta["origin"],
+            meta["cell_size"],
+            np.load(os.path.join(directory, "grid.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "grid_offsets.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "grid_candidates.npy"), mmap_mode="r"),
+        )
+
+    def lookup_many(self, longitudes, latitudes):
+        """Return the cell value for each point (EMPTY outside the grid)."""
+        xs = np.floor((np.asarray(longitudes, dtype=float) - self.origin_x) / self.cell_size)
+        ys = np.floor((np.asarray(latitudes, dtype=float) - self.origin_y) / self.cell_size)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        values = np.full(len(xs), self.EMPTY, dtype=np.int64)
+        values[inside] = self.cells[ys[inside].astype(np.int64), xs[inside].astype(np.int64)]
+        return values
+
+    def lookup(self, longitude, latitude):
+        x = int(np.floor((longitude - self.origin_x) / self.cell_size))
+        y = int(np.floor((latitude - self.origin_y) / self.cell_size))
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return self.EMPTY
+        return int(self.cells[y, x])
+
+    def box_value(self, minx, miny, maxx, maxy):
+        """
+        The cell value shared by every point of the box: a record index, EMPTY,
+        or None when the box reaches a border cell or spans several villages.
+        """
+        x0 = int(np.floor((minx - self.origin_x) / self.cell_size))
+        x1 = int(np.floor((maxx - self.origin_x) / self.cell_size))
+        y0 = int(np.floor((miny - self.origin_y) / self.cell_size))
+        y1 = int(np.floor((maxy - self.origin_y) / self.cell_size))
+        values = set(np.unique(self.cells[max(y0, 0):y1 + 1, max(x0, 0):x1 + 1]).tolist())
+        if x0 < 0 or y0 < 0 or x1 >= self.width or y1 >= self.height:
+            values.add(self.EMPTY)
+        if len(values) != 1:
+            return None
+        (value,) = values
+        return value if value >= self.EMPTY else None
+
+    def border_candidates(self, value):
+        k = -value - 2
+        return np.asarray(self.candidates[self.offsets[k]:self.offsets[k + 1]], dtype=np.int64)
+
+
+class WKBArray:
+    """
+    Geometries stored as concatenated WKB plus an int64 array of byte offsets,
+    memory-mapped for reading and parsed on demand.
+    """
+
+    def __init__(self, wkb_path, offsets_path):
+        self.offsets = np.load(offsets_path, mmap_mode="r")
+        self.wkb = np.memmap(wkb_path, dtype=np.uint8, mode="r")
+
+    @staticmethod
+    def write(wkb_path, offsets_path, geometries):
+        blobs = shapely.to_wkb(np.asarray(geometries, dtype=object))
+        offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(blob) for blob in blobs])
+        with open(wkb_path, "wb") as fh:
+            for blob in blobs:
+                fh.write(blob)
+        np.save(offsets_path, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def geometries(self, indices):
+        """Parse the geometries at the given record indices."""
+        blobs = [self.wkb[self.offsets[i]:self.offsets[i + 1]].tobytes() for i in indices]
+        return shapely.from_wkb(blobs)
+
+
+def write_compiled(directory, geometries, attributes, boundary_ids, source=None,
+                   grid_cell_size=DEFAULT_GRID_CELL_SIZE, layers=True):
+    """
+    Write the compiled artifact for the given geometries and attributes.
+
+    The manifest is written last, so readers never pick up a half-written artifact.
+    """
+    from .boundary_layers import write_layers  # uses WKBArray from this module
+    from .boundary_packs import write_packs
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    geometries = np.asarray(geometries, dtype=object)
+    WKBArray.write(os.path.join(directory, "geometries.wkb"), os.path.join(directory, "offsets.npy"), geometries)
+    np.save(os.path.join(directory, "bounds.npy"), shapely.bounds(geometries))
+    np.save(os.path.join(directory, "centroids.npy"), geometry_metrics(geometries)[:, :2])
+    np.save(os.path.join(directory, "boundary_ids.npy"), np.asarray(boundary_ids, dtype=np.int64))
+    with open(os.path.join(directory, "attributes.json"), "w", encoding="utf-8") as fh:
+        json.dump([[a[level] for level in ADMIN_LEVELS] for a in attributes], fh, ensure_ascii=False)
+
+    manifest = {
+        "format": COMPILED_FORMAT,
+        "count": len(attributes),
+        "source": os.path.basename(source) if source else None,
+        "created_at": timezone.now().isoformat(),
+    }
+    indptr, indices = build_adjacency(geometries)
+    np.save(os.path.join(directory, "adjacency_indptr.npy"), indptr)
+    np.save(os.path.join(directory, "adjacency_indices.npy"), indices)
+    manifest["adjacency"] = {"edges": len(indices) // 2, "tolerance": ADJACENCY_TOLERANCE}
+    if grid_cell_size:
+        manifest["grid"] = BoundaryGrid.build(geometries, grid_cell_size).save(directory)
+    if layers:
+        manifest["layers"] = write_layers(directory, geometries, attributes)
+        manifest["packs"] = write_packs(directory, geometries, attributes, boundary_ids)
+    with open(manifest_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+    return manifest
+
+
+def new_version_name(source=None):
+    """
+    Name for a new compiled version: UTC timestamp plus a digest of the source
+    shapefile, e.g. ``20260301T120000-3f2a9c1b``.
+    """
+    digest = hashlib.sha256()
+    if source:
+        for extension in (".shp", ".dbf"):
+            path = os.path.splitext(source)[0] + extension
+            if os.path.exists(path):
+                with open(path, "rb") as fh:
+                    for block in iter(lambda: fh.read(1 << 20), b""):
+                        digest.update(block)
+    return f"{timezone.now().strftime('%Y%m%dT%H%M%S')}-{digest.hexdigest()[:8]}"
+
+
+def version_dir(base, version):
+    return os.path.join(base, VERSIONS_DIR, version)
+
+
+def list_versions(base):
+    """Complete compiled versions under base, oldest first."""
+    root = os.path.join(base, VERSIONS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root) if os.path.exists(os.path.join(root, name, MANIFEST_FILE))
+    )
+
+
+def get_active_version(base):
+    """Name of the active version, or None when nothing has been activated."""
+    try:
+        with open(os.path.join(base, ACTIVE_FILE), encoding="utf-8") as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def activate_version(base, version):
+    """Atomically point ACTIVE at a compiled version."""
+    if not os.path.exists(os.path.join(version_dir(base, version), MANIFEST_FILE)):
+        raise FileNotFoundError(f"Compiled boundary version not found: {version}")
+    tmp_path = os.path.join(base, f".{ACTIVE_FILE}.{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write(version)
+    os.replace(tmp_path, os.path.join(base, ACTIVE_FILE))
+
+
+def prune_versions(base, keep):
+    """Delete all but the newest `keep` versions; the active one is always kept."""
+    active = get_active_version(base)
+    removed = []
+    for version in list_versions(base)[:-keep or None]:
+        if version != active:
+            shutil.rmtree(version_dir(base, version), ignore_errors=True)
+            removed.append(version)
+    return removed
+
+
+class CompiledBoundaries:
+    """
+    Read-only, memory-mapped view of a compiled boundary artifact.
+
+    ``directory`` is either a version directory or the compiled base
+    directory, in which case the active version is opened.
+    """
+
+    def __init__(self, directory):
+        active = get_active_version(directory)
+        if active is not None:
+            directory = version_dir(directory, active)
+        self.directory = directory
+        self.version = os.path.basename(os.path.normpath(directory))
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Compiled boundaries not found: {directory}")
+        with open(manifest_path, encoding="utf-8") as fh:
+            self.manifest = json.load(fh)
+        if self.manifest.get("format") != COMPILED_FORMAT:
+            raise ValueError(
+                f"Unsupported compiled boundary format {self.manifest.get('format')}, "
+                "run 'manage.py compile_boundaries' again"
+            )
+
+        with open(os.path.join(directory, "attributes.json"), encoding="utf-8") as fh:
+            self.attributes = [dict(zip(ADMIN_LEVELS, row)) for row in json.load(fh)]
+        self.bounds = np.load(os.path.join(directory, "bounds.npy"), mmap_mode="r")
+        self.centroids = np.load(os.path.join(directory, "centroids.npy"), mmap_mode="r")
+        self.boundary_ids = np.load(os.path.join(directory, "boundary_ids.npy"))
+        self.adjacency = (
+            np.load(os.path.join(directory, "adjacency_indptr.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "adjacency_indices.npy"), mmap_mode="r"),
+        )
+        self.wkb = WKBArray(os.path.join(directory, "geometries.wkb"), os.path.join(directory, "offsets.npy"))
+        grid_meta = self.manifest.get("grid")
+        self.grid = BoundaryGrid.load(directory, grid_meta) if grid_meta else None
+
+    @classmethod
+    def exists(cls, directory):
+        active = get_active_version(directory)
+        if active is not None:
+            directory = version_dir(directory, active)
+        return os.path.exists(os.path.join(directory, MANIFEST_FILE))
+
+    def __len__(self):
+        return len(self.attributes)
+
+    def geometries(self, indices):
+        """Parse the polygons at the given record indices from WKB."""
+        return self.wkb.geometries(indices)
@@ -0,0 +1,184 @@
+# Village/boundary_layers.py
+"""
+Simplified village boundary layers for map clients.
+
+``compile_boundaries`` simplifies the villages once per zoom tier as one
+coverage, so neighbours keep sharing their borders, trims the coordinate
+precision, and writes a pre-gzipped GeoJSON FeatureCollection per
+district and tier into ``<compiled>/layers``. Tiles are cut from the same
+simplified geometries on first request and memoized.
+"""
+import gzip
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+import shapely
+from shapely.geometry import mapping
+from django.utils.text import slugify
+
+from .boundaries import WKBArray
+
+LAYERS_DIR = "layers"
+
+# (tier, highest zoom served, simplify tolerance in degrees, coordinate decimals)
+ZOOM_TIERS = (
+    ("low", 9, 0.002, 4),
+    ("medium", 12, 0.0005, 5),
+    ("high", 22, 0.0001, 6),
+)
+TIER_NAMES = tuple(tier[0] for tier in ZOOM_TIERS)
+
+MIN_TILE_ZOOM = 8
+MAX_TILE_ZOOM = 18
+
+
+def tier_for_zoom(zoom):
+    for name, max_zoom, _, _ in ZOOM_TIERS:
+        if zoom <= max_zoom:
+            return name
+    return ZOOM_TIERS[-1][0]
+
+
+def simplify_geometries(geometries, tolerance, decimals):
+    """
+    Simplify the villages as one polygonal coverage, then round the coordinates.
+
+    Simplifying each polygon on its own keeps it valid but moves the two
+    copies of a shared border differently, leaving slivers of gap and overlap
+    between neighbours. Coverage simplification simplifies every shared edge
+    once, and rounding maps its identical vertices to identical values.
+    """
+    simplified = shapely.coverage_simplify(np.asarray(geometries, dtype=object), tolerance)
+    return shapely.transform(simplified, lambda coords: np.round(coords, decimals))
+
+
+def feature_collection(records, geometries, attributes):
+    """Compact GeoJSON FeatureCollection bytes for the given records."""
+    features = [
+        {
+            "type": "Feature",
+            "id": int(record),
+            "properties": dict(attributes[record], record=int(record)),
+            "geometry": mapping(geometry),
+        }
+        for record, geometry in zip(records, geometries)
+        if not geometry.is_empty
+    ]
+    return json.dumps(
+        {"type": "FeatureCollection", "features": features}, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def gzip_with_etag(body):
+    """Deterministically gzip a body and derive a strong ETag from its content."""
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    return compressed, hashlib.sha256(body).hexdigest()[:32]
+
+
+def write_layers(directory, geometries, attributes):
+    """
+    Write the simplified tiers and per-district GeoJSON; returns the manifest entry.
+    """
+    layers_dir = os.path.join(directory, LAYERS_DIR)
+    os.makedirs(layers_dir, exist_ok=True)
+
+    by_district = defaultdict(list)
+    for record, attribute in enumerate(attributes):
+        by_district[attribute["district"]].append(record)
+
+    manifest = {"tiers": {}, "districts": {}}
+    for name, max_zoom, tolerance, decimals in ZOOM_TIERS:
+        simplified = simplify_geometries(geometries, tolerance, decimals)
+        WKBArray.write(
+            os.path.join(layers_dir, f"{name}.wkb"), os.path.join(layers_dir, f"{name}_offsets.npy"), simplified
+        )
+        manifest["tiers"][name] = {"max_zoom": max_zoom, "tolerance": tolerance, "decimals": decimals}
+
+        for district, records in by_district.items():
+            body, etag = gzip_with_etag(feature_collection(records, simplified[records], attributes))
+            filename = f"{slugify(district)}.{name}.geojson.gz"
+            with open(os.path.join(layers_dir, filename), "wb") as fh:
+                fh.write(body)
+            manifest["districts"].setdefault(district, {})[name] = {
+                "file": filename,
+                "etag": etag,
+                "size": len(body),
+                "villages": len(records),
+            }
+    return manifest
+
+
+def tile_bounds(zoom, x, y):
+    """Lon/lat bounds of a web mercator (XYZ) tile."""
+    n = 2 ** zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+
+class BoundaryLayers:
+    """
+    Runtime access to the layers of a compiled boundary artifact.
+    """
+
+    TILE_CACHE_SIZE = 512
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.manifest = compiled.manifest.get("layers")
+        self.directory = os.path.join(compiled.directory, LAYERS_DIR)
+        self._tiers = {}
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return bool(self.manifest)
+
+    def districts(self):
+        return sorted(self.manifest["districts"])
+
+    def district(self, district, tier):
+        """(gzipped body, etag) of a district layer, or None for an unknown district."""
+        entry = self.manifest["districts"].get(district, {}).get(tier)
+        if entry is None:
+            return None
+        with open(os.path.join(self.directory, entry["file"]), "rb") as fh:
+            return fh.read(), entry["etag"]
+
+    def tier_geometries(self, tier, records):
+        with self._lock:
+            store = self._tiers.get(tier)
+            if store is None:
+                store = self._tiers[tier] = WKBArray(
+                    os.path.join(self.directory, f"{tier}.wkb"),
+                    os.path.join(self.directory, f"{tier}_offsets.npy"),
+                )
+        return store.geometries(records)
+
+    def tile(self, index, zoom, x, y):
+        """(gzipped body, etag) of a XYZ tile, memoized per worker."""
+        key = (zoom, x, y)
+        with self._lock:
+            cached = self._tiles.get(key)
+            if cached is not None:
+                self._tiles.move_to_end(key)
+                return cached
+
+        bounds = tile_bounds(zoom, x, y)
+        records = np.sort(index.tree.query(shapely.box(*bounds)))
+        geometries = shapely.clip_by_rect(self.tier_geometries(tier_for_zoom(zoom), records), *bounds)
+        result = gzip_with_etag(feature_collection(records, geometries, index.attributes))
+
+        with self._lock:
+            self._tiles[key] = result
+            while len(self._tiles) > self.TILE_CACHE_SIZE:
+                self._tiles.popitem(last=False)
+        return result
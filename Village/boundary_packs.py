@@ -0,0 +1,176 @@
+# Village/boundary_packs.py
+"""
+Compact per-district boundary packs for offline lookup in the mobile app.
+
+A pack is a gzipped JSON document holding the district's villages as
+polygons (simplified as one coverage, so neighbours still share their
+borders) with quantized, delta-encoded coordinates, plus a small
+grid over the district that lists the villages whose bbox touches each cell.
+A client finds the cell of a point, runs point-in-polygon on the few
+listed villages and only calls the server to confirm.
+
+Layout of a pack (all coordinates are integers, value / scale + origin):
+
+    {
+      "format": 1,
+      "district": "Burera",
+      "scale": 100000,                     # 1 unit = 1e-5 degree, ~1.1 m
+      "origin": [lon, lat],                # south-west corner of the district
+      "villages": [
+        {"record": 12, "boundary_id": 1021, "province": ..., "village": ...,
+         "bbox": [x0, y0, x1, y1],
+         "polygons": [[ring, ...], ...]}   # ring: [x0, y0, dx1, dy1, dx2, dy2, ...]
+      ],
+      "grid": {"cell": 0.01, "cols": 8, "rows": 6,
+               "offsets": [...], "items": [...]}   # CSR: cell i -> items[offsets[i]:offsets[i+1]]
+    }
+
+Packs are written by ``compile_boundaries`` and named by a hash of their
+content, so an unchanged district keeps its URL across boundary versions
+and can be cached forever.
+"""
+import json
+import os
+from collections import defaultdict
+
+import numpy as np
+import shapely
+from django.utils.text import slugify
+
+from .boundary_layers import gzip_with_etag, simplify_geometries
+
+PACKS_DIR = "packs"
+PACK_FORMAT = 1
+# Coordinates are rounded to the pack grid before encoding, so a vertex shared
+# by two districts quantizes the same whatever each pack's origin
+PACK_DECIMALS = 5
+PACK_SCALE = 10 ** PACK_DECIMALS
+PACK_TOLERANCE = 0.0001
+# Upper bound on grid cells per axis; cells are at least PACK_MIN_CELL degrees
+PACK_GRID_MAX_CELLS = 64
+PACK_MIN_CELL = 0.005
+
+
+def encode_ring(coords, origin):
+    """Quantize a ring relative to origin and delta-encode it as a flat int list."""
+    quantized = np.round((np.asarray(coords)[:, :2] - origin) * PACK_SCALE).astype(np.int64)
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+    return deltas.ravel().tolist()
+
+
+def encode_polygons(geometry, origin):
+    polygons = shapely.get_parts(geometry)
+    return [
+        [encode_ring(polygon.exterior.coords, origin)]
+        + [encode_ring(interior.coords, origin) for interior in polygon.interiors]
+        for polygon in polygons
+        if not polygon.is_empty
+    ]
+
+
+def pack_grid(bounds, origin, extent):
+    """CSR grid over the district listing the villages whose bbox touches each cell."""
+    width, height = extent[2] - origin[0], extent[3] - origin[1]
+    cell = max(PACK_MIN_CELL, width / PACK_GRID_MAX_CELLS, height / PACK_GRID_MAX_CELLS)
+    cols = max(1, int(np.ceil(width / cell)))
+    rows = max(1, int(np.ceil(height / cell)))
+
+    cells = defaultdict(list)
+    for position, (minx, miny, maxx, maxy) in enumerate(bounds.tolist()):
+        col0, col1 = int((minx - origin[0]) // cell), int((maxx - origin[0]) // cell)
+        row0, row1 = int((miny - origin[1]) // cell), int((maxy - origin[1]) // cell)
+        for row in range(max(row0, 0), min(row1, rows - 1) + 1):
+            for col in range(max(col0, 0), min(col1, cols - 1) + 1):
+                cells[row * cols + col].append(position)
+
+    offsets, items = [0], []
+    for i in range(rows * cols):
+        items.extend(cells.get(i, []))
+        offsets.append(len(items))
+    return {"cell": cell, "cols": cols, "rows": rows, "offsets": offsets, "items": items}
+
+
+def build_pack(district, records, simplified, attributes, boundary_ids):
+    """Pack JSON bytes for one district, from the simplified geometries of its records."""
+    bounds = shapely.bounds(simplified)
+    extent = (bounds[:, 0].min(), bounds[:, 1].min(), bounds[:, 2].max(), bounds[:, 3].max())
+    origin = np.floor(np.array(extent[:2]) * PACK_SCALE) / PACK_SCALE
+
+    villages = []
+    for record, geometry, bbox in zip(records, simplified, bounds):
+        quantized_bbox = np.round((bbox.reshape(2, 2) - origin) * PACK_SCALE).astype(np.int64).ravel()
+        villages.append(dict(
+            attributes[record],
+            record=int(record),
+            boundary_id=int(boundary_ids[record]),
+            bbox=quantized_bbox.tolist(),
+            polygons=encode_polygons(geometry, origin),
+        ))
+
+    pack = {
+        "format": PACK_FORMAT,
+        "district": district,
+        "scale": PACK_SCALE,
+        "origin": origin.tolist(),
+        "villages": villages,
+        "grid": pack_grid(bounds, origin, extent),
+    }
+    return json.dumps(pack, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def write_packs(directory, geometries, attributes, boundary_ids):
+    """Write one content-hashed pack per district; returns the manifest entry."""
+    packs_dir = os.path.join(directory, PACKS_DIR)
+    os.makedirs(packs_dir, exist_ok=True)
+
+    by_district = defaultdict(list)
+    for record, attribute in enumerate(attributes):
+        by_district[attribute["district"]].append(record)
+
+    # Simplified together, so borders shared across districts match as well
+    simplified = simplify_geometries(geometries, PACK_TOLERANCE, PACK_DECIMALS)
+    manifest = {"format": PACK_FORMAT, "districts": {}}
+    for district, records in sorted(by_district.items()):
+        body, content_hash = gzip_with_etag(
+            build_pack(district, records, simplified[records], attributes, boundary_ids)
+        )
+        content_hash = content_hash[:16]
+        filename = f"{slugify(district)}.{content_hash}.json.gz"
+        with open(os.path.join(packs_dir, filename), "wb") as fh:
+            fh.write(body)
+        manifest["districts"][district] = {
+            "slug": slugify(district),
+            "hash": content_hash,
+            "file": filename,
+            "size": len(body),
+            "villages": len(records),
+        }
+    return manifest
+
+
+class BoundaryPacks:
+    """
+    Runtime access to the packs of a compiled boundary artifact.
+    """
+
+    def __init__(self, compiled):
+        self.manifest = compiled.manifest.get("packs")
+        self.directory = os.path.join(compiled.directory, PACKS_DIR)
+        self._by_slug = {
+            entry["slug"]: entry for entry in (self.manifest or {}).get("districts", {}).values()
+        }
+
+    @property
+    def available(self):
+        return bool(self.manifest)
+
+    def districts(self):
+        return self.manifest["districts"]
+
+    def pack(self, slug, content_hash):
+        """(gzipped body, hash) of a pack, or None when the slug or hash is not current."""
+        entry = self._by_slug.get(slug)
+        if entry is None or entry["hash"] != content_hash:
+            return None
+        with open(os.path.join(self.directory, entry["file"]), "rb") as fh:
+            return fh.read(), entry["hash"]
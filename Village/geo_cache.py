@@ -0,0 +1,127 @@
+# Village/geo_cache.py
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_LOCATE_CACHE = {
+    "PRECISION": 4,     # decimal places kept in the key; 4 is ~11 m
+    "SIZE": 10000,      # entries kept per worker
+    "SHARED": False,    # also keep results in the default Django cache, shared by all workers
+    "TIMEOUT": 60 * 60 * 24,
+}
+
+# Stored for points outside every village so misses are cached too; also what
+# VillageBoundaryIndex.locate_box returns for a cell outside all of them
+OUTSIDE = -1
+
+
+class LocateCache:
+    """
+    Bounded LRU cache of point lookups keyed on rounded coordinates.
+
+    A rounded key only answers for the ~10 m cell around it when the index
+    says the whole cell lies in one village (or outside all of them). Points
+    in a cell that crosses a border are looked up exactly and not cached, so
+    a point just inside a border never takes its neighbour's answer.
+    """
+
+    def __init__(self, precision=4, size=10000, shared=False, timeout=None):
+        self.precision = precision
+        self.size = size
+        self.shared = shared
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def quantize(self, longitude, latitude):
+        return round(longitude, self.precision), round(latitude, self.precision)
+
+    def locate_record(self, index, longitude, latitude):
+        """Cached VillageBoundaryIndex.locate_record."""
+        rounded_longitude, rounded_latitude = self.quantize(longitude, latitude)
+        key = (index.version, rounded_longitude, rounded_latitude)
+
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return None if record == OUTSIDE else record
+
+        shared_key = f"village-locate:{index.version}:{rounded_longitude}:{rounded_latitude}"
+        record = cache.get(shared_key) if self.shared else None
+        if record is not None:
+            with self._lock:
+                self.shared_hits += 1
+        else:
+            half = 0.5 * 10 ** -self.precision
+            record = index.locate_box(
+                rounded_longitude - half, rounded_latitude - half,
+                rounded_longitude + half, rounded_latitude + half,
+            )
+            with self._lock:
+                self.misses += 1
+            if record is None:
+                # Border cell: the rounded key would not hold for every point in it
+                return index.locate_record(longitude, latitude)
+            if self.shared:
+                cache.set(shared_key, record, self.timeout)
+
+        with self._lock:
+            self._entries[key] = record
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return None if record == OUTSIDE else record
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "precision": self.precision,
+                "max_size": self.size,
+                "size": len(self._entries),
+                "shared": self.shared,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else None,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.shared_hits = self.misses = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_locate_cache():
+    """
+    Return the per-worker locate cache configured by settings.VILLAGE_LOCATE_CACHE.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = {**DEFAULT_LOCATE_CACHE, **getattr(settings, "VILLAGE_LOCATE_CACHE", {})}
+                _cache = LocateCache(
+                    precision=config["PRECISION"],
+                    size=config["SIZE"],
+                    shared=config["SHARED"],
+                    timeout=config["TIMEOUT"],
+                )
+    return _cache
+
+
+def reset_locate_cache():
+    global _cache
+    with _cache_lock:
+        _cache = None
@@ -0,0 +1,530 @@
+# Village/geo_index.py
+import logging
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import shapely
+from shapely import affinity
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .boundary_layers import BoundaryLayers
+from .boundary_packs import BoundaryPacks
+from .boundaries import (
+    METERS_PER_DEGREE,
+    CompiledBoundaries,
+    build_adjacency,
+    geometry_metrics,
+    get_active_version,
+    get_compiled_dir,
+    get_shapefile_path,
+    read_shapefile,
+    version_dir,
+)
+
+logger = logging.getLogger(__name__)
+
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def haversine_m(lon1, lat1, lon2, lat2):
+    """Great-circle distance in meters; vectorized over numpy arrays."""
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype=float)) for v in (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def circle_around(longitude, latitude, radius_m):
+    """Polygon approximating a circle of radius_m meters in lon/lat degrees."""
+    radius = radius_m / METERS_PER_DEGREE
+    circle = shapely.Point(longitude, latitude).buffer(radius, quad_segs=16)
+    return affinity.scale(circle, xfact=1 / math.cos(math.radians(latitude)), origin=(longitude, latitude))
+
+
+class VillageBoundaryIndex:
+    """
+    Village polygons behind a shapely STRtree.
+
+    The tree is built over the polygon bounding boxes, so a point lookup is a
+    bounding box probe followed by exact containment tests on the (usually one
+    or two) candidates. Polygons are prepared once; when the index is backed by
+    a compiled artifact they are parsed from WKB the first time they are needed.
+
+    Records are linked to their Village rows through the shapefile ID_5
+    (``Village.boundary_id``), so a lookup yields the row's primary key
+    without matching on names.
+    """
+
+    def __init__(self, attributes, bounds, geometries=None, source=None, grid=None, layers=None, version=None,
+                 boundary_ids=None, centroids=None, adjacency=None, packs=None):
+        self.attributes = list(attributes)
+        self.bounds = np.asarray(bounds, dtype=float)
+        # (n, 2) lon, lat; falls back to the bbox centres when not given
+        self.centroids = (
+            np.asarray(centroids, dtype=float) if centroids is not None
+            else (self.bounds[:, :2] + self.bounds[:, 2:]) / 2
+        )
+        self.boundary_ids = (
+            np.asarray(boundary_ids, dtype=np.int64) if boundary_ids is not None
+            else np.full(len(self.attributes), -1, dtype=np.int64)
+        )
+        # (indptr, indices) CSR neighbour lists; computed on first use when not compiled
+        self._adjacency = adjacency
+        self._adjacency_lock = threading.Lock()
+        self._boundary_order = None
+        # record -> Village pk (-1 when not linked) and village_id; built by link_villages
+        self._village_pks = None
+        self._village_uuids = None
+        self._link_lock = threading.Lock()
+        self.source = source
+        self.grid = grid
+        # Simplified map layers and offline packs; only available from a compiled artifact
+        self.layers = layers if layers is not None and layers.available else None
+        self.packs = packs if packs is not None and packs.available else None
+        # Identifies the boundary data this index was built from (cache keys, responses)
+        self.version = version
+        if geometries is None:
+            self._geometries = np.full(len(self.attributes), None, dtype=object)
+        else:
+            self._geometries = np.asarray(geometries, dtype=object)
+            shapely.prepare(self._geometries)
+        self.tree = shapely.STRtree(shapely.box(*self.bounds.T))
+
+    @classmethod
+    def from_shapefile(cls, path=None):
+        path = path or get_shapefile_path()
+        geometries, attributes, boundary_ids = read_shapefile(path)
+        geometries = np.asarray(geometries, dtype=object)
+        version = f"shp-{os.stat(path).st_mtime_ns}"
+        return cls(
+            attributes,
+            shapely.bounds(geometries),
+            geometries=geometries,
+            version=version,
+            boundary_ids=boundary_ids,
+            centroids=geometry_metrics(geometries)[:, :2],
+        )
+
+    @classmethod
+    def from_compiled(cls, directory=None):
+        compiled = CompiledBoundaries(directory or get_compiled_dir())
+        return cls(
+            compiled.attributes,
+            compiled.bounds,
+            source=compiled,
+            grid=compiled.grid,
+            layers=BoundaryLayers(compiled),
+            packs=BoundaryPacks(compiled),
+            version=compiled.version,
+            boundary_ids=compiled.boundary_ids,
+            centroids=compiled.centroids,
+            adjacency=compiled.adjacency,
+        )
+
+    def __len__(self):
+        return len(self.attributes)
+
+    def geometries(self, indices):
+        """Return the prepared polygons at the given record indices."""
+        indices = np.asarray(indices, dtype=np.int64)
+        missing = np.unique(indices[shapely.is_missing(self._geometries[indices])])
+        if len(missing):
+            parsed = self.source.geometries(missing.tolist())
+            shapely.prepare(parsed)
+            self._geometries[missing] = parsed
+        return self._geometries[indices]
+
+    @property
+    def adjacency(self):
+        if self._adjacency is None:
+            with self._adjacency_lock:
+                if self._adjacency is None:
+                    self._adjacency = build_adjacency(self.geometries(np.arange(len(self))))
+        return self._adjacency
+
+    def neighbours(self, record, hops=1):
+        """
+        (records, hops) of the villages within `hops` borders of a record,
+        ring by ring, sorted by record within a ring. Reads only the
+        adjacency arrays, never the polygons.
+        """
+        indptr, indices = self.adjacency
+        seen = np.zeros(len(self), dtype=bool)
+        seen[record] = True
+        frontier = np.array([record])
+        rings, ring_hops = [], []
+        for hop in range(1, hops + 1):
+            reached = np.concatenate([indices[indptr[r]:indptr[r + 1]] for r in frontier.tolist()])
+            reached = np.unique(reached.astype(np.int64))
+            reached = reached[~seen[reached]]
+            if not len(reached):
+                break
+            seen[reached] = True
+            rings.append(reached)
+            ring_hops.append(np.full(len(reached), hop))
+            frontier = reached
+        if not rings:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rings), np.concatenate(ring_hops)
+
+    def record_for_boundary_id(self, boundary_id):
+        """Record index of the village with the given shapefile ID_5, or None."""
+        if self._boundary_order is None:
+            self._boundary_order = np.argsort(self.boundary_ids, kind="stable")
+        order = self._boundary_order
+        position = int(np.searchsorted(self.boundary_ids, boundary_id, sorter=order))
+        if position < len(order) and self.boundary_ids[order[position]] == boundary_id:
+            return int(order[position])
+        return None
+
+    def link_villages(self):
+        """
+        Map every record to its Village row with a single query on boundary_id.
+
+        Returns the number of linked records. Rows get their boundary_id from
+        load_villages; records without a row stay unlinked.
+        """
+        from .models import Village
+
+        rows = list(
+            Village.objects.filter(boundary_id__isnull=False).values_list("boundary_id", "pk", "village_id")
+        )
+        pks = np.full(len(self), -1, dtype=np.int64)
+        uuids = np.full(len(self), None, dtype=object)
+        linked = 0
+        if rows and len(self):
+            row_boundary_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            order = np.argsort(self.boundary_ids, kind="stable")
+            positions = np.searchsorted(self.boundary_ids, row_boundary_ids, sorter=order)
+            records = order[np.minimum(positions, len(order) - 1)]
+            matched = self.boundary_ids[records] == row_boundary_ids
+            pks[records[matched]] = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))[matched]
+            uuids[records[matched]] = np.array([row[2] for row in rows], dtype=object)[matched]
+            linked = int(matched.sum())
+        self._village_uuids = uuids
+        self._village_pks = pks
+        return linked
+
+    def _ensure_linked(self):
+        if self._village_pks is None:
+            with self._link_lock:
+                if self._village_pks is None:
+                    self.link_villages()
+
+    def village_keys(self, record):
+        """(pk, village_id) of the Village row linked to a record, or None."""
+        self._ensure_linked()
+        pk = int(self._village_pks[record])
+        if pk < 0:
+            return None
+        return pk, self._village_uuids[record]
+
+    def village_ids(self, records):
+        """village_id of each record's Village row (None where unlinked or record is -1)."""
+        self._ensure_linked()
+        records = np.asarray(records, dtype=np.int64)
+        village_ids = np.full(len(records), None, dtype=object)
+        found = records >= 0
+        village_ids[found] = self._village_uuids[records[found]]
+        return village_ids
+
+    def set_village_keys(self, record, pk, village_id):
+        """Link a record to a Village row created after the mapping was built."""
+        self.village_keys(record)
+        self._village_uuids[record] = village_id
+        self._village_pks[record] = pk
+
+    def locate_record(self, longitude, latitude):
+        """Return the index of the polygon containing the point, or None."""
+        if self.grid is not None:
+            value = self.grid.lookup(longitude, latitude)
+            if value >= 0:
+                return value
+            if value == self.grid.EMPTY:
+                return None
+            candidates = self.grid.border_candidates(value)
+        else:
+            candidates = self.tree.query(shapely.points(longitude, latitude))
+        if not len(candidates):
+            return None
+        hits = candidates[shapely.contains_xy(self.geometries(candidates), longitude, latitude)]
+        # Keep the first-match semantics of the old sequential scan
+        return int(hits.min()) if len(hits) else None
+
+    def locate_box(self, minx, miny, maxx, maxy):
+        """
+        The record containing every point of the box, -1 when the box lies
+        outside every village, or None when it crosses a border.
+        """
+        if self.grid is not None:
+            return self.grid.box_value(minx, miny, maxx, maxy)
+        box = shapely.box(minx, miny, maxx, maxy)
+        candidates = self.tree.query(box)
+        touching = candidates[shapely.intersects(self.geometries(candidates), box)]
+        if not len(touching):
+            return -1
+        # Same rule as a grid interior cell: one polygon touches the box and contains it
+        if len(touching) == 1 and shapely.contains_properly(self.geometries(touching)[0], box):
+            return int(touching[0])
+        return None
+
+    def locate_many(self, longitudes, latitudes):
+        """
+        Vectorized lookup for many points.
+
+        Returns an int array aligned with the input holding the record index
+        of the containing polygon, or -1 where no polygon contains the point.
+        """
+        longitudes = np.asarray(longitudes, dtype=float)
+        latitudes = np.asarray(latitudes, dtype=float)
+        records = np.full(len(longitudes), len(self), dtype=np.int64)
+
+        if self.grid is not None:
+            values = self.grid.lookup_many(longitudes, latitudes)
+            interior = values >= 0
+            records[interior] = values[interior]
+            # Only border cells need the exact polygon tests below
+            pending = np.flatnonzero(values <= -2)
+        else:
+            pending = np.arange(len(longitudes))
+
+        point_idx, tree_idx = self.tree.query(shapely.points(longitudes[pending], latitudes[pending]))
+        if len(point_idx):
+            point_idx = pending[point_idx]
+            inside = shapely.contains_xy(
+                self.geometries(tree_idx), longitudes[point_idx], latitudes[point_idx]
+            )
+            # Lowest record wins where polygons overlap, as in locate_record
+            np.minimum.at(records, point_idx[inside], tree_idx[inside])
+
+        records[records == len(self)] = -1
+        return records
+
+    def nearest(self, longitude, latitude, max_distance_m):
+        """
+        Return (record, distance_m) of the village closest to the point within
+        max_distance_m, or None. Points inside a village have distance 0.
+        """
+        search_area = circle_around(longitude, latitude, max_distance_m)
+        candidates = self.tree.query(search_area)
+        if not len(candidates):
+            return None
+
+        lines = shapely.shortest_line(self.geometries(candidates), shapely.points(longitude, latitude))
+        ends = shapely.get_coordinates(lines).reshape(-1, 2, 2)
+        distances = haversine_m(ends[:, 0, 0], ends[:, 0, 1], ends[:, 1, 0], ends[:, 1, 1])
+        best = int(np.argmin(distances))
+        if distances[best] > max_distance_m:
+            return None
+        return int(candidates[best]), float(distances[best])
+
+    def nearest_centroids(self, longitude, latitude, k=None, radius_m=None):
+        """
+        (records, distances_m) of the villages whose centroids are closest to
+        the point, nearest first: the k nearest, all within radius_m, or the k
+        nearest within radius_m. One vectorized haversine pass over the
+        centroids, narrowed to the radius' bounding box first when given.
+        """
+        candidates = np.arange(len(self))
+        if radius_m is not None:
+            dlat = radius_m / METERS_PER_DEGREE
+            dlon = dlat / max(math.cos(math.radians(latitude)), 1e-6)
+            longitudes, latitudes = self.centroids[:, 0], self.centroids[:, 1]
+            candidates = np.flatnonzero(
+                (np.abs(latitudes - latitude) <= dlat) & (np.abs(longitudes - longitude) <= dlon)
+            )
+
+        centroids = self.centroids[candidates]
+        distances = haversine_m(longitude, latitude, centroids[:, 0], centroids[:, 1])
+        if radius_m is not None:
+            within = distances <= radius_m
+            candidates, distances = candidates[within], distances[within]
+        if k is not None and k < len(candidates):
+            nearest = np.argpartition(distances, k - 1)[:k]
+            candidates, distances = candidates[nearest], distances[nearest]
+
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def villages_within(self, longitude, latitude, radius_m):
+        """
+        Villages intersecting the circle of radius_m around the point, as
+        (record, overlap) pairs sorted by the share of the circle they cover.
+        """
+        circle = circle_around(longitude, latitude, radius_m)
+        candidates = self.tree.query(circle)
+        if not len(candidates):
+            return []
+
+        geometries = self.geometries(candidates)
+        touching = shapely.intersects(geometries, circle)
+        candidates, geometries = candidates[touching], geometries[touching]
+        overlap = shapely.area(shapely.intersection(geometries, circle)) / circle.area
+        order = np.lexsort((candidates, -overlap))
+        return [(int(candidates[i]), float(overlap[i])) for i in order]
+
+    def locate(self, longitude, latitude):
+        """Return the administrative names of the village containing the point, or None."""
+        record = self.locate_record(longitude, latitude)
+        if record is None:
+            return None
+        return dict(self.attributes[record])
+
+
+def neighbouring_villages(village, hops=1):
+    """
+    Queryset of the Village rows within `hops` borders of a village (unordered).
+    Empty when the village is not linked to a boundary.
+    """
+    from .models import Village
+
+    index = get_village_index()
+    record = index.record_for_boundary_id(village.boundary_id) if village.boundary_id is not None else None
+    if record is None:
+        return Village.objects.none()
+    records, _ = index.neighbours(record, hops)
+    return Village.objects.filter(boundary_id__in=index.boundary_ids[records].tolist())
+
+
+def load_village_index():
+    """
+    Build an index from the compiled artifact when present, else from the shapefile.
+    """
+    if CompiledBoundaries.exists(get_compiled_dir()):
+        return VillageBoundaryIndex.from_compiled()
+    return VillageBoundaryIndex.from_shapefile()
+
+
+_index = None
+_index_lock = threading.Lock()
+_index_ready = threading.Event()
+
+# Hot reload of newly activated compiled versions
+_reload_lock = threading.Lock()
+_reload_thread = None
+_last_version_check = 0.0
+_failed_version = None
+
+
+def get_village_index():
+    """
+    Return the process-wide village index, loading it on first use.
+
+    Every VILLAGE_BOUNDARY_RELOAD_INTERVAL seconds a call also checks whether
+    another compiled version has been activated (see check_for_new_version).
+    """
+    global _index, _last_version_check
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_village_index()
+                _last_version_check = time.monotonic()
+    else:
+        interval = getattr(settings, "VILLAGE_BOUNDARY_RELOAD_INTERVAL", 30)
+        if interval and time.monotonic() - _last_version_check >= interval:
+            check_for_new_version()
+    return _index
+
+
+def reset_village_index():
+    """Drop the loaded index so the next lookup reloads it (tests, data reloads)."""
+    global _index, _failed_version
+    with _index_lock:
+        _index = None
+        _failed_version = None
+        _index_ready.clear()
+
+
+def _warm(index):
+    index.geometries(np.arange(len(index)))
+    try:
+        index.link_villages()
+    except DatabaseError:
+        # e.g. before the first migrate; the mapping is then built on first use
+        pass
+
+
+def warm_village_index():
+    """
+    Load the index and parse every polygon now instead of on first use.
+
+    Run in the gunicorn master before it forks (preload_app), the workers
+    inherit the warm index and share its pages copy-on-write.
+    """
+    index = get_village_index()
+    _warm(index)
+    _index_ready.set()
+    return index
+
+
+def check_for_new_version(background=True):
+    """
+    Start loading the active compiled version if it is not the one being served.
+
+    The new index is loaded and warmed off the request path (in a thread
+    unless background is False), then published with a single reference
+    swap. Requests already holding the old index finish on it. Returns the
+    version being loaded, or None.
+    """
+    global _reload_thread, _last_version_check
+    if not _reload_lock.acquire(blocking=False):
+        return None
+    try:
+        _last_version_check = time.monotonic()
+        index = _index
+        active = get_active_version(get_compiled_dir())
+        if index is None or active is None or active in (index.version, _failed_version):
+            return None
+        if _reload_thread is not None and _reload_thread.is_alive():
+            return None
+        if background:
+            _reload_thread = threading.Thread(
+                target=_reload, args=(active, True), name="village-index-reload", daemon=True
+            )
+            _reload_thread.start()
+        else:
+            _reload(active)
+        return active
+    finally:
+        _reload_lock.release()
+
+
+def _reload(version, in_thread=False):
+    global _index, _failed_version
+    try:
+        index = VillageBoundaryIndex.from_compiled(version_dir(get_compiled_dir(), version))
+        _warm(index)
+    except Exception:
+        # Keep serving the current version; don't retry this one on every check
+        _failed_version = version
+        logger.exception("Loading boundary version %s failed", version)
+        return
+    finally:
+        if in_thread:
+            # Database connections are per thread; don't leave this one open
+            connections.close_all()
+    with _index_lock:
+        _index = index
+    logger.info("Switched to boundary version %s (%d villages)", version, len(index))
+
+
+def is_village_index_ready():
+    """True once the index has been loaded and warmed in this process (warm_village_index)."""
+    return _index_ready.is_set()
+
+
+def village_index_status():
+    index = _index
+    return {
+        "ready": is_village_index_ready(),
+        "loaded": index is not None,
+        "villages": len(index) if index is not None else None,
+        "compiled": index.source is not None if index is not None else None,
+        "boundary_version": index.version if index is not None else None,
+        "active_version": get_active_version(get_compiled_dir()),
+        "pid": os.getpid(),
+    }
@@ -0,0 +1,178 @@
+# Village/hierarchy.py
+"""
+In-memory province → district → sector → cell → village tree.
+
+Each worker builds the tree with one query and serves every level of the
+registration dropdowns from it. Village post_save/post_delete signals (and
+load_villages, which writes in bulk) bump a version key in the Django cache;
+a worker rebuilds its tree when that version no longer matches. Only a shared
+cache (CACHE_REDIS_URL) carries a bump to the other workers, so with the
+local-memory cache a tree is also rebuilt once it is
+settings.VILLAGE_HIERARCHY_MAX_AGE seconds old and other workers see a change
+within that time.
+
+The same tree also renders the whole hierarchy as one gzipped snapshot
+document and backs the village name typeahead; both are built on first use
+of a tree, so once per change to the Village table.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .boundary_layers import gzip_with_etag
+from .village_search import VillageNameIndex
+
+VERSION_CACHE_KEY = "village-hierarchy-version"
+SNAPSHOT_FORMAT = 1
+# Used when settings.VILLAGE_HIERARCHY_MAX_AGE is missing, which says nothing about the cache
+DEFAULT_HIERARCHY_MAX_AGE = 60
+
+
+def get_hierarchy_version():
+    """Current version of the Village table as seen through the cache."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, 1, timeout=None)
+        version = cache.get(VERSION_CACHE_KEY) or 0
+    return version
+
+
+def is_within_max_age(built_at):
+    """Whether a tree (or village registry) built at built_at may still be served."""
+    max_age = getattr(settings, "VILLAGE_HIERARCHY_MAX_AGE", DEFAULT_HIERARCHY_MAX_AGE)
+    return max_age is None or time.monotonic() - built_at < max_age
+
+
+def bump_hierarchy_version():
+    """Invalidate every worker's tree; called whenever Village rows change."""
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        # Key missing (evicted or never read): any new value differs from what workers hold
+        cache.set(VERSION_CACHE_KEY, 2, timeout=None)
+
+
+class HierarchyTree:
+    """
+    Pre-sorted children of every node, keyed by the path of names leading to it:
+    () → provinces, (province,) → districts, ... and (province, district,
+    sector, cell) → [{"village_id", "village"}, ...].
+    """
+
+    __slots__ = ("version", "built_at", "children", "_snapshot", "_name_index")
+
+    def __init__(self, rows, version):
+        self.version = version
+        self.built_at = time.monotonic()
+        nested = {}
+        for province, district, sector, cell, village, village_id in rows:
+            nested.setdefault(province, {}).setdefault(district, {}).setdefault(sector, {}) \
+                .setdefault(cell, []).append({"village_id": village_id, "village": village})
+
+        children = {(): sorted(nested)}
+        for province, districts in nested.items():
+            children[(province,)] = sorted(districts)
+            for district, sectors in districts.items():
+                children[(province, district)] = sorted(sectors)
+                for sector, cells in sectors.items():
+                    children[(province, district, sector)] = sorted(cells)
+                    for cell, villages in cells.items():
+                        children[(province, district, sector, cell)] = sorted(
+                            villages, key=lambda v: v["village"]
+                        )
+        self.children = children
+        self._snapshot = None
+        self._name_index = None
+
+    @classmethod
+    def from_database(cls, version):
+        from .models import Village
+
+        rows = Village.objects.values_list("province", "district", "sector", "cell", "village", "village_id")
+        return cls(rows, version)
+
+    def is_current(self, version):
+        """Whether the tree matches the Village version and is within the max age."""
+        return self.version == version and is_within_max_age(self.built_at)
+
+    def get(self, *path):
+        """Sorted children under a path of names; empty for an unknown path."""
+        return self.children.get(path, [])
+
+    def as_document(self):
+        """
+        The whole tree as nested levels:
+
+            {"format": 1, "provinces": [{"name": ..., "districts": [{"name": ...,
+              "sectors": [{"name": ..., "cells": [{"name": ...,
+              "villages": [{"village_id": ..., "village": ...}]}]}]}]}]}
+        """
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "provinces": [
+                {"name": province, "districts": [
+                    {"name": district, "sectors": [
+                        {"name": sector, "cells": [
+                            {"name": cell, "villages": self.get(province, district, sector, cell)}
+                            for cell in self.get(province, district, sector)
+                        ]}
+                        for sector in self.get(province, district)
+                    ]}
+                    for district in self.get(province)
+                ]}
+                for province in self.get()
+            ],
+        }
+
+    def snapshot(self):
+        """(gzipped JSON body, ETag) of the whole tree, rendered on first use."""
+        if self._snapshot is None:
+            body = json.dumps(
+                self.as_document(), cls=DjangoJSONEncoder, separators=(",", ":"), ensure_ascii=False
+            ).encode("utf-8")
+            self._snapshot = gzip_with_etag(body)
+        return self._snapshot
+
+    def villages(self):
+        """Every village with its province, district, sector and cell."""
+        for path, children in self.children.items():
+            if len(path) == 4:
+                province, district, sector, cell = path
+                for village in children:
+                    yield dict(village, province=province, district=district, sector=sector, cell=cell)
+
+    def name_index(self):
+        """Typeahead index over the village names, built on first use."""
+        if self._name_index is None:
+            self._name_index = VillageNameIndex(list(self.villages()))
+        return self._name_index
+
+
+_tree = None
+_tree_lock = threading.Lock()
+
+
+def get_hierarchy():
+    """
+    Return this worker's hierarchy tree, rebuilding it if Village rows changed
+    or it is older than settings.VILLAGE_HIERARCHY_MAX_AGE.
+    """
+    global _tree
+    version = get_hierarchy_version()
+    tree = _tree
+    if tree is None or not tree.is_current(version):
+        with _tree_lock:
+            if _tree is None or not _tree.is_current(version):
+                _tree = HierarchyTree.from_database(version)
+            tree = _tree
+    return tree
+
+
+def reset_hierarchy():
+    global _tree
+    with _tree_lock:
+        _tree = None
@@ -1,26 +1,87 @@
+from django.urls import reverse
+from kombu.exceptions import OperationalError as BrokerError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-from .serializers import LocatePointSerializer
-import shapefile
-from shapely.geometry import Point, shape
-import os
+from .serializers import (
+    LocatePointSerializer,
+    LocatePointBatchSerializer,
+    JoinVillageByCoordinatesSerializer,
+    NearbyVillagesSerializer,
+    VillageNeighboursSerializer,
+    GeocodingUploadSerializer,
+    GeocodingJobSerializer,
+)
 from event.utils import success_response, error_response
-from rest_framework.views import APIView
-from rest_framework import status
-from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse
-from drf_spectacular.types import OpenApiTypes
-from shapely.geometry import Point, shape
-import shapefile, os
-from event.utils import success_response, error_response
-from .models import Village
+from .geo_index import get_village_index, is_village_index_ready, village_index_status, warm_village_index
+from .geo_cache import get_locate_cache
+from .permissions import IsSystemAdmin
+from .boundaries import ADMIN_LEVELS
+from .boundary_layers import MAX_TILE_ZOOM, MIN_TILE_ZOOM, TIER_NAMES, tier_for_zoom
+from .utils import gzipped_response
+from .models import GeocodingJob, Village
+from .tasks import geocode_csv
 from Resident.models import Resident
 from Resident.serializers import ResidentSerializer
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser, FormParser
 
 from Resident.tasks import notify_village_leader_new_resident
+from event.query_budget import query_budget
+
+def village_payload(index, index_record, **extra):
+    """Administrative names of a record plus the village_id of its Village row (None if not loaded)."""
+    keys = index.village_keys(index_record)
+    return dict(index.attributes[index_record], village_id=keys[1] if keys else None, **extra)
+
+
+def village_for_record(index, record):
+    """
+    The Village row of a shapefile record, fetched by the primary key held in
+    the index. A record whose row load_villages has not linked yet is matched
+    on its names, like load_villages does, and only gets a new row, keyed on
+    its boundary_id, when no village of that name exists.
+    """
+    keys = index.village_keys(record)
+    if keys is not None:
+        village = Village.objects.select_related("leader").filter(pk=keys[0]).first()
+        if village is not None:
+            return village
+    boundary_id = int(index.boundary_ids[record])
+    attributes = index.attributes[record]
+    village = Village.objects.select_related("leader").filter(boundary_id=boundary_id).first()
+    if village is None:
+        unlinked = Village.objects.filter(
+            boundary_id__isnull=True, **{level: attributes[level] for level in ADMIN_LEVELS}
+        ).values_list("pk", flat=True).first()
+        # Conditional, so a concurrent request linking the same row wins cleanly
+        if unlinked is not None:
+            Village.objects.filter(pk=unlinked, boundary_id__isnull=True).update(boundary_id=boundary_id)
+        village, _ = Village.objects.select_related("leader").get_or_create(
+            boundary_id=boundary_id, defaults=dict(attributes, leader=None)
+        )
+    index.set_village_keys(record, village.pk, village.village_id)
+    return village
+
+
+def village_candidates(index, longitude, latitude, accuracy_m=None, max_distance_m=None):
+    """
+    Villages a user could mean for an imprecise point: every village intersecting
+    the accuracy circle (ranked by overlap), plus the nearest village if it is not among them.
+    """
+    candidates = []
+    if accuracy_m:
+        for record, overlap in index.villages_within(longitude, latitude, accuracy_m):
+            candidates.append(village_payload(index, record, record=record, overlap=round(overlap, 4)))
+    if max_distance_m:
+        nearest = index.nearest(longitude, latitude, max_distance_m)
+        if nearest and nearest[0] not in {c["record"] for c in candidates}:
+            record, distance = nearest
+            candidates.append(village_payload(index, record, record=record, distance_m=round(distance, 1)))
+    return candidates
+
 
 class LocatePointAPIView(APIView):
     
@@ -59,7 +120,9 @@ class LocatePointAPIView(APIView):
                                 "district": "Burera",
                                 "sector": "Kinyababa",
                                 "cell": "Bugamba",
-                                "village": "Kirwa"
+                                "village": "Kirwa",
+                                "village_id": "uuid-of-Village",
+                                "boundary_version": "20260301T120000-3f2a9c1b"
                             }
                         }
                     )
@@ -121,40 +184,30 @@ class LocatePointAPIView(APIView):
 
         latitude = serializer.validated_data["latitude"]
         longitude = serializer.validated_data["longitude"]
+        accuracy_m = serializer.validated_data.get("accuracy_m")
 
         try:
-            # Adjust the path to your shapefile
-            BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            shp_path = os.path.join(BASE_DIR, "Village level boundary", "RWA_adm5.shp")
+            index = get_village_index()
+            record = get_locate_cache().locate_record(index, longitude, latitude)
+            village_info = village_payload(index, record) if record is not None else None
 
-            # Check if shapefile exists
-            if not os.path.exists(shp_path):
-                return error_response(
-                    message="Village data not available",
-                    errors="Shapefile not found",
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            if village_info is None and serializer.validated_data["nearest"]:
+                nearest = index.nearest(longitude, latitude, serializer.validated_data["max_distance_m"])
+                if nearest:
+                    record, distance = nearest
+                    village_info = village_payload(index, record, match="nearest", distance_m=round(distance, 1))
 
-            sf = shapefile.Reader(shp_path)
-            point = Point(longitude, latitude)
-            village_info = None
-
-            for record, shp in zip(sf.records(), sf.shapes()):
-                polygon = shape(shp.__geo_interface__)
-                if polygon.contains(point):
-                    village_info = {
-                        "province": record[4],
-                        "district": record[6],
-                        "sector": record[8],
-                        "cell": record[10],
-                        "village": record[12],
-                    }
-                    break
-
-            if village_info:
+            candidates = None
+            if accuracy_m:
+                candidates = village_candidates(index, longitude, latitude, accuracy_m=accuracy_m)
+
+            if village_info or candidates:
+                data = dict(village_info or {}, boundary_version=index.version)
+                if candidates is not None:
+                    data["candidates"] = candidates
                 return success_response(
-                    data=village_info,
-                    message="Village found successfully",
+                    data=data,
+                    message="Village found successfully" if village_info else "Nearby villages found",
                     status_code=status.HTTP_200_OK
                 )
             else:
@@ -163,6 +216,12 @@ class LocatePointAPIView(APIView):
                     status_code=status.HTTP_404_NOT_FOUND
                 )
 
+        except FileNotFoundError:
+            return error_response(
+                message="Village data not available",
+                errors="Shapefile not found",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
         except Exception as e:
             return error_response(
                 message="Failed to process Village data",
@@ -173,6 +232,84 @@ class LocatePointAPIView(APIView):
 
 
 
+class LocatePointBatchAPIView(APIView):
+
+    @extend_schema(
+        summary="Locate villages for many coordinates",
+        description="""Resolve up to 10000 [latitude, longitude] pairs in one call.
+        Results are returned in input order; points outside every village polygon
+        are returned as null.""",
+        request=LocatePointBatchSerializer,
+        examples=[
+            OpenApiExample(
+                "Batch Example",
+                value={"points": [[-1.3782236, 29.8094301], [0.0, 0.0]]},
+                request_only=True
+            )
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=OpenApiTypes.OBJECT,
+                description="Points resolved",
+                examples=[
+                    OpenApiExample(
+                        "Success Response",
+                        value={
+                            "success": True,
+                            "message": "Resolved 1 of 2 points",
+                            "data": {
+                                "count": 2,
+                                "found": 1,
+                                "results": [
+                                    {
+                                        "province": "Amajyaruguru",
+                                        "district": "Burera",
+                                        "sector": "Kinyababa",
+                                        "cell": "Bugamba",
+                                        "village": "Kirwa"
+                                    },
+                                    None
+                                ],
+                                "boundary_version": "20260301T120000-3f2a9c1b"
+                            }
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(description="Validation Error"),
+            500: OpenApiResponse(description="Server Error")
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = LocatePointBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                message="Invalid points",
+                errors=serializer.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        points = serializer.validated_data["points"]
+
+        try:
+            index = get_village_index()
+            records = index.locate_many(points[:, 1], points[:, 0])
+        except FileNotFoundError:
+            return error_response(
+                message="Village data not available",
+                errors="Shapefile not found",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        results = [index.attributes[record] if record >= 0 else None for record in records.tolist()]
+        found = int((records >= 0).sum())
+        return success_response(
+            data={"count": len(results), "found": found, "results": results, "boundary_version": index.version},
+            message=f"Resolved {found} of {len(results)} points",
+            status_code=status.HTTP_200_OK
+        )
+
+
 class JoinVillageByCoordinatesAPIView(APIView):
     permission_classes = [IsAuthenticated]
     @extend_schema(
@@ -182,8 +319,11 @@ class JoinVillageByCoordinatesAPIView(APIView):
         latitude and longitude. The system locates the corresponding village using shapefile data, 
         checks if the user is already a resident, and creates a resident record in PENDING status. 
         Village leaders are notified asynchronously.
+        When the point falls outside every village (border slivers, GPS drift) the nearby villages
+        are returned under `candidates` with status 200 (nobody has joined yet; a join answers 201);
+        send the chosen one back in `record` with the same coordinates.
         """,
-        request=LocatePointSerializer,
+        request=JoinVillageByCoordinatesSerializer,
         examples=[
             OpenApiExample(
                 "Valid Point Example",
@@ -250,6 +390,32 @@ class JoinVillageByCoordinatesAPIView(APIView):
                     )
                 ]
             ),
+            200: OpenApiResponse(
+                description="Point not inside any village polygon, nearby villages offered; nothing was joined",
+                examples=[
+                    OpenApiExample(
+                        "Choose Village Example",
+                        value={
+                            "success": True,
+                            "message": "Point is not inside any village polygon. Choose one of the nearby villages and send its record back",
+                            "data": {
+                                "candidates": [
+                                    {
+                                        "province": "Amajyaruguru",
+                                        "district": "Burera",
+                                        "sector": "Kinyababa",
+                                        "cell": "Bugamba",
+                                        "village": "Kirwa",
+                                        "village_id": "uuid-of-Village",
+                                        "record": 1021,
+                                        "distance_m": 37.5
+                                    }
+                                ]
+                            }
+                        }
+                    )
+                ]
+            ),
             404: OpenApiResponse(
                 description="Point not inside any village polygon",
                 examples=[
@@ -293,7 +459,7 @@ class JoinVillageByCoordinatesAPIView(APIView):
         }
     )
     def post(self, request, *args, **kwargs):
-        serializer = LocatePointSerializer(data=request.data)
+        serializer = JoinVillageByCoordinatesSerializer(data=request.data)
         if not serializer.is_valid():
             return error_response(
                 message="error contact gilbert",
@@ -303,30 +469,32 @@ class JoinVillageByCoordinatesAPIView(APIView):
 
         latitude = serializer.validated_data["latitude"]
         longitude = serializer.validated_data["longitude"]
+        chosen_record = serializer.validated_data.get("record")
 
-        # Load shapefile
-        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        shp_path = os.path.join(BASE_DIR, "Village level boundary", "RWA_adm5.shp")
-        if not os.path.exists(shp_path):
+        try:
+            index = get_village_index()
+            record = get_locate_cache().locate_record(index, longitude, latitude) if chosen_record is None else None
+            candidates = []
+            if record is None:
+                candidates = village_candidates(
+                    index, longitude, latitude,
+                    accuracy_m=serializer.validated_data.get("accuracy_m"),
+                    max_distance_m=serializer.validated_data["max_distance_m"],
+                )
+        except FileNotFoundError:
             return error_response("Village data not available", errors="Shapefile not found", status_code=500)
 
-        sf = shapefile.Reader(shp_path)
-        point = Point(longitude, latitude)
-        village_info = None
-
-        for record, shp in zip(sf.records(), sf.shapes()):
-            polygon = shape(shp.__geo_interface__)
-            if polygon.contains(point):
-                village_info = {
-                    "province": record[4],
-                    "district": record[6],
-                    "sector": record[8],
-                    "cell": record[10],
-                    "village": record[12],
-                }
-                break
-
-        if not village_info:
+        if chosen_record is not None:
+            if chosen_record not in {c["record"] for c in candidates}:
+                return error_response("The selected village is not near the given coordinates", status_code=400)
+            record = chosen_record
+        elif record is None:
+            if candidates:
+                return success_response(
+                    data={"candidates": candidates},
+                    message="Point is not inside any village polygon. Choose one of the nearby villages and send its record back",
+                    status_code=status.HTTP_200_OK
+                )
             return error_response("Point is not inside any village polygon", status_code=404)
 
         user = request.user
@@ -337,32 +505,25 @@ class JoinVillageByCoordinatesAPIView(APIView):
         existing_resident = Resident.objects.filter(person=person, is_deleted=False).first()
         if existing_resident:
             return error_response(
-                f"You are already a resident in {existing_resident.Village.village} village in {existing_resident.Village.sector} sector",
+                f"You are already a resident in {existing_resident.village.village} village in {existing_resident.village.sector} sector",
                 status_code=409
             )
 
-        Village, _ = Village.objects.get_or_create(
-            province=village_info["province"],
-            district=village_info["district"],
-            sector=village_info["sector"],
-            cell=village_info["cell"],
-            village=village_info["village"],
-            defaults={"leader": None}
-        )
+        village = village_for_record(index, record)
 
         resident = Resident.objects.create(
             person=person,
-            Village=Village,
+            village=village,
             added_by=user,
             status="PENDING"
         )
 
-        if Village.leader:
+        if village.leader:
             notify_village_leader_new_resident.delay(
-                Village.leader.email,
+                village.leader.email,
                 f"{person.first_name} {person.last_name}",
-                Village.village,
-                Village.get_full_address()
+                village.village,
+                village.get_full_address()
             )
 
         serializer = ResidentSerializer(resident)
@@ -372,3 +533,475 @@ class JoinVillageByCoordinatesAPIView(APIView):
             status_code=201
         )
 
+
+
+@query_budget(queries=1)
+class NearbyVillagesAPIView(APIView):
+
+    @extend_schema(
+        summary="Villages near a point",
+        description="""Villages ordered by the distance from the point to their centroid:
+        the `k` nearest (default 10), or every village within `radius_km` (at most 500),
+        or the `k` nearest within `radius_km`.""",
+        parameters=[
+            OpenApiParameter(name="latitude", required=True, type=OpenApiTypes.FLOAT),
+            OpenApiParameter(name="longitude", required=True, type=OpenApiTypes.FLOAT),
+            OpenApiParameter(name="k", required=False, type=OpenApiTypes.INT),
+            OpenApiParameter(name="radius_km", required=False, type=OpenApiTypes.FLOAT),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=OpenApiTypes.OBJECT,
+                description="Nearby villages",
+                examples=[
+                    OpenApiExample(
+                        "Success Response",
+                        value={
+                            "success": True,
+                            "message": "Found 1 villages",
+                            "data": {
+                                "count": 1,
+                                "results": [
+                                    {
+                                        "province": "Amajyaruguru",
+                                        "district": "Burera",
+                                        "sector": "Kinyababa",
+                                        "cell": "Bugamba",
+                                        "village": "Kirwa",
+                                        "village_id": "uuid-of-Village",
+                                        "record": 1021,
+                                        "distance_m": 412.3
+                                    }
+                                ]
+                            }
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(description="Validation Error"),
+            500: OpenApiResponse(description="Server Error")
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        serializer = NearbyVillagesSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return error_response(
+                message="Invalid query parameters",
+                errors=serializer.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        data = serializer.validated_data
+        radius_km = data.get("radius_km")
+        try:
+            index = get_village_index()
+            records, distances = index.nearest_centroids(
+                data["longitude"], data["latitude"],
+                k=data["k"],
+                radius_m=radius_km * 1000 if radius_km is not None else None,
+            )
+        except FileNotFoundError:
+            return error_response(
+                message="Village data not available",
+                errors="Shapefile not found",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        results = [
+            village_payload(index, record, record=record, distance_m=round(distance, 1))
+            for record, distance in zip(records.tolist(), distances.tolist())
+        ]
+        return success_response(
+            data={"count": len(results), "results": results},
+            message=f"Found {len(results)} villages"
+        )
+
+
+@query_budget(queries=2)
+class VillageNeighboursAPIView(APIView):
+
+    @extend_schema(
+        summary="Neighbouring villages",
+        description="""Villages sharing a border with the given village, or up to `hops` borders
+        away (max 5). Answered from the precomputed adjacency graph.""",
+        parameters=[
+            OpenApiParameter(name="record", required=False, type=OpenApiTypes.INT),
+            OpenApiParameter(name="village_id", required=False, type=OpenApiTypes.UUID),
+            OpenApiParameter(name="hops", required=False, type=OpenApiTypes.INT),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=OpenApiTypes.OBJECT,
+                description="Neighbouring villages",
+                examples=[
+                    OpenApiExample(
+                        "Success Response",
+                        value={
+                            "success": True,
+                            "message": "Found 1 neighbouring villages",
+                            "data": {
+                                "village": {
+                                    "province": "Amajyaruguru",
+                                    "district": "Burera",
+                                    "sector": "Kinyababa",
+                                    "cell": "Bugamba",
+                                    "village": "Kirwa",
+                                    "village_id": "uuid-of-Village",
+                                    "record": 1021
+                                },
+                                "count": 1,
+                                "neighbours": [
+                                    {
+                                        "province": "Amajyaruguru",
+                                        "district": "Burera",
+                                        "sector": "Kinyababa",
+                                        "cell": "Bugamba",
+                                        "village": "Rugarama",
+                                        "village_id": "uuid-of-Village",
+                                        "record": 1022,
+                                        "hops": 1
+                                    }
+                                ]
+                            }
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(description="Validation Error"),
+            404: OpenApiResponse(description="Unknown village")
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        serializer = VillageNeighboursSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return error_response(
+                message="Invalid query parameters",
+                errors=serializer.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            index = get_village_index()
+        except FileNotFoundError:
+            return error_response(
+                message="Village data not available",
+                errors="Shapefile not found",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        record = serializer.validated_data.get("record")
+        village_id = serializer.validated_data.get("village_id")
+        if village_id is not None:
+            boundary_id = Village.objects.filter(village_id=village_id).values_list("boundary_id", flat=True).first()
+            record = index.record_for_boundary_id(boundary_id) if boundary_id is not None else None
+        if record is None or record >= len(index):
+            return error_response("Village not found in the boundary data", status_code=status.HTTP_404_NOT_FOUND)
+
+        records, hops = index.neighbours(record, serializer.validated_data["hops"])
+        neighbours = [
+            village_payload(index, neighbour, record=neighbour, hops=hop)
+            for neighbour, hop in zip(records.tolist(), hops.tolist())
+        ]
+        return success_response(
+            data={
+                "village": village_payload(index, record, record=record),
+                "count": len(neighbours),
+                "neighbours": neighbours,
+            },
+            message=f"Found {len(neighbours)} neighbouring villages"
+        )
+
+
+class GeocodingJobUploadAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @extend_schema(
+        summary="Geocode a CSV of coordinates",
+        description="""Upload a CSV with latitude/longitude columns. It is processed in the background;
+        the result is the same CSV with province, district, sector, cell, village and village_id appended.
+        Poll the returned status URL for progress and the download link.""",
+        request={"multipart/form-data": GeocodingUploadSerializer},
+        responses={
+            202: OpenApiResponse(
+                response=OpenApiTypes.OBJECT,
+                description="Job queued",
+                examples=[
+                    OpenApiExample(
+                        "Queued Example",
+                        value={
+                            "success": True,
+                            "message": "Geocoding job queued",
+                            "data": {
+                                "job_id": "uuid-of-job",
+                                "status": "PENDING",
+                                "status_url": "https://example.com/locate/geocode/uuid-of-job/"
+                            }
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(description="Validation Error"),
+            503: OpenApiResponse(description="The task queue is unavailable; the job is marked FAILED")
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = GeocodingUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                message="Invalid upload",
+                errors=serializer.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        job = GeocodingJob.objects.create(
+            created_by=request.user,
+            input_file=serializer.validated_data["file"],
+            latitude_column=serializer.validated_data["latitude_column"],
+            longitude_column=serializer.validated_data["longitude_column"],
+        )
+
+        # Requests run in autocommit, so the job row is already committed and the worker can read it
+        try:
+            result = geocode_csv.delay(str(job.job_id))
+        except BrokerError as e:
+            GeocodingJob.objects.filter(pk=job.pk).update(status="FAILED", error=f"Could not queue the job: {e}")
+            return error_response(
+                message="Geocoding is unavailable right now, please try again later",
+                errors={"job_id": str(job.job_id)},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        job.task_id = result.id
+        GeocodingJob.objects.filter(pk=job.pk).update(task_id=job.task_id)
+
+        data = GeocodingJobSerializer(job, context={"request": request}).data
+        data["status_url"] = request.build_absolute_uri(reverse("geocoding_job_status", args=[job.job_id]))
+        return success_response(data=data, message="Geocoding job queued", status_code=status.HTTP_202_ACCEPTED)
+
+
+@query_budget(queries=2)
+class GeocodingJobStatusAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Geocoding job status",
+        description="""Progress of a CSV geocoding job. `output_url` points at the enriched CSV,
+        which holds the rows processed so far until the job succeeds.""",
+        responses={200: GeocodingJobSerializer, 404: OpenApiTypes.OBJECT}
+    )
+    def get(self, request, job_id, *args, **kwargs):
+        jobs = GeocodingJob.objects.all()
+        if request.user.role != "admin":
+            jobs = jobs.filter(created_by=request.user)
+        job = jobs.filter(job_id=job_id).first()
+        if job is None:
+            return error_response("Geocoding job not found", status_code=status.HTTP_404_NOT_FOUND)
+        return success_response(
+            data=GeocodingJobSerializer(job, context={"request": request}).data,
+            message=f"Geocoding job is {job.status.lower()}"
+        )
+
+
+@query_budget(queries=1)
+class LocateCacheStatsAPIView(APIView):
+    permission_classes = [IsSystemAdmin]
+
+    @extend_schema(
+        summary="Village locate cache statistics",
+        description="""Hit/miss counters of the coordinate cache in front of the village locator,
+        for tuning VILLAGE_LOCATE_CACHE precision and size. Counters are per worker process.""",
+        responses={200: OpenApiTypes.OBJECT}
+    )
+    def get(self, request, *args, **kwargs):
+        return success_response(
+            data=get_locate_cache().stats(),
+            message="Locate cache statistics retrieved successfully"
+        )
+
+
+@query_budget(queries=1)
+class VillageIndexHealthAPIView(APIView):
+    authentication_classes = []
+
+    @extend_schema(
+        summary="Village locator readiness",
+        description="""Reports whether this worker's village boundary index has been warmed.
+        A worker that was not preloaded warms it on the first call, so the response is 503
+        only while the boundary data cannot be loaded.""",
+        responses={200: OpenApiTypes.OBJECT, 503: OpenApiTypes.OBJECT}
+    )
+    def get(self, request, *args, **kwargs):
+        if not is_village_index_ready():
+            try:
+                warm_village_index()
+            except FileNotFoundError:
+                pass
+        status_data = village_index_status()
+        if not status_data["ready"]:
+            return Response(
+                {"success": False, "message": "Village index is not ready", "data": status_data},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return success_response(data=status_data, message="Village index is ready")
+
+
+@query_budget(queries=1)
+class VillageBoundaryLayerAPIView(APIView):
+
+    @extend_schema(
+        summary="Simplified village boundaries per district",
+        description="""GeoJSON FeatureCollection of the village polygons of one district,
+        simplified for the requested zoom level (or tier) with trimmed coordinate precision.
+        Responses are pre-gzipped and carry a strong ETag; send If-None-Match to get 304.
+        Without `district` the available districts and tiers are listed.""",
+        parameters=[
+            OpenApiParameter(name='district', description='District name, e.g. Burera', required=False, type=OpenApiTypes.STR),
+            OpenApiParameter(name='zoom', description='Map zoom level used to pick the simplification tier', required=False, type=OpenApiTypes.INT),
+            OpenApiParameter(name='tier', description='Simplification tier: low, medium or high', required=False, type=OpenApiTypes.STR),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 304: None, 400: OpenApiTypes.OBJECT, 404: OpenApiTypes.OBJECT, 503: OpenApiTypes.OBJECT}
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            layers = get_village_index().layers
+        except FileNotFoundError:
+            layers = None
+        if layers is None:
+            return error_response(
+                message="Boundary layers not available",
+                errors="Run 'manage.py compile_boundaries'",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        district = request.query_params.get("district")
+        if not district:
+            return success_response(
+                data={"districts": layers.districts(), "tiers": layers.manifest["tiers"]},
+                message="Boundary layers retrieved successfully"
+            )
+
+        tier = request.query_params.get("tier")
+        zoom = request.query_params.get("zoom")
+        if tier is None:
+            try:
+                tier = tier_for_zoom(int(zoom)) if zoom is not None else TIER_NAMES[0]
+            except ValueError:
+                return error_response(message="zoom must be an integer", status_code=status.HTTP_400_BAD_REQUEST)
+        if tier not in TIER_NAMES:
+            return error_response(
+                message=f"tier must be one of: {', '.join(TIER_NAMES)}",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        layer = layers.district(district, tier)
+        if layer is None:
+            return error_response(message=f"Unknown district: {district}", status_code=status.HTTP_404_NOT_FOUND)
+        body, etag = layer
+        return gzipped_response(request, body, etag, content_type="application/geo+json")
+
+
+@query_budget(queries=1)
+class VillageBoundaryTileAPIView(APIView):
+
+    @extend_schema(
+        summary="Simplified village boundaries per map tile",
+        description="""GeoJSON FeatureCollection of the village polygons clipped to an XYZ
+        (web mercator) tile, simplified for the tile zoom. Zoom levels 8 to 18 are served.""",
+        responses={200: OpenApiTypes.OBJECT, 304: None, 400: OpenApiTypes.OBJECT, 503: OpenApiTypes.OBJECT}
+    )
+    def get(self, request, z, x, y, *args, **kwargs):
+        if not (MIN_TILE_ZOOM <= z <= MAX_TILE_ZOOM) or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return error_response(
+                message=f"Tiles are served for zoom {MIN_TILE_ZOOM} to {MAX_TILE_ZOOM} with x and y inside the grid",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            index = get_village_index()
+        except FileNotFoundError:
+            index = None
+        if index is None or index.layers is None:
+            return error_response(
+                message="Boundary layers not available",
+                errors="Run 'manage.py compile_boundaries'",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        body, etag = index.layers.tile(index, z, x, y)
+        return gzipped_response(request, body, etag, content_type="application/geo+json")
+
+
+@query_budget(queries=1)
+class BoundaryPackListAPIView(APIView):
+
+    @extend_schema(
+        summary="Offline boundary packs per district",
+        description="""Lists the compact per-district boundary packs (quantized, simplified polygons
+        plus a grid index) that clients can download to resolve villages offline. Pack URLs are
+        content-hashed and can be cached forever; re-fetch this list to pick up new boundaries.""",
+        responses={200: OpenApiTypes.OBJECT, 503: OpenApiTypes.OBJECT}
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            index = get_village_index()
+        except FileNotFoundError:
+            index = None
+        if index is None or index.packs is None:
+            return error_response(
+                message="Boundary packs not available",
+                errors="Run 'manage.py compile_boundaries'",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        packs = [
+            {
+                "district": district,
+                "villages": entry["villages"],
+                "size": entry["size"],
+                "hash": entry["hash"],
+                "url": request.build_absolute_uri(
+                    reverse("village_boundary_pack", args=[entry["slug"], entry["hash"]])
+                ),
+            }
+            for district, entry in sorted(index.packs.districts().items())
+        ]
+        response = success_response(
+            data={"boundary_version": index.version, "packs": packs},
+            message="Boundary packs retrieved successfully"
+        )
+        response["Cache-Control"] = "public, max-age=300"
+        return response
+
+
+@query_budget(queries=1)
+class BoundaryPackAPIView(APIView):
+
+    @extend_schema(
+        summary="Download an offline boundary pack",
+        description="""Gzipped JSON pack of one district, see Village/boundary_packs.py for the layout.
+        The URL changes whenever the content does, so responses are immutable.""",
+        responses={200: OpenApiTypes.OBJECT, 304: None, 404: OpenApiTypes.OBJECT, 503: OpenApiTypes.OBJECT}
+    )
+    def get(self, request, slug, content_hash, *args, **kwargs):
+        try:
+            index = get_village_index()
+        except FileNotFoundError:
+            index = None
+        if index is None or index.packs is None:
+            return error_response(
+                message="Boundary packs not available",
+                errors="Run 'manage.py compile_boundaries'",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        pack = index.packs.pack(slug, content_hash)
+        if pack is None:
+            return error_response(
+                message="Unknown or outdated boundary pack, fetch the pack list again",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        body, etag = pack
+        return gzipped_response(
+            request, body, etag, content_type="application/json",
+            cache_control="public, max-age=31536000, immutable"
+        )
+
@@ -0,0 +1,181 @@
+import json
+import os
+import platform
+import resource
+import time
+
+import numpy as np
+import shapefile
+import shapely
+from shapely.geometry import Point, shape
+from django.core.management.base import BaseCommand, CommandError
+
+from Village.boundaries import CompiledBoundaries, get_compiled_dir, get_shapefile_path
+from Village.geo_cache import LocateCache
+from Village.geo_index import METERS_PER_DEGREE, VillageBoundaryIndex
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KB on Linux, bytes on macOS; this is the peak, not the current size
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def scan_locate(path, longitude, latitude):
+    """The original lookup: open the shapefile and test every polygon until one contains the point."""
+    sf = shapefile.Reader(path)
+    point = Point(longitude, latitude)
+    for record, shp in zip(sf.records(), sf.shapes()):
+        if shape(shp.__geo_interface__).contains(point):
+            return record
+    return None
+
+
+def latency_summary(seconds):
+    ms = np.asarray(seconds) * 1000
+    total = float(np.sum(seconds))
+    return {
+        "points": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "points_per_second": round(len(ms) / total, 1) if total else None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark village point lookups (original shapefile scan vs. the indexed locator) "
+        "on points inside villages, on borders and outside Rwanda; writes the results as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--points", type=int, default=2000, help="Points per distribution (default: %(default)s)")
+        parser.add_argument(
+            "--scan-points", type=int, default=20,
+            help="Points per distribution for the slow shapefile scan (default: %(default)s)",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default="geo_benchmark.json", help="JSON output path (default: %(default)s)")
+
+    def handle(self, *args, **options):
+        shapefile_path = get_shapefile_path()
+        if not os.path.exists(shapefile_path):
+            raise CommandError(f"Shapefile not found: {shapefile_path}")
+        rng = np.random.default_rng(options["seed"])
+
+        rss_start = current_rss_mb()
+        started = time.perf_counter()
+        index = VillageBoundaryIndex.from_shapefile(shapefile_path)
+        indexes = {"shapefile_index": (index, time.perf_counter() - started, current_rss_mb() - rss_start)}
+
+        compiled_dir = get_compiled_dir()
+        if CompiledBoundaries.exists(compiled_dir):
+            rss_before = current_rss_mb()
+            started = time.perf_counter()
+            compiled = VillageBoundaryIndex.from_compiled(compiled_dir)
+            indexes["compiled_index"] = (compiled, time.perf_counter() - started, current_rss_mb() - rss_before)
+        else:
+            self.stdout.write(self.style.WARNING("No compiled boundaries, run compile_boundaries to include them"))
+
+        distributions = self.sample_points(index, options["points"], rng)
+        results = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "villages": len(index),
+            "python": platform.python_version(),
+            "shapely": shapely.__version__,
+            "rss_mb": {"start": round(rss_start, 1)},
+            "load": {},
+            "single_point": {},
+            "batch": {},
+        }
+
+        for name, (locator, load_seconds, rss_delta) in indexes.items():
+            results["load"][name] = {"seconds": round(load_seconds, 4), "rss_delta_mb": round(rss_delta, 1)}
+            cache = LocateCache(size=len(index))
+            for kind, (longitudes, latitudes) in distributions.items():
+                results["single_point"].setdefault(kind, {})[name] = self.time_single(
+                    locator.locate_record, longitudes, latitudes
+                )
+                # Second pass over the same points is all cache hits
+                self.time_single(lambda x, y: cache.locate_record(locator, x, y), longitudes, latitudes)
+                results["single_point"][kind][f"{name}_cached"] = self.time_single(
+                    lambda x, y: cache.locate_record(locator, x, y), longitudes, latitudes
+                )
+                started = time.perf_counter()
+                locator.locate_many(longitudes, latitudes)
+                seconds = time.perf_counter() - started
+                results["batch"].setdefault(kind, {})[name] = {
+                    "points": len(longitudes),
+                    "seconds": round(seconds, 4),
+                    "points_per_second": round(len(longitudes) / seconds, 1) if seconds else None,
+                }
+
+        for kind, (longitudes, latitudes) in distributions.items():
+            n = min(options["scan_points"], len(longitudes))
+            results["single_point"][kind]["shapefile_scan"] = self.time_single(
+                lambda x, y: scan_locate(shapefile_path, x, y), longitudes[:n], latitudes[:n]
+            )
+        results["rss_mb"]["end"] = round(current_rss_mb(), 1)
+
+        with open(options["output"], "w") as fh:
+            json.dump(results, fh, indent=2)
+        for kind, timings in results["single_point"].items():
+            line = ", ".join(f"{name} p50 {t['p50_ms']}ms p99 {t['p99_ms']}ms" for name, t in timings.items())
+            self.stdout.write(f"{kind}: {line}")
+        self.stdout.write(self.style.SUCCESS(f"Benchmark results written to {options['output']}"))
+
+    def sample_points(self, index, count, rng):
+        """Points inside random villages, on village borders, and outside Rwanda."""
+        records = rng.integers(0, len(index), count)
+        geometries = index.geometries(records)
+
+        # Inside: rejection sampling in each village's bounding box
+        inside_x, inside_y = np.empty(count), np.empty(count)
+        for i, (geometry, bounds) in enumerate(zip(geometries, index.bounds[records])):
+            point = shapely.point_on_surface(geometry)
+            for _ in range(20):
+                x, y = rng.uniform(bounds[0], bounds[2]), rng.uniform(bounds[1], bounds[3])
+                if shapely.contains_xy(geometry, x, y):
+                    point = shapely.Point(x, y)
+                    break
+            inside_x[i], inside_y[i] = point.x, point.y
+
+        # Border: a random spot on the village outline, jittered by up to 2 m
+        border = shapely.line_interpolate_point(shapely.boundary(geometries), rng.uniform(0, 1, count), normalized=True)
+        jitter = rng.uniform(-2, 2, (count, 2)) / METERS_PER_DEGREE
+        border_xy = shapely.get_coordinates(border) + jitter
+
+        # Outside: points in a frame around the national extent that no village contains
+        minx, miny, maxx, maxy = index.bounds[:, 0].min(), index.bounds[:, 1].min(), index.bounds[:, 2].max(), index.bounds[:, 3].max()
+        outside_x = np.empty(0)
+        outside_y = np.empty(0)
+        while len(outside_x) < count:
+            xs = rng.uniform(minx - 1, maxx + 1, count)
+            ys = rng.uniform(miny - 1, maxy + 1, count)
+            keep = index.locate_many(xs, ys) < 0
+            outside_x = np.concatenate([outside_x, xs[keep]])
+            outside_y = np.concatenate([outside_y, ys[keep]])
+
+        return {
+            "inside": (inside_x, inside_y),
+            "border": (border_xy[:, 0], border_xy[:, 1]),
+            "outside": (outside_x[:count], outside_y[:count]),
+        }
+
+    def time_single(self, locate, longitudes, latitudes):
+        seconds = []
+        for x, y in zip(longitudes.tolist(), latitudes.tolist()):
+            started = time.perf_counter()
+            locate(x, y)
+            seconds.append(time.perf_counter() - started)
+        return latency_summary(seconds)
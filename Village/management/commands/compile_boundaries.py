@@ -0,0 +1,96 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Village.boundaries import (
+    DEFAULT_GRID_CELL_SIZE,
+    activate_version,
+    get_active_version,
+    get_compiled_dir,
+    get_shapefile_path,
+    list_versions,
+    new_version_name,
+    prune_versions,
+    read_shapefile,
+    version_dir,
+    write_compiled,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile the village boundary shapefile into a new version of the memory-mapped "
+        "artifact used by the geo index, and make it the active version"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shapefile", help="Path to RWA_adm5.shp (defaults to VILLAGE_BOUNDARY_SHAPEFILE)")
+        parser.add_argument("--output", help="Base directory (defaults to VILLAGE_BOUNDARY_COMPILED_DIR)")
+        parser.add_argument(
+            "--grid-cell",
+            type=float,
+            default=DEFAULT_GRID_CELL_SIZE,
+            help="Lookup grid cell size in degrees, 0 to skip the grid (default: %(default)s)",
+        )
+        parser.add_argument("--no-layers", action="store_true", help="Skip the simplified map layers")
+        parser.add_argument("--no-activate", action="store_true", help="Compile without switching workers to it")
+        parser.add_argument(
+            "--activate", metavar="VERSION", help="Only switch to an already compiled version (e.g. to roll back)"
+        )
+        parser.add_argument("--list", action="store_true", help="List the compiled versions")
+        parser.add_argument(
+            "--keep", type=int, default=3, help="Compiled versions to keep on disk (default: %(default)s)"
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"] or get_compiled_dir()
+
+        if options["list"]:
+            active = get_active_version(output)
+            for version in list_versions(output):
+                self.stdout.write(f"{'*' if version == active else ' '} {version}")
+            return
+
+        if options["activate"]:
+            try:
+                activate_version(output, options["activate"])
+            except FileNotFoundError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Activated boundary version {options['activate']}"))
+            return
+
+        if options["keep"] < 1:
+            raise CommandError("--keep must be at least 1")
+
+        shapefile_path = options["shapefile"] or get_shapefile_path()
+        started = time.perf_counter()
+        try:
+            geometries, attributes, boundary_ids = read_shapefile(shapefile_path)
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+
+        version = base_name = new_version_name(shapefile_path)
+        suffix = 1
+        while os.path.exists(version_dir(output, version)):
+            suffix += 1
+            version = f"{base_name}-{suffix}"
+        manifest = write_compiled(
+            version_dir(output, version),
+            geometries,
+            attributes,
+            boundary_ids,
+            source=shapefile_path,
+            grid_cell_size=options["grid_cell"],
+            layers=not options["no_layers"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Compiled {manifest['count']} villages into version {version} "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
+
+        if not options["no_activate"]:
+            activate_version(output, version)
+            self.stdout.write(f"Activated boundary version {version}")
+        for removed in prune_versions(output, options["keep"]):
+            self.stdout.write(f"Removed old version {removed}")
@@ -1,27 +1,124 @@
-from django.core.management.base import BaseCommand
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from Village.admin_units import sync_admin_units
+from Village.boundaries import ADMIN_LEVELS, GEOMETRY_FIELDS, get_shapefile_path, iter_village_records
+from Village.hierarchy import bump_hierarchy_version
 from Village.models import Village
-import shapefile
+
 
 class Command(BaseCommand):
-    help = "Load all villages from shapefile into Village model"
+    help = (
+        "Load all villages from the boundary shapefile into the Village model. "
+        "Safe to rerun: rows are matched on the shapefile ID_5 and upserted in chunks. "
+        "Also stores each village's centroid, area and bounding box."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="Path to RWA_adm5.shp (defaults to VILLAGE_BOUNDARY_SHAPEFILE)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk write (default: %(default)s)")
+        parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them")
+
+    def handle(self, *args, **options):
+        path = options["path"] or get_shapefile_path()
+        dry_run = options["dry_run"]
+
+        # One query for the current state of the table
+        by_boundary_id = {}
+        unlinked = {}
+        levels = len(ADMIN_LEVELS)
+        for pk, boundary_id, *values in Village.objects.values_list(
+            "pk", "boundary_id", *ADMIN_LEVELS, *GEOMETRY_FIELDS
+        ):
+            names, geometry = tuple(values[:levels]), tuple(values[levels:])
+            if boundary_id is None:
+                unlinked[names] = pk
+            else:
+                by_boundary_id[boundary_id] = (names, geometry)
 
-    def handle(self, *args, **kwargs):
+        counts = {"created": 0, "renamed": 0, "linked": 0, "reshaped": 0, "unchanged": 0}
+        seen = set()
         try:
-            sf = shapefile.Reader(r"Village level boundary\RWA_adm5.shp")
-            records=sf.records()
-            start_id=0
-            for i,record in enumerate(records[start_id:],start=start_id):
-                Village, created = Village.objects.get_or_create(
-                    province=record['NAME_1'],
-                    district=record['NAME_2'],
-                    sector=record['NAME_3'],
-                    cell=record['NAME_4'],
-                    village=record['NAME_5']
-                )
-                if created:
-                    self.stdout.write(self.style.SUCCESS(f"Created Village: {Village.village}"))
-                else:
-                    self.stdout.write(self.style.WARNING(f"Village already exists: {Village.village}"))
-            self.stdout.write(self.style.SUCCESS("All villages loaded successfully!"))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error loading villages: {str(e)}"))
\ No newline at end of file
+            records = iter_village_records(path)
+            with transaction.atomic():
+                while True:
+                    chunk = list(islice(records, options["batch_size"]))
+                    if not chunk:
+                        break
+                    upserts, links = self.diff_chunk(
+                        chunk, by_boundary_id, unlinked, counts, seen, verbose=options["verbosity"] > 1
+                    )
+                    if dry_run:
+                        continue
+                    if links:
+                        Village.objects.bulk_update(links, ["boundary_id", *GEOMETRY_FIELDS])
+                    if upserts:
+                        Village.objects.bulk_create(
+                            upserts,
+                            update_conflicts=True,
+                            unique_fields=["boundary_id"],
+                            update_fields=[*ADMIN_LEVELS, *GEOMETRY_FIELDS],
+                        )
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+        units_created = 0
+        if not dry_run:
+            # Bulk writes skip the Village signals
+            units_created, _ = sync_admin_units()
+            bump_hierarchy_version()
+
+        missing = set(by_boundary_id) - seen
+        summary = (
+            f"created: {counts['created']}, renamed: {counts['renamed']}, "
+            f"linked to existing rows: {counts['linked']}, unchanged: {counts['unchanged']}, "
+            f"geometry updated: {counts['reshaped']}, "
+            f"no longer in shapefile: {len(missing)}, unmatched legacy rows: {len(unlinked)}"
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"Dry run, nothing written. Would apply {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Villages loaded. {summary}, administrative units created: {units_created}"
+            ))
+        if missing and options["verbosity"] > 1:
+            for boundary_id in sorted(missing):
+                self.stdout.write(f"  not in shapefile: {boundary_id} {', '.join(by_boundary_id[boundary_id][0])}")
+
+    def diff_chunk(self, chunk, by_boundary_id, unlinked, counts, seen, verbose=False):
+        """
+        Compare a chunk of shapefile records with the existing rows.
+
+        Returns (upserts, links): rows to insert, rename or reshape, and legacy
+        rows without a boundary_id that only need it (and the geometry) set.
+        """
+        upserts, links = [], []
+        for boundary_id, attributes, geometry in chunk:
+            if boundary_id in seen:
+                self.stdout.write(self.style.WARNING(f"  duplicate ID_5 {boundary_id} in shapefile, skipped"))
+                continue
+            seen.add(boundary_id)
+            names = tuple(attributes[level] for level in ADMIN_LEVELS)
+            current = by_boundary_id.get(boundary_id)
+
+            if current is None and names in unlinked:
+                counts["linked"] += 1
+                links.append(Village(pk=unlinked.pop(names), boundary_id=boundary_id, **geometry))
+                continue
+
+            if current is None:
+                counts["created"] += 1
+                if verbose:
+                    self.stdout.write(f"  create: {boundary_id} {', '.join(names)}")
+            elif current[0] != names:
+                counts["renamed"] += 1
+                if verbose:
+                    self.stdout.write(f"  rename: {boundary_id} {', '.join(current[0])} -> {', '.join(names)}")
+            elif current[1] != tuple(geometry[field] for field in GEOMETRY_FIELDS):
+                counts["reshaped"] += 1
+            else:
+                counts["unchanged"] += 1
+                continue
+            upserts.append(Village(boundary_id=boundary_id, leader=None, **attributes, **geometry))
+        return upserts, links
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from Village.admin_units import sync_admin_units
+from Village.hierarchy import bump_hierarchy_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the Province/District/Sector/Cell rows named by the villages and backfill "
+        "the integer keys of every Village. Safe to rerun; load_villages runs it too."
+    )
+
+    def handle(self, *args, **options):
+        created, updated = sync_admin_units()
+        if updated:
+            bump_hierarchy_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"Administrative units created: {created}, villages updated: {updated}"
+        ))
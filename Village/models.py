@@ -3,6 +3,50 @@ from django.conf import settings
 import uuid
 from django.core.exceptions import ValidationError
 
+class Province(models.Model):
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class District(models.Model):
+    id = models.SmallAutoField(primary_key=True)
+    province = models.ForeignKey(Province, on_delete=models.PROTECT, related_name='districts')
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        unique_together = ('province', 'name')
+
+    def __str__(self):
+        return self.name
+
+
+class Sector(models.Model):
+    id = models.SmallAutoField(primary_key=True)
+    district = models.ForeignKey(District, on_delete=models.PROTECT, related_name='sectors')
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        unique_together = ('district', 'name')
+
+    def __str__(self):
+        return f"{self.name}, {self.district}"
+
+
+class Cell(models.Model):
+    id = models.SmallAutoField(primary_key=True)
+    sector = models.ForeignKey(Sector, on_delete=models.PROTECT, related_name='cells')
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        unique_together = ('sector', 'name')
+
+    def __str__(self):
+        return f"{self.name}, {self.sector}"
+
+
 class Village(models.Model):
     village_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     province = models.CharField(max_length=50)
@@ -10,6 +54,22 @@ class Village(models.Model):
     sector = models.CharField(max_length=50)
     cell = models.CharField(max_length=50)
     village = models.CharField(max_length=50)
+    # Integer keys of the names above, kept in sync by Village/signal.py and
+    # backfilled with `manage.py sync_admin_units`
+    province_ref = models.ForeignKey(Province, null=True, blank=True, on_delete=models.PROTECT, related_name='villages')
+    district_ref = models.ForeignKey(District, null=True, blank=True, on_delete=models.PROTECT, related_name='villages')
+    sector_ref = models.ForeignKey(Sector, null=True, blank=True, on_delete=models.PROTECT, related_name='villages')
+    cell_ref = models.ForeignKey(Cell, null=True, blank=True, on_delete=models.PROTECT, related_name='villages')
+    # ID_5 of the village in the RWA_adm5 boundary shapefile
+    boundary_id = models.PositiveIntegerField(null=True, blank=True, unique=True)
+    # Derived from the boundary polygon by load_villages
+    centroid_longitude = models.FloatField(null=True, blank=True)
+    centroid_latitude = models.FloatField(null=True, blank=True)
+    area_km2 = models.FloatField(null=True, blank=True)
+    min_longitude = models.FloatField(null=True, blank=True)
+    min_latitude = models.FloatField(null=True, blank=True)
+    max_longitude = models.FloatField(null=True, blank=True)
+    max_latitude = models.FloatField(null=True, blank=True)
     leader = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         null=True,
@@ -23,6 +83,14 @@ class Village(models.Model):
 
     def get_full_address(self):
         return f"{self.village}, {self.cell}, {self.sector}, {self.district}, {self.province}"
+
+    def save(self, *args, **kwargs):
+        # The pre_save signal re-resolves the *_ref keys when a name changes;
+        # a save(update_fields=[...]) naming a province..cell must write them too
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and set(update_fields) & {"province", "district", "sector", "cell"}:
+            kwargs["update_fields"] = {*update_fields, "province_ref", "district_ref", "sector_ref", "cell_ref"}
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return self.get_full_address()
@@ -35,3 +103,40 @@ class Village(models.Model):
             if existing.exists():
                 raise ValidationError(f"{self.leader} is already the leader of another village.")
     
+
+
+GEOCODING_STATUS_CHOICES = [
+    ("PENDING", "Pending"),
+    ("RUNNING", "Running"),
+    ("SUCCESS", "Success"),
+    ("FAILED", "Failed"),
+]
+
+
+class GeocodingJob(models.Model):
+    """A CSV of coordinates being enriched with villages by the geocode_csv task."""
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='geocoding_jobs'
+    )
+    input_file = models.FileField(upload_to='geocoding/uploads/')
+    output_file = models.FileField(upload_to='geocoding/results/', blank=True)
+    latitude_column = models.CharField(max_length=100)
+    longitude_column = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=GEOCODING_STATUS_CHOICES, default="PENDING")
+    task_id = models.CharField(max_length=255, blank=True)
+    # Fraction of the input read so far, 0 to 1
+    progress = models.FloatField(default=0)
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_located = models.PositiveIntegerField(default=0)
+    boundary_version = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Geocoding job {self.job_id} ({self.status})"
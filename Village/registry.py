@@ -0,0 +1,111 @@
+# Village/registry.py
+"""
+Process-wide registry of compact, read-only village records.
+
+Events, residents, alerts, volunteering events and leaders all nest the same
+six village fields. Instead of fetching the Village row for every serialized
+object, VillageRecordField looks the foreign key up here. The registry loads
+every village with one query and is rebuilt when the Village version counter
+(see hierarchy.py) moves or, with a per-process cache, it is
+VILLAGE_HIERARCHY_MAX_AGE seconds old, like the hierarchy tree. Records are for display; permission checks read the led
+village from UserContext, which the Village signals invalidate per user.
+"""
+import threading
+import time
+
+from .hierarchy import get_hierarchy_version, is_within_max_age
+from .models import Village
+
+RECORD_FIELDS = ("pk", "village_id", "province", "district", "sector", "cell", "village", "leader_id")
+
+
+class VillageRecord:
+    """One village; ``data`` is its LocationSerializer output, copied for each caller."""
+
+    __slots__ = RECORD_FIELDS + ("data",)
+
+    def __init__(self, pk, village_id, province, district, sector, cell, village, leader_id):
+        self.pk = pk
+        self.village_id = village_id
+        self.province = province
+        self.district = district
+        self.sector = sector
+        self.cell = cell
+        self.village = village
+        self.leader_id = leader_id
+        self.data = {
+            "village_id": str(village_id),
+            "province": province,
+            "district": district,
+            "sector": sector,
+            "cell": cell,
+            "village": village,
+        }
+
+    def __repr__(self):
+        return f"<VillageRecord {self.pk} {self.village}>"
+
+
+class VillageRegistry:
+    def __init__(self, rows, version):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.by_pk = {}
+        self.by_leader = {}
+        for row in rows:
+            self._add(VillageRecord(*row))
+        self._lock = threading.Lock()
+
+    def _add(self, record):
+        self.by_pk[record.pk] = record
+        if record.leader_id is not None:
+            self.by_leader[record.leader_id] = record
+
+    @classmethod
+    def from_database(cls, version):
+        return cls(Village.objects.values_list(*RECORD_FIELDS), version)
+
+    def is_current(self, version):
+        return self.version == version and is_within_max_age(self.built_at)
+
+    def __len__(self):
+        return len(self.by_pk)
+
+    def get(self, pk):
+        """Record of a Village pk; a village saved after the last rebuild is fetched once."""
+        record = self.by_pk.get(pk)
+        if record is None and pk is not None:
+            row = Village.objects.filter(pk=pk).values_list(*RECORD_FIELDS).first()
+            if row is None:
+                return None
+            record = VillageRecord(*row)
+            with self._lock:
+                self._add(record)
+        return record
+
+    def for_leader(self, user_pk):
+        """Record of the village led by a user, or None."""
+        return self.by_leader.get(user_pk)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_village_registry():
+    """This worker's registry, rebuilt when Village rows have changed or it is too old."""
+    global _registry
+    version = get_hierarchy_version()
+    registry = _registry
+    if registry is None or not registry.is_current(version):
+        with _registry_lock:
+            if _registry is None or not _registry.is_current(version):
+                _registry = VillageRegistry.from_database(version)
+            registry = _registry
+    return registry
+
+
+def reset_village_registry():
+    global _registry
+    with _registry_lock:
+        _registry = None
@@ -1,7 +1,12 @@
+from functools import cached_property
+
 from rest_framework import serializers
+from drf_spectacular.utils import extend_schema_field
+import numpy as np
 
 from rest_framework import serializers
-from Village.models import Village
+from Village.models import GeocodingJob, Village
+from Village.registry import get_village_registry
 from account.models import User
 
 class LocatePointSerializer(serializers.Serializer):
@@ -17,9 +22,131 @@ class LocatePointSerializer(serializers.Serializer):
         max_value=180.0,
         help_text="Longitude must be between -180 and 180."
     )
+    accuracy_m = serializers.FloatField(
+        required=False,
+        min_value=1.0,
+        max_value=5000.0,
+        help_text="GPS accuracy radius in meters. Every village intersecting it is returned, ranked by overlap."
+    )
+    nearest = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Fall back to the closest village when the point is outside every village polygon."
+    )
+    max_distance_m = serializers.FloatField(
+        required=False,
+        default=2000.0,
+        min_value=1.0,
+        max_value=20000.0,
+        help_text="Search radius in meters for the nearest-village fallback."
+    )
+
+
+class JoinVillageByCoordinatesSerializer(LocatePointSerializer):
+    record = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        help_text="Village chosen from the candidates returned when the point was outside every village polygon."
+    )
+
+
+class NearbyVillagesSerializer(serializers.Serializer):
+    DEFAULT_K = 10
+    MAX_RESULTS = 500
+
+    latitude = serializers.FloatField(min_value=-90.0, max_value=90.0)
+    longitude = serializers.FloatField(min_value=-180.0, max_value=180.0)
+    k = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=MAX_RESULTS,
+        help_text="Number of nearest villages to return (default 10 when no radius is given)."
+    )
+    radius_km = serializers.FloatField(
+        required=False,
+        min_value=0.01,
+        max_value=100.0,
+        help_text="Return every village whose centroid is within this distance (at most 500)."
+    )
+
+    def validate(self, attrs):
+        if attrs.get("k") is None:
+            attrs["k"] = self.MAX_RESULTS if attrs.get("radius_km") is not None else self.DEFAULT_K
+        return attrs
+
+
+class VillageNeighboursSerializer(serializers.Serializer):
+    MAX_HOPS = 5
+
+    record = serializers.IntegerField(required=False, min_value=0, help_text="Boundary record of the village.")
+    village_id = serializers.UUIDField(required=False, help_text="Village to start from, instead of record.")
+    hops = serializers.IntegerField(
+        required=False,
+        default=1,
+        min_value=1,
+        max_value=MAX_HOPS,
+        help_text="How many borders away to look (1 = direct neighbours)."
+    )
 
+    def validate(self, attrs):
+        if (attrs.get("record") is None) == (attrs.get("village_id") is None):
+            raise serializers.ValidationError("Provide either record or village_id.")
+        return attrs
 
 
+class LocatePointBatchSerializer(serializers.Serializer):
+    MAX_POINTS = 10000
+
+    points = serializers.ListField(
+        allow_empty=False,
+        max_length=MAX_POINTS,
+        help_text="List of [latitude, longitude] pairs (at most 10000)."
+    )
+
+    def validate_points(self, value):
+        # Validate the whole array at once; per-item child fields are too slow for 10k points
+        try:
+            points = np.asarray(value, dtype=float)
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("Each point must be a [latitude, longitude] pair of numbers.")
+        if points.ndim != 2 or points.shape[1] != 2 or not np.isfinite(points).all():
+            raise serializers.ValidationError("Each point must be a [latitude, longitude] pair of numbers.")
+        if (np.abs(points[:, 0]) > 90).any() or (np.abs(points[:, 1]) > 180).any():
+            raise serializers.ValidationError("Latitude must be between -90 and 90 and longitude between -180 and 180.")
+        return points
+
+
+
+
+class GeocodingUploadSerializer(serializers.Serializer):
+    file = serializers.FileField(help_text="CSV with a header row and one coordinate pair per row.")
+    latitude_column = serializers.CharField(max_length=100, required=False, default="latitude")
+    longitude_column = serializers.CharField(max_length=100, required=False, default="longitude")
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith(".csv"):
+            raise serializers.ValidationError("Upload a .csv file.")
+        return value
+
+
+class GeocodingJobSerializer(serializers.ModelSerializer):
+    output_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = GeocodingJob
+        fields = [
+            'job_id', 'status', 'progress', 'rows_processed', 'rows_located', 'boundary_version',
+            'latitude_column', 'longitude_column', 'output_url', 'error', 'created_at', 'updated_at'
+        ]
+
+    def get_output_url(self, obj):
+        """The enriched CSV; while the job runs it holds the rows processed so far."""
+        if not obj.output_file:
+            return None
+        request = self.context.get("request")
+        url = obj.output_file.url
+        return request.build_absolute_uri(url) if request else url
+
 
 class LocationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -27,6 +154,32 @@ class LocationSerializer(serializers.ModelSerializer):
         fields = ['village_id', 'province', 'district', 'sector', 'cell', 'village']
 
 
+@extend_schema_field(LocationSerializer)
+class VillageRecordField(serializers.Field):
+    """
+    Read-only nested village, rendered like LocationSerializer but resolved from
+    the village registry by the foreign key id, so the Village row is never
+    fetched or joined.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    @cached_property
+    def registry(self):
+        # One version check per serializer, not per object
+        return get_village_registry()
+
+    def get_attribute(self, instance):
+        return getattr(instance, instance._meta.get_field(self.source).attname)
+
+    def to_representation(self, pk):
+        record = self.registry.get(pk)
+        # A copy: the record is shared by every request in this worker
+        return dict(record.data) if record else None
+
+
 
 
 from rest_framework import serializers
@@ -61,15 +214,18 @@ class LeaderSerializer(serializers.ModelSerializer):
     #     villages = obj.led_villages.all() if hasattr(obj, 'led_villages') else []
     #     return [v.get_full_address() for v in villages]
     
+    @cached_property
+    def village_registry(self):
+        return get_village_registry()
+
+    @extend_schema_field(LocationSerializer(allow_null=True))
     def get_village(self, obj):
         """
-        Returns the village info for which the user is a leader.
-        Uses LocationSerializer to nest the address details.
+        Returns the village info for which the user is a leader,
+        from the village registry.
         """
-        village = Village.objects.filter(leader=obj).first()
-        if village:
-            return LocationSerializer(village).data
-        return None
+        record = self.village_registry.for_leader(obj.pk)
+        return dict(record.data) if record else None
 
 
 class PromoteToLeaderSerializer(serializers.Serializer):
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from account.token_claims import revoke_claims
+from Resident.utils import forget_led_villages
+
+from .admin_units import assign_admin_units
+from .boundaries import ADMIN_LEVELS
+from .hierarchy import bump_hierarchy_version
+from .models import Village
+
+
+@receiver(pre_save, sender=Village)
+def sync_village_admin_units(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Keep the integer province..cell keys in step with the names being saved.
+    """
+    if raw or update_fields is not None and not set(update_fields) & set(ADMIN_LEVELS[:-1]):
+        return
+    assign_admin_units(instance)
+
+
+@receiver(pre_save, sender=Village)
+def remember_previous_leader(sender, instance, raw=False, **kwargs):
+    instance._previous_leader_id = None
+    if not raw and instance.pk is not None:
+        instance._previous_leader_id = Village.objects.filter(pk=instance.pk) \
+            .values_list("leader_id", flat=True).first()
+
+
+@receiver(post_save, sender=Village)
+@receiver(post_delete, sender=Village)
+def invalidate_led_village(sender, instance, **kwargs):
+    """
+    A leader change (or a deleted village) drops the cached led village of the
+    old and new leader, again on commit, and revokes their token claims.
+    """
+    previous = getattr(instance, "_previous_leader_id", None)
+    if "created" in kwargs and previous == instance.leader_id:
+        return
+    user_pks = [pk for pk in {previous, instance.leader_id} if pk is not None]
+    if user_pks:
+        forget_led_villages(user_pks)
+        transaction.on_commit(lambda: forget_led_villages(user_pks))
+        revoke_claims(user_pks=user_pks)
+
+
+@receiver(post_save, sender=Village)
+@receiver(post_delete, sender=Village)
+def invalidate_village_hierarchy(sender, instance, **kwargs):
+    """
+    Bump the Village version so every worker rebuilds its in-memory tree and
+    village registry. Bumped again on commit, in case a worker rebuilt from the
+    rows as they were before this transaction committed.
+    """
+    bump_hierarchy_version()
+    transaction.on_commit(bump_hierarchy_version)
@@ -0,0 +1,118 @@
+# tasks.py
+import csv
+import io
+import os
+from itertools import islice
+
+import numpy as np
+from celery import shared_task
+from django.core.files.storage import default_storage
+
+from .boundaries import ADMIN_LEVELS
+from .geo_index import get_village_index
+
+GEOCODE_CHUNK_ROWS = 50_000
+GEOCODE_COLUMNS = (*ADMIN_LEVELS, "village_id")
+
+
+def parse_coordinates(values):
+    """Floats for a column of CSV strings; NaN where a value is missing or not a number."""
+    parsed = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            parsed[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return parsed
+
+
+def geocode_rows(index, rows, lat_col, lon_col):
+    """Append the village names and village_id to each row; returns the number located."""
+    latitudes = parse_coordinates([row[lat_col] if len(row) > lat_col else None for row in rows])
+    longitudes = parse_coordinates([row[lon_col] if len(row) > lon_col else None for row in rows])
+    valid = np.isfinite(latitudes) & np.isfinite(longitudes) & (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
+
+    records = np.full(len(rows), -1, dtype=np.int64)
+    records[valid] = index.locate_many(longitudes[valid], latitudes[valid])
+    village_ids = index.village_ids(records)
+
+    empty = [""] * len(GEOCODE_COLUMNS)
+    for row, record, village_id in zip(rows, records.tolist(), village_ids.tolist()):
+        if record < 0:
+            row.extend(empty)
+        else:
+            attributes = index.attributes[record]
+            row.extend([attributes[level] for level in ADMIN_LEVELS])
+            row.append(str(village_id) if village_id is not None else "")
+    return int((records >= 0).sum())
+
+
+@shared_task(bind=True)
+def geocode_csv(self, job_id):
+    """
+    Enrich an uploaded CSV with the village of each row's coordinates.
+
+    The input is streamed in chunks of GEOCODE_CHUNK_ROWS through the vectorized
+    locator and the output CSV is appended chunk by chunk, so the rows done so far
+    can be downloaded while the job runs. Progress is saved on the job after
+    every chunk and reported as Celery task state.
+    """
+    from .models import GeocodingJob
+
+    job = GeocodingJob.objects.get(job_id=job_id)
+    job.status = "RUNNING"
+    job.output_file.name = f"geocoding/results/{job.job_id}.csv"
+    job.save(update_fields=["status", "output_file", "updated_at"])
+
+    output_path = default_storage.path(job.output_file.name)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    try:
+        index = get_village_index()
+        job.boundary_version = index.version or ""
+        total_bytes = job.input_file.size or 1
+
+        with job.input_file.open("rb") as raw, open(output_path, "w", newline="", encoding="utf-8") as out:
+            reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+            writer = csv.writer(out)
+            header = next(reader, None)
+            if header is None:
+                raise ValueError("The file is empty")
+            try:
+                lat_col = header.index(job.latitude_column)
+                lon_col = header.index(job.longitude_column)
+            except ValueError:
+                raise ValueError(
+                    f"Columns '{job.latitude_column}' and '{job.longitude_column}' are required in the header"
+                )
+            writer.writerow([*header, *GEOCODE_COLUMNS])
+
+            while True:
+                rows = list(islice(reader, GEOCODE_CHUNK_ROWS))
+                if not rows:
+                    break
+                job.rows_located += geocode_rows(index, rows, lat_col, lon_col)
+                job.rows_processed += len(rows)
+                writer.writerows(rows)
+                out.flush()
+
+                job.progress = min(raw.tell() / total_bytes, 1.0)
+                job.save(update_fields=[
+                    "progress", "rows_processed", "rows_located", "boundary_version", "updated_at"
+                ])
+                if not self.request.is_eager:
+                    self.update_state(state="PROGRESS", meta={
+                        "job_id": str(job.job_id),
+                        "progress": job.progress,
+                        "rows_processed": job.rows_processed,
+                        "rows_located": job.rows_located,
+                    })
+    except Exception as e:
+        job.status = "FAILED"
+        job.error = str(e)
+        job.save(update_fields=["status", "error", "updated_at"])
+        raise
+
+    job.status = "SUCCESS"
+    job.progress = 1.0
+    job.save(update_fields=["status", "progress", "boundary_version", "updated_at"])
+    return {"job_id": str(job.job_id), "rows_processed": job.rows_processed, "rows_located": job.rows_located}
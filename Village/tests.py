@@ -1,3 +1,945 @@
-from django.test import TestCase
+import gzip
+import json
+import csv
+import math
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+import numpy as np
+import shapefile
+import shapely
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APITestCase
+
+from Resident.models import Resident
+from account.models import User
+from event.models import Event
+
+from kombu.exceptions import OperationalError as BrokerError
+
+from .boundaries import CompiledBoundaries, get_active_version, list_versions
+from .boundary_layers import ZOOM_TIERS, simplify_geometries
+from .boundary_packs import write_packs
+from .models import Cell, District, GeocodingJob, Province, Sector, Village
+from .serializers import LeaderSerializer, LocationSerializer, VillageRecordField
+from .geo_cache import LocateCache, reset_locate_cache
+from .tasks import geocode_csv
+from .hierarchy import get_hierarchy, reset_hierarchy
+from .registry import get_village_registry, reset_village_registry
+from .village_search import normalize_name
+from .geo_index import (
+    VillageBoundaryIndex,
+    check_for_new_version,
+    get_village_index,
+    is_village_index_ready,
+    neighbouring_villages,
+    load_village_index,
+    reset_village_index,
+)
+
+# 2 x 2 grid of 0.01 degree villages inside Burera
+TEST_VILLAGES = [
+    # (ID_5, cell, village, min_lon, min_lat)
+    (1, "Bugamba", "Kirwa", 29.80, -1.39),
+    (2, "Bugamba", "Rugarama", 29.81, -1.39),
+    (3, "Kaganda", "Kabeza", 29.80, -1.38),
+    (4, "Kaganda", "Nyange", 29.81, -1.38),
+]
+SIZE = 0.01
+
+
+def write_boundary_shapefile(directory, villages=TEST_VILLAGES):
+    """Write a small RWA_adm5-style shapefile and return its path."""
+    path = Path(directory) / "RWA_adm5.shp"
+    with shapefile.Writer(str(path), shapeType=shapefile.POLYGON) as w:
+        for name in ("ID_0", "ISO", "NAME_0", "ID_1", "NAME_1", "ID_2", "NAME_2",
+                     "ID_3", "NAME_3", "ID_4", "NAME_4", "ID_5", "NAME_5"):
+            if name.startswith("ID"):
+                w.field(name, "N", 10)
+            else:
+                w.field(name, "C", 50)
+        for id_5, cell, village, x, y in villages:
+            w.poly([[(x, y), (x, y + SIZE), (x + SIZE, y + SIZE), (x + SIZE, y), (x, y)]])
+            w.record(186, "RWA", "Rwanda", 4, "Amajyaruguru", 16, "Burera",
+                     120, "Kinyababa", 500, cell, id_5, village)
+    return str(path)
+
+
+def wavy_neighbours():
+    """Two villages sharing a jagged border, which per-polygon simplification tears apart."""
+    rng = np.random.default_rng(1)
+    xs = np.linspace(29.80, 29.85, 60)
+    border = list(zip(xs, -1.38 + rng.normal(0, 0.0008, len(xs))))
+    south = shapely.Polygon([(29.80, -1.40), *border, (29.85, -1.40)])
+    north = shapely.Polygon([*border, (29.85, -1.36), (29.80, -1.36)])
+    return np.array([south, north], dtype=object)
+
+
+class BoundaryShapefileMixin:
+    """Point the village index at a temporary test shapefile."""
+
+    def setUp(self):
+        super().setUp()
+        self.boundary_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.boundary_dir, ignore_errors=True)
+        self.shapefile_path = write_boundary_shapefile(self.boundary_dir)
+        self.compiled_dir = str(Path(self.boundary_dir) / "compiled")
+        settings_override = override_settings(
+            VILLAGE_BOUNDARY_SHAPEFILE=self.shapefile_path,
+            VILLAGE_BOUNDARY_COMPILED_DIR=self.compiled_dir,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_village_index()
+        self.addCleanup(reset_village_index)
+        reset_locate_cache()
+        self.addCleanup(reset_locate_cache)
+
+
+class VillageBoundaryIndexTest(BoundaryShapefileMixin, TestCase):
+    def test_locate_point_inside_village(self):
+        index = VillageBoundaryIndex.from_shapefile(self.shapefile_path)
+        self.assertEqual(len(index), 4)
+        info = index.locate(29.815, -1.375)
+        self.assertEqual(info["village"], "Nyange")
+        self.assertEqual(info["cell"], "Kaganda")
+        self.assertEqual(info["province"], "Amajyaruguru")
+
+    def test_locate_point_outside_returns_none(self):
+        index = VillageBoundaryIndex.from_shapefile(self.shapefile_path)
+        self.assertIsNone(index.locate(30.5, -2.0))
+
+    def test_index_is_loaded_once(self):
+        self.assertIs(get_village_index(), get_village_index())
+
+
+class LocatePointAPITest(BoundaryShapefileMixin, APITestCase):
+    def test_locate_point(self):
+        response = self.client.post(
+            reverse("locate_point_api"), {"latitude": -1.385, "longitude": 29.805}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["village"], "Kirwa")
+
+    def test_locate_point_not_found(self):
+        response = self.client.post(
+            reverse("locate_point_api"), {"latitude": 0.0, "longitude": 0.0}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class LocatePointBatchAPITest(BoundaryShapefileMixin, APITestCase):
+    def test_results_follow_input_order(self):
+        points = [[-1.375, 29.815], [0.0, 0.0], [-1.385, 29.805]]
+        response = self.client.post(reverse("locate_point_batch_api"), {"points": points}, format="json")
+        self.assertEqual(response.status_code, 200)
+        results = response.data["data"]["results"]
+        self.assertEqual([r and r["village"] for r in results], ["Nyange", None, "Kirwa"])
+        self.assertEqual(response.data["data"]["found"], 2)
+
+    def test_rejects_malformed_points(self):
+        response = self.client.post(
+            reverse("locate_point_batch_api"), {"points": [[-1.3, 29.8, 5]]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class CompiledBoundariesTest(BoundaryShapefileMixin, TestCase):
+    def test_compiled_index_matches_shapefile_index(self):
+        call_command("compile_boundaries", stdout=StringIO())
+        compiled = load_village_index()
+        self.assertIsInstance(compiled.source, CompiledBoundaries)
+
+        from_shapefile = VillageBoundaryIndex.from_shapefile(self.shapefile_path)
+        for _, _, _, x, y in TEST_VILLAGES:
+            point = (x + SIZE / 2, y + SIZE / 2)
+            self.assertEqual(compiled.locate(*point), from_shapefile.locate(*point))
+        self.assertIsNone(compiled.locate(30.5, -2.0))
+
+    def test_grid_lookup_matches_polygon_tests(self):
+        call_command("compile_boundaries", stdout=StringIO())
+        compiled = load_village_index()
+        self.assertIsNotNone(compiled.grid)
+        # Centre of a village is an interior cell, resolved without polygon tests
+        self.assertGreaterEqual(compiled.grid.lookup(29.815, -1.375), 0)
+
+        tree_only = VillageBoundaryIndex.from_shapefile(self.shapefile_path)
+        rng = np.random.default_rng(5)
+        longitudes = rng.uniform(29.795, 29.825, 2000)
+        latitudes = rng.uniform(-1.395, -1.365, 2000)
+        expected = tree_only.locate_many(longitudes, latitudes)
+        np.testing.assert_array_equal(compiled.locate_many(longitudes, latitudes), expected)
+        self.assertEqual(
+            [compiled.locate_record(x, y) for x, y in zip(longitudes[:200], latitudes[:200])],
+            [None if r < 0 else r for r in expected[:200].tolist()],
+        )
+
+
+class BoundaryVersionReloadTest(BoundaryShapefileMixin, APITestCase):
+    def test_new_active_version_is_swapped_in(self):
+        call_command("compile_boundaries", stdout=StringIO())
+        first = get_active_version(self.compiled_dir)
+        index = get_village_index()
+        self.assertEqual(index.version, first)
+
+        url = reverse("locate_point_api")
+        point = {"latitude": -1.385, "longitude": 29.805}
+        response = self.client.post(url, point, format="json")
+        self.assertEqual(response.data["data"]["boundary_version"], first)
+
+        renamed = [(1, "Bugamba", "Kirwa Mushya", 29.80, -1.39)] + TEST_VILLAGES[1:]
+        write_boundary_shapefile(self.boundary_dir, renamed)
+        call_command("compile_boundaries", stdout=StringIO())
+        second = get_active_version(self.compiled_dir)
+        self.assertNotEqual(first, second)
+        # Requests keep the index they started with until the swap
+        self.assertIs(get_village_index(), index)
+
+        self.assertEqual(check_for_new_version(background=False), second)
+        self.assertIsNot(get_village_index(), index)
+        response = self.client.post(url, point, format="json")
+        self.assertEqual(response.data["data"]["village"], "Kirwa Mushya")
+        self.assertEqual(response.data["data"]["boundary_version"], second)
+        self.assertIsNone(check_for_new_version(background=False))
+
+        # Roll back
+        call_command("compile_boundaries", "--activate", first, stdout=StringIO())
+        check_for_new_version(background=False)
+        self.assertEqual(get_village_index().version, first)
+
+    def test_old_versions_are_pruned(self):
+        for _ in range(3):
+            call_command("compile_boundaries", "--keep", "2", "--no-layers", stdout=StringIO())
+        versions = list_versions(self.compiled_dir)
+        self.assertEqual(len(versions), 2)
+        self.assertEqual(get_active_version(self.compiled_dir), versions[-1])
+
+
+class NearestVillageTest(BoundaryShapefileMixin, APITestCase):
+    # ~110 m east of Nyange, outside every polygon
+    OUTSIDE = {"latitude": -1.375, "longitude": 29.821}
+
+    def test_nearest_fallback(self):
+        index = get_village_index()
+        record, distance = index.nearest(self.OUTSIDE["longitude"], self.OUTSIDE["latitude"], 500)
+        self.assertEqual(index.attributes[record]["village"], "Nyange")
+        self.assertAlmostEqual(distance, 111, delta=2)
+
+        response = self.client.post(reverse("locate_point_api"), {**self.OUTSIDE, "nearest": True}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["match"], "nearest")
+
+        response = self.client.post(
+            reverse("locate_point_api"), {**self.OUTSIDE, "nearest": True, "max_distance_m": 50}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_accuracy_candidates_ranked_by_overlap(self):
+        # Just inside Kirwa, close to its border with Kabeza
+        response = self.client.post(
+            reverse("locate_point_api"),
+            {"latitude": -1.3803, "longitude": 29.805, "accuracy_m": 100},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["village"], "Kirwa")
+        candidates = response.data["data"]["candidates"]
+        self.assertEqual([c["village"] for c in candidates], ["Kirwa", "Kabeza"])
+        self.assertGreater(candidates[0]["overlap"], candidates[1]["overlap"])
+
+
+class JoinVillageByCoordinatesTest(BoundaryShapefileMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(phone_number="0788000001", password="Pass1234@", first_name="Ana")
+        self.client.force_authenticate(user=self.user)
+
+    def test_outside_point_offers_candidates_then_joins_chosen(self):
+        url = reverse("join-by-coordinates")
+        point = {"latitude": -1.375, "longitude": 29.821}
+        response = self.client.post(url, point, format="json")
+        self.assertEqual(response.status_code, 200)
+        candidate = response.data["data"]["candidates"][0]
+        self.assertEqual(candidate["village"], "Nyange")
+
+        response = self.client.post(url, {**point, "record": candidate["record"]}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Resident.objects.get(person=self.user.person).village.village, "Nyange")
+
+    def test_joins_linked_row_without_matching_names(self):
+        call_command("load_villages", stdout=StringIO())
+        # A row whose names drifted from the shapefile is still found through boundary_id
+        Village.objects.filter(boundary_id=4).update(village="Nyange (old spelling)")
+        nyange = Village.objects.get(boundary_id=4)
+
+        response = self.client.post(
+            reverse("locate_point_api"), {"latitude": -1.375, "longitude": 29.815}, format="json"
+        )
+        self.assertEqual(response.data["data"]["village_id"], nyange.village_id)
+
+        response = self.client.post(
+            reverse("join-by-coordinates"), {"latitude": -1.375, "longitude": 29.815}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Resident.objects.get(person=self.user.person).village_id, nyange.pk)
+        self.assertEqual(Village.objects.count(), 4)
+
+    def test_unloaded_village_is_created_on_boundary_id(self):
+        response = self.client.post(
+            reverse("join-by-coordinates"), {"latitude": -1.385, "longitude": 29.805}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        village = Village.objects.get()
+        self.assertEqual((village.boundary_id, village.village), (1, "Kirwa"))
+        self.assertEqual(get_village_index().village_keys(0), (village.pk, village.village_id))
+
+    def test_unloaded_village_links_its_existing_row(self):
+        legacy = Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Bugamba", village="Kirwa", leader=None,
+        )
+        response = self.client.post(
+            reverse("join-by-coordinates"), {"latitude": -1.385, "longitude": 29.805}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Village.objects.get(), legacy)
+        self.assertEqual(Village.objects.get().boundary_id, 1)
+        self.assertEqual(Resident.objects.get(person=self.user.person).village_id, legacy.pk)
+
+    def test_rejects_record_far_from_point(self):
+        response = self.client.post(
+            reverse("join-by-coordinates"), {"latitude": -1.375, "longitude": 29.821, "record": 0}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class LoadVillagesCommandTest(BoundaryShapefileMixin, TestCase):
+    def test_load_is_idempotent_and_links_legacy_rows(self):
+        legacy = Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Bugamba", village="Kirwa", leader=None,
+        )
+
+        out = StringIO()
+        call_command("load_villages", "--dry-run", stdout=out)
+        self.assertIn("created: 3", out.getvalue())
+        self.assertEqual(Village.objects.count(), 1)
+
+        call_command("load_villages", "--batch-size", "2", stdout=StringIO())
+        self.assertEqual(Village.objects.count(), 4)
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.boundary_id, 1)
+
+        out = StringIO()
+        call_command("load_villages", stdout=out)
+        self.assertIn("created: 0, renamed: 0, linked to existing rows: 0, unchanged: 4", out.getvalue())
+
+    def test_stores_centroid_area_and_bbox(self):
+        call_command("load_villages", stdout=StringIO())
+        kirwa = Village.objects.get(boundary_id=1)
+        self.assertAlmostEqual(kirwa.centroid_longitude, 29.805)
+        self.assertAlmostEqual(kirwa.centroid_latitude, -1.385)
+        self.assertAlmostEqual(kirwa.area_km2, 1.239, places=2)
+        self.assertEqual(
+            (kirwa.min_longitude, kirwa.min_latitude, kirwa.max_longitude, kirwa.max_latitude),
+            (29.80, -1.39, 29.81, -1.38),
+        )
+
+    def test_renamed_village_is_updated_in_place(self):
+        call_command("load_villages", stdout=StringIO())
+        renamed = [(1, "Bugamba", "Kirwa Mushya", 29.80, -1.39)] + TEST_VILLAGES[1:]
+        write_boundary_shapefile(self.boundary_dir, renamed)
+
+        out = StringIO()
+        call_command("load_villages", stdout=out)
+        self.assertIn("renamed: 1", out.getvalue())
+        self.assertEqual(Village.objects.get(boundary_id=1).village, "Kirwa Mushya")
+        self.assertEqual(Village.objects.count(), 4)
+
+
+class AdminUnitsTest(BoundaryShapefileMixin, TestCase):
+    def test_load_villages_fills_the_integer_keys(self):
+        call_command("load_villages", stdout=StringIO())
+        self.assertEqual((Province.objects.count(), District.objects.count(), Sector.objects.count()), (1, 1, 1))
+        self.assertEqual(sorted(Cell.objects.values_list("name", flat=True)), ["Bugamba", "Kaganda"])
+        kirwa = Village.objects.get(boundary_id=1)
+        self.assertEqual(kirwa.cell_ref.name, "Bugamba")
+        self.assertEqual(kirwa.cell_ref.sector_id, kirwa.sector_ref_id)
+
+        moved = [(1, "Kaganda", "Kirwa", 29.80, -1.39)] + TEST_VILLAGES[1:]
+        write_boundary_shapefile(self.boundary_dir, moved)
+        call_command("load_villages", stdout=StringIO())
+        self.assertEqual(Village.objects.get(boundary_id=1).cell_ref.name, "Kaganda")
+        self.assertEqual(Cell.objects.count(), 2)
+
+    def test_saved_villages_and_backfill(self):
+        village = Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Bugamba", village="Kirwa", leader=None,
+        )
+        self.assertEqual(village.district_ref.name, "Burera")
+        village.district = "Musanze"
+        village.save()
+        self.assertEqual(Village.objects.get(pk=village.pk).district_ref.name, "Musanze")
+        self.assertEqual(village.province_ref_id, Province.objects.get(name="Amajyaruguru").id)
+
+        village.cell = "Kaganda"
+        village.save(update_fields=["cell"])
+        self.assertEqual(Village.objects.get(pk=village.pk).cell_ref.name, "Kaganda")
+
+        Village.objects.update(province_ref=None, district_ref=None, sector_ref=None, cell_ref=None)
+        out = StringIO()
+        call_command("sync_admin_units", stdout=out)
+        self.assertIn("created: 0, villages updated: 1", out.getvalue())
+        self.assertEqual(Village.objects.get(pk=village.pk).sector_ref.district.name, "Musanze")
+
+    def test_leader_filters_use_the_unit_tables(self):
+        leader = User.objects.create_user(phone_number="0788000003", password="Pass1234@", first_name="Leo")
+        Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Bugamba", village="Kirwa", leader=leader,
+        )
+        url = reverse("leader-list")
+        self.assertEqual(len(self.client.get(url, {"district": "burera"}).data["data"]), 1)
+        self.assertEqual(len(self.client.get(url, {"district": "Musanze"}).data["data"]), 0)
+
+
+class LocateCacheTest(BoundaryShapefileMixin, TestCase):
+    def test_quantized_points_share_an_entry(self):
+        locate_cache = LocateCache(precision=4, size=2)
+        index = get_village_index()
+        self.assertEqual(locate_cache.locate_record(index, 29.81512, -1.37503), 3)
+        self.assertEqual(locate_cache.locate_record(index, 29.81508, -1.37497), 3)
+        self.assertIsNone(locate_cache.locate_record(index, 30.5, -2.0))
+        self.assertIsNone(locate_cache.locate_record(index, 30.5, -2.0))
+        stats = locate_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+
+    def test_point_just_inside_a_border_is_not_rounded_across_it(self):
+        call_command("compile_boundaries", stdout=StringIO())
+        # Kirwa and Rugarama meet at longitude 29.81; both points round onto it
+        for index in (VillageBoundaryIndex.from_shapefile(self.shapefile_path), load_village_index()):
+            locate_cache = LocateCache(precision=4, size=10)
+            self.assertEqual(locate_cache.locate_record(index, 29.80996, -1.385), 0)
+            self.assertEqual(locate_cache.locate_record(index, 29.81004, -1.385), 1)
+            self.assertEqual(locate_cache.locate_record(index, 29.80996, -1.385), 0)
+            self.assertEqual(locate_cache.stats()["size"], 0)
+            # Interior points are still cached
+            locate_cache.locate_record(index, 29.805, -1.385)
+            self.assertEqual(locate_cache.locate_record(index, 29.80502, -1.38498), 0)
+            self.assertEqual(locate_cache.hits, 1)
+
+    def test_lru_eviction(self):
+        locate_cache = LocateCache(precision=4, size=2)
+        index = get_village_index()
+        for point in [(29.805, -1.385), (29.815, -1.385), (29.805, -1.375), (29.805, -1.385)]:
+            locate_cache.locate_record(index, *point)
+        self.assertEqual(locate_cache.stats()["size"], 2)
+        self.assertEqual(locate_cache.misses, 4)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_shared_tier_is_used_across_workers(self):
+        index = get_village_index()
+        LocateCache(shared=True).locate_record(index, 29.805, -1.385)
+        other_worker = LocateCache(shared=True)
+        self.assertEqual(other_worker.locate_record(index, 29.805, -1.385), 0)
+        self.assertEqual(other_worker.shared_hits, 1)
+
+
+class SimplifyGeometriesTest(TestCase):
+    def test_neighbours_neither_overlap_nor_leave_a_gap(self):
+        villages = wavy_neighbours()
+        for name, _, tolerance, decimals in ZOOM_TIERS:
+            with self.subTest(tier=name):
+                south, north = simplify_geometries(villages, tolerance, decimals)
+                self.assertTrue(south.is_valid and north.is_valid)
+                self.assertAlmostEqual(shapely.intersection(south, north).area, 0, delta=1e-12)
+                self.assertAlmostEqual(shapely.union(south, north).area, shapely.union_all(villages).area, delta=1e-12)
+
+
+class VillageBoundaryLayerAPITest(BoundaryShapefileMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        call_command("compile_boundaries", stdout=StringIO())
+
+    def test_district_layer_is_gzipped_with_etag(self):
+        url = reverse("village_boundaries")
+        response = self.client.get(url, {"district": "Burera", "zoom": 14}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        collection = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(collection["features"]), 4)
+
+        etag = response["ETag"]
+        response = self.client.get(
+            url, {"district": "Burera", "zoom": 14}, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, {"district": "Burera", "tier": "low"})
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(json.loads(response.content)["type"], "FeatureCollection")
+
+    def test_unknown_district(self):
+        response = self.client.get(reverse("village_boundaries"), {"district": "Atlantis"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_tile_is_clipped_to_tile_bounds(self):
+        # zoom 14 tile containing Kirwa
+        x = int((29.805 + 180) / 360 * 2 ** 14)
+        y = int((1 - math.asinh(math.tan(math.radians(-1.385))) / math.pi) / 2 * 2 ** 14)
+        response = self.client.get(reverse("village_boundary_tile", args=[14, x, y]))
+        self.assertEqual(response.status_code, 200)
+        features = json.loads(response.content)["features"]
+        self.assertIn("Kirwa", [f["properties"]["village"] for f in features])
+
+        response = self.client.get(reverse("village_boundary_tile", args=[3, 0, 0]))
+        self.assertEqual(response.status_code, 400)
+
+
+class BenchmarkLocatorCommandTest(BoundaryShapefileMixin, TestCase):
+    def test_writes_latency_report(self):
+        call_command("compile_boundaries", stdout=StringIO())
+        output = str(Path(self.boundary_dir) / "bench.json")
+        call_command("benchmark_locator", points=50, scan_points=5, output=output, stdout=StringIO())
+        with open(output) as fh:
+            results = json.load(fh)
+        self.assertEqual(results["villages"], 4)
+        self.assertEqual(set(results["single_point"]), {"inside", "border", "outside"})
+        inside = results["single_point"]["inside"]
+        self.assertEqual(
+            set(inside),
+            {"shapefile_index", "shapefile_index_cached", "compiled_index", "compiled_index_cached", "shapefile_scan"},
+        )
+        self.assertEqual(inside["shapefile_scan"]["points"], 5)
+        self.assertLessEqual(inside["compiled_index"]["p50_ms"], inside["compiled_index"]["p99_ms"])
+        self.assertIn("rss_delta_mb", results["load"]["compiled_index"])
+
+
+class VillageIndexWarmupTest(BoundaryShapefileMixin, APITestCase):
+    def test_health_warms_an_index_that_was_not_preloaded(self):
+        self.assertFalse(is_village_index_ready())
+        response = self.client.get(reverse("locate_health"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["data"]["ready"])
+        self.assertEqual(response.data["data"]["villages"], 4)
+        self.assertTrue(is_village_index_ready())
+
+    def test_health_reports_not_ready_without_boundary_data(self):
+        with override_settings(VILLAGE_BOUNDARY_SHAPEFILE=str(Path(self.boundary_dir) / "missing.shp")):
+            response = self.client.get(reverse("locate_health"))
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.data["data"]["ready"])
+
+    def test_app_ready_warms_index_when_enabled(self):
+        call_command("compile_boundaries", stdout=StringIO())
+        with override_settings(VILLAGE_INDEX_WARMUP=True):
+            apps.get_app_config("Village").ready()
+        self.assertTrue(is_village_index_ready())
+        index = get_village_index()
+        self.assertFalse(any(geometry is None for geometry in index._geometries))
+
+        response = self.client.get(reverse("locate_health"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["villages"], 4)
+        self.assertTrue(response.data["data"]["compiled"])
+
+        reset_village_index()
+        self.assertFalse(is_village_index_ready())
+
+
+class NearbyVillagesAPITest(BoundaryShapefileMixin, APITestCase):
+    def test_k_nearest(self):
+        response = self.client.get(reverse("villages_nearby"), {"latitude": -1.385, "longitude": 29.806, "k": 2})
+        self.assertEqual(response.status_code, 200)
+        results = response.data["data"]["results"]
+        self.assertEqual([r["village"] for r in results], ["Kirwa", "Rugarama"])
+        self.assertAlmostEqual(results[0]["distance_m"], 111.3, delta=1)
+
+    def test_within_radius(self):
+        response = self.client.get(
+            reverse("villages_nearby"), {"latitude": -1.385, "longitude": 29.806, "radius_km": 1.05}
+        )
+        self.assertEqual([r["village"] for r in response.data["data"]["results"]], ["Kirwa", "Rugarama"])
+
+        response = self.client.get(reverse("villages_nearby"), {"latitude": 0, "longitude": 0, "radius_km": 5})
+        self.assertEqual(response.data["data"]["count"], 0)
+
+    def test_compiled_index_matches_shapefile(self):
+        call_command("compile_boundaries", stdout=StringIO())
+        compiled = VillageBoundaryIndex.from_compiled(self.compiled_dir)
+        records, distances = compiled.nearest_centroids(29.806, -1.385, k=4)
+        expected = VillageBoundaryIndex.from_shapefile(self.shapefile_path).nearest_centroids(29.806, -1.385, k=4)
+        np.testing.assert_array_equal(records, expected[0])
+        np.testing.assert_allclose(distances, expected[1])
+
+
+class VillageAdjacencyTest(BoundaryShapefileMixin, APITestCase):
+    def test_neighbours_by_hops(self):
+        row = [(1, "Bugamba", "Kirwa", 29.80, -1.39), (2, "Bugamba", "Rugarama", 29.81, -1.39),
+               (3, "Kaganda", "Kabeza", 29.82, -1.39), (4, "Kaganda", "Nyange", 29.90, -1.39)]
+        write_boundary_shapefile(self.boundary_dir, row)
+        index = VillageBoundaryIndex.from_shapefile(self.shapefile_path)
+        np.testing.assert_array_equal(index.neighbours(0, hops=1)[0], [1])
+        records, hops = index.neighbours(0, hops=3)
+        np.testing.assert_array_equal(records, [1, 2])
+        np.testing.assert_array_equal(hops, [1, 2])
+        self.assertEqual(len(index.neighbours(3, hops=2)[0]), 0)
+
+        call_command("compile_boundaries", stdout=StringIO())
+        compiled = VillageBoundaryIndex.from_compiled(self.compiled_dir)
+        for record in range(4):
+            np.testing.assert_array_equal(compiled.neighbours(record, 2)[0], index.neighbours(record, 2)[0])
+
+    def test_neighbours_endpoint_and_python_api(self):
+        call_command("load_villages", stdout=StringIO())
+        kirwa = Village.objects.get(boundary_id=1)
+        response = self.client.get(reverse("village_neighbours"), {"village_id": str(kirwa.village_id)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["village"]["village"], "Kirwa")
+        # Nyange only touches Kirwa at a corner
+        self.assertEqual(
+            sorted(n["village"] for n in response.data["data"]["neighbours"]), ["Kabeza", "Nyange", "Rugarama"]
+        )
+        self.assertEqual(
+            set(neighbouring_villages(kirwa).values_list("boundary_id", flat=True)), {2, 3, 4}
+        )
+
+        response = self.client.get(reverse("village_neighbours"), {"record": 99})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("village_neighbours"))
+        self.assertEqual(response.status_code, 400)
+
+
+class GeocodingJobTest(BoundaryShapefileMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        media_override = override_settings(MEDIA_ROOT=str(Path(self.boundary_dir) / "media"))
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.user = User.objects.create_user(phone_number="0788000002", password="Pass1234@", first_name="Eric")
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, content, **extra):
+        upload = SimpleUploadedFile("households.csv", content.encode("utf-8"), content_type="text/csv")
+        # Run the task in-process, as a worker would
+        run_task = lambda job_id: geocode_csv.apply(args=[job_id])
+        with patch("Village.locationviews.geocode_csv.delay", side_effect=run_task):
+            return self.client.post(reverse("geocoding_job_upload"), {"file": upload, **extra}, format="multipart")
+
+    def test_csv_is_enriched_in_chunks(self):
+        call_command("load_villages", stdout=StringIO())
+        content = "household,lat,lng\nA,-1.385,29.805\nB,-1.375,29.815\nC,0,0\nD,not-a-number,29.8\n"
+        with patch("Village.tasks.GEOCODE_CHUNK_ROWS", 3):
+            response = self.upload(content, latitude_column="lat", longitude_column="lng")
+        self.assertEqual(response.status_code, 202)
+
+        job = GeocodingJob.objects.get(job_id=response.data["data"]["job_id"])
+        self.assertEqual((job.status, job.rows_processed, job.rows_located), ("SUCCESS", 4, 2))
+        with job.output_file.open("r") as fh:
+            rows = list(csv.reader(fh))
+        self.assertEqual(rows[0], ["household", "lat", "lng", "province", "district", "sector", "cell", "village", "village_id"])
+        self.assertEqual(rows[1][7], "Kirwa")
+        self.assertEqual(rows[1][8], str(Village.objects.get(boundary_id=1).village_id))
+        self.assertEqual(rows[2][7], "Nyange")
+        self.assertEqual(rows[3][3:], [""] * 6)
+        self.assertEqual(rows[4][3:], [""] * 6)
+
+        response = self.client.get(response.data["data"]["status_url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["progress"], 1.0)
+        self.assertTrue(response.data["data"]["output_url"].endswith(".csv"))
+
+    def test_missing_columns_fail_the_job(self):
+        response = self.upload("x,y\n1,2\n")
+        job = GeocodingJob.objects.get(job_id=response.data["data"]["job_id"])
+        self.assertEqual(job.status, "FAILED")
+        self.assertIn("latitude", job.error)
+
+    def test_other_users_cannot_see_a_job(self):
+        response = self.upload("latitude,longitude\n-1.385,29.805\n")
+        other = User.objects.create_user(phone_number="0788000003", password="Pass1234@", first_name="Jo")
+        self.client.force_authenticate(user=other)
+        response = self.client.get(reverse("geocoding_job_status", args=[response.data["data"]["job_id"]]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unreachable_broker_fails_the_job(self):
+        upload = SimpleUploadedFile("households.csv", b"latitude,longitude\n-1.385,29.805\n", content_type="text/csv")
+        with patch("Village.locationviews.geocode_csv.delay", side_effect=BrokerError("Connection refused")):
+            response = self.client.post(reverse("geocoding_job_upload"), {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 503)
+        job = GeocodingJob.objects.get(job_id=response.data["errors"]["job_id"])
+        self.assertEqual(job.status, "FAILED")
+        self.assertIn("Connection refused", job.error)
+
+
+def decode_pack_polygon(polygon, pack):
+    """Rebuild a shapely polygon from the pack encoding, the way a client would."""
+    rings = []
+    for ring in polygon:
+        coords = np.cumsum(np.asarray(ring).reshape(-1, 2), axis=0) / pack["scale"] + pack["origin"]
+        rings.append(coords)
+    return shapely.Polygon(rings[0], rings[1:])
+
+
+class BoundaryPackTest(BoundaryShapefileMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        call_command("compile_boundaries", stdout=StringIO())
+
+    def test_pack_resolves_points_offline(self):
+        response = self.client.get(reverse("village_boundary_packs"))
+        self.assertEqual(response.status_code, 200)
+        (entry,) = response.data["data"]["packs"]
+        self.assertEqual((entry["district"], entry["villages"]), ("Burera", 4))
+
+        response = self.client.get(entry["url"], HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        pack = json.loads(gzip.decompress(response.content))
+
+        grid = pack["grid"]
+        for _, _, name, x, y in TEST_VILLAGES:
+            lon, lat = x + SIZE / 3, y + SIZE / 3
+            col = int((lon - pack["origin"][0]) // grid["cell"])
+            row = int((lat - pack["origin"][1]) // grid["cell"])
+            cell = row * grid["cols"] + col
+            listed = grid["items"][grid["offsets"][cell]:grid["offsets"][cell + 1]]
+            hits = [
+                pack["villages"][i]["village"] for i in listed
+                if any(decode_pack_polygon(p, pack).contains(shapely.Point(lon, lat))
+                       for p in pack["villages"][i]["polygons"])
+            ]
+            self.assertEqual(hits, [name])
+
+        response = self.client.get(entry["url"], HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_neighbouring_villages_share_their_edge(self):
+        # Neighbours on a district border, so each lands in a different pack
+        directory = Path(self.boundary_dir) / "wavy"
+        villages = wavy_neighbours()
+        attributes = [
+            dict(province="Amajyaruguru", district=district, sector="Kinyababa", cell="Bugamba", village=name)
+            for district, name in (("Burera", "Kirwa"), ("Musanze", "Kabeza"))
+        ]
+        manifest = write_packs(str(directory), villages, attributes, np.array([1, 3]))
+        decoded = []
+        for district in ("Burera", "Musanze"):
+            with gzip.open(directory / "packs" / manifest["districts"][district]["file"]) as fh:
+                pack = json.load(fh)
+            decoded.append(decode_pack_polygon(pack["villages"][0]["polygons"][0], pack))
+
+        south, north = decoded
+        self.assertAlmostEqual(shapely.intersection(south, north).area, 0, delta=1e-12)
+        self.assertAlmostEqual(shapely.union(south, north).area, shapely.union_all(villages).area, delta=1e-12)
+        self.assertGreater(shapely.intersection(south.boundary, north.boundary).length, 0.05)
+
+    def test_pack_url_is_stable_for_unchanged_content(self):
+        first = self.client.get(reverse("village_boundary_packs")).data["data"]["packs"][0]["hash"]
+        call_command("compile_boundaries", stdout=StringIO())
+        check_for_new_version(background=False)
+        self.assertEqual(self.client.get(reverse("village_boundary_packs")).data["data"]["packs"][0]["hash"], first)
+
+        response = self.client.get(reverse("village_boundary_pack", args=["burera", "0" * 16]))
+        self.assertEqual(response.status_code, 404)
+
+
+class HierarchyAPITest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_hierarchy()
+        self.addCleanup(reset_hierarchy)
+        for cell, village in (("Kaganda", "Nyange"), ("Bugamba", "Rugarama"), ("Bugamba", "Kirwa")):
+            Village.objects.create(
+                province="Amajyaruguru", district="Burera", sector="Kinyababa",
+                cell=cell, village=village, leader=None,
+            )
+        self.url = reverse("Village-hierarchical")
+
+    def test_levels_are_served_from_memory(self):
+        self.assertEqual(self.client.get(self.url).data["data"]["provinces"], ["Amajyaruguru"])
+
+        with self.assertNumQueries(0):
+            cells = self.client.get(self.url, {
+                "province": "Amajyaruguru", "district": "Burera", "sector": "Kinyababa",
+            }).data["data"]["cells"]
+            villages = self.client.get(self.url, {
+                "province": "Amajyaruguru", "district": "Burera", "sector": "Kinyababa", "cell": "Bugamba",
+            }).data["data"]["villages"]
+            unknown = self.client.get(self.url, {"province": "Nowhere"}).data["data"]["districts"]
+
+        self.assertEqual(cells, ["Bugamba", "Kaganda"])
+        self.assertEqual([v["village"] for v in villages], ["Kirwa", "Rugarama"])
+        self.assertEqual(unknown, [])
+        self.assertEqual(self.client.get(self.url, {"district": "Burera"}).status_code, 400)
+
+    def test_village_changes_invalidate_the_tree(self):
+        params = {"province": "Amajyaruguru", "district": "Burera", "sector": "Kinyababa", "cell": "Kaganda"}
+        self.assertEqual(len(self.client.get(self.url, params).data["data"]["villages"]), 1)
+
+        kabeza = Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Kaganda", village="Kabeza", leader=None,
+        )
+        villages = self.client.get(self.url, params).data["data"]["villages"]
+        self.assertEqual([v["village"] for v in villages], ["Kabeza", "Nyange"])
+
+        kabeza.delete()
+        self.assertEqual(len(self.client.get(self.url, params).data["data"]["villages"]), 1)
+
+    @override_settings(VILLAGE_HIERARCHY_MAX_AGE=60)
+    def test_tree_expires_without_a_version_bump(self):
+        tree = get_hierarchy()
+        # A change made by another worker whose bump this worker's cache never sees
+        Village.objects.filter(village="Kirwa").update(village="Kirwa II")
+        self.assertIs(get_hierarchy(), tree)
+        with patch("Village.hierarchy.time.monotonic", return_value=tree.built_at + 60):
+            villages = get_hierarchy().get("Amajyaruguru", "Burera", "Kinyababa", "Bugamba")
+        self.assertEqual([v["village"] for v in villages], ["Kirwa II", "Rugarama"])
+
+    @override_settings(VILLAGE_HIERARCHY_MAX_AGE=None)
+    def test_shared_cache_relies_on_the_version_key(self):
+        tree = get_hierarchy()
+        with patch("Village.hierarchy.time.monotonic", return_value=tree.built_at + 24 * 60 * 60):
+            self.assertIs(get_hierarchy(), tree)
+
+    def test_snapshot_is_built_once_per_change(self):
+        url = reverse("Village-snapshot")
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        document = json.loads(gzip.decompress(response.content))
+        (province,) = document["provinces"]
+        cells = province["districts"][0]["sectors"][0]["cells"]
+        self.assertEqual([c["name"] for c in cells], ["Bugamba", "Kaganda"])
+        kirwa = Village.objects.get(village="Kirwa")
+        self.assertEqual(cells[0]["villages"][0], {"village_id": str(kirwa.village_id), "village": "Kirwa"})
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+        kirwa.village = "Kirwa II"
+        kirwa.save()
+        changed = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], response["ETag"])
+
+
+class VillageTypeaheadTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_hierarchy()
+        self.addCleanup(reset_hierarchy)
+        for district, sector, cell, village in (
+            ("Burera", "Kinyababa", "Bugamba", "Kabeza"),
+            ("Burera", "Kinyababa", "Kaganda", "Kabeza"),
+            ("Burera", "Kinyababa", "Kaganda", "Kabeza II"),
+            ("Musanze", "Kinyababa", "Bugamba", "Kabeza"),
+            ("Musanze", "Muhoza", "Ruhengeri", "Rugarama"),
+        ):
+            Village.objects.create(
+                province="Amajyaruguru", district=district, sector=sector,
+                cell=cell, village=village, leader=None,
+            )
+        self.url = reverse("Village-typeahead")
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name(" Nyabugogo-Kabeza  "), "nyabugogo kabeza")
+        self.assertEqual(normalize_name("Ruhengéri"), "ruhengeri")
+
+    def test_identical_names_are_disambiguated(self):
+        villages = self.client.get(self.url, {"q": "kabeza"}).data["data"]["villages"]
+        self.assertEqual([v["label"] for v in villages], [
+            "Kabeza, Bugamba, Kinyababa, Burera",
+            "Kabeza, Kaganda, Kinyababa, Burera",
+            "Kabeza, Bugamba, Kinyababa, Musanze",
+            "Kabeza II, Kaganda, Kinyababa",
+        ])
+        self.assertEqual(villages[0]["cell"], "Bugamba")
+        self.assertTrue(villages[0]["village_id"])
+
+    def test_word_prefix_fuzzy_and_filters(self):
+        def names(**params):
+            return [v["village"] for v in self.client.get(self.url, params).data["data"]["villages"]]
+
+        self.assertEqual(names(q="ii"), ["Kabeza II"])
+        self.assertEqual(names(q="Rugarma"), ["Rugarama"])
+        self.assertEqual(names(q="kab", district="Musanze"), ["Kabeza"])
+        self.assertEqual(len(names(q="k", limit=2)), 2)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_new_villages_are_searchable(self):
+        self.assertEqual(self.client.get(self.url, {"q": "nyange"}).data["data"]["count"], 0)
+        Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Kaganda", village="Nyange", leader=None,
+        )
+        self.assertEqual(self.client.get(self.url, {"q": "nyange"}).data["data"]["count"], 1)
+
+
+class EventVillageSerializer(serializers.ModelSerializer):
+    village = VillageRecordField()
+
+    class Meta:
+        model = Event
+        fields = ["event_id", "village"]
+
+
+class VillageRegistryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_village_registry()
+        self.addCleanup(reset_village_registry)
+        self.leader = User.objects.create_user(phone_number="0788000004", password="Pass1234@", first_name="Ines")
+        self.villages = [
+            Village.objects.create(
+                province="Amajyaruguru", district="Burera", sector="Kinyababa",
+                cell="Bugamba", village=name, leader=leader,
+            )
+            for name, leader in (("Kirwa", self.leader), ("Rugarama", None))
+        ]
+        for village in self.villages * 3:
+            Event.objects.create(
+                title="Umuganda", description="Monthly work", exact_place_of_village="Office",
+                date="2025-01-25", start_time="08:00", end_time="11:00",
+                organizer=self.leader, village=village,
+            )
+
+    def test_nested_villages_need_no_queries(self):
+        events = list(Event.objects.order_by("created_at"))
+        get_village_registry()
+        with self.assertNumQueries(0):
+            data = EventVillageSerializer(events, many=True).data
+        self.assertEqual(data[0]["village"], LocationSerializer(events[0].village).data)
+        self.assertEqual({row["village"]["village"] for row in data}, {"Kirwa", "Rugarama"})
+
+    def test_output_can_be_changed_without_touching_the_registry(self):
+        event = Event.objects.filter(village=self.villages[0]).first()
+        EventVillageSerializer(event).data["village"]["village"] = "Changed"
+        LeaderSerializer(self.leader).data["village"]["district"] = "Changed"
+        self.assertEqual(EventVillageSerializer(event).data["village"], LocationSerializer(self.villages[0]).data)
+        self.assertEqual(LeaderSerializer(self.leader).data["village"]["district"], "Burera")
+
+    def test_changes_rebuild_the_registry(self):
+        event = Event.objects.filter(village=self.villages[1]).first()
+        self.assertEqual(EventVillageSerializer(event).data["village"]["village"], "Rugarama")
+        self.villages[1].village = "Rugarama II"
+        self.villages[1].save()
+        self.assertEqual(EventVillageSerializer(event).data["village"]["village"], "Rugarama II")
+
+    def test_leader_village_comes_from_the_registry(self):
+        self.assertEqual(LeaderSerializer(self.leader).data["village"]["village"], "Kirwa")
+        self.villages[0].leader = None
+        self.villages[0].save()
+        self.assertIsNone(LeaderSerializer(self.leader).data["village"])
@@ -1,7 +1,21 @@
 from django.urls import path
 from . import views
 from django.urls import path, include
-from .locationviews import LocatePointAPIView,JoinVillageByCoordinatesAPIView
+from .locationviews import (
+    LocatePointAPIView,
+    LocatePointBatchAPIView,
+    NearbyVillagesAPIView,
+    VillageNeighboursAPIView,
+    GeocodingJobUploadAPIView,
+    GeocodingJobStatusAPIView,
+    JoinVillageByCoordinatesAPIView,
+    LocateCacheStatsAPIView,
+    VillageIndexHealthAPIView,
+    VillageBoundaryLayerAPIView,
+    VillageBoundaryTileAPIView,
+    BoundaryPackListAPIView,
+    BoundaryPackAPIView,
+)
 from rest_framework.routers import DefaultRouter
 from .views import LocationViewSet,LeaderViewSet
 
@@ -13,6 +27,17 @@ router.register(r'leaders', LeaderViewSet, basename='leader')
 urlpatterns = [
     path("locate/", views.locate_point, name="locate_village"),
     path("locate/place/", LocatePointAPIView.as_view(), name="locate_point_api"),
+    path("locate/place/batch/", LocatePointBatchAPIView.as_view(), name="locate_point_batch_api"),
+    path("locate/nearby/", NearbyVillagesAPIView.as_view(), name="villages_nearby"),
+    path("locate/neighbours/", VillageNeighboursAPIView.as_view(), name="village_neighbours"),
+    path("locate/geocode/", GeocodingJobUploadAPIView.as_view(), name="geocoding_job_upload"),
+    path("locate/geocode/<uuid:job_id>/", GeocodingJobStatusAPIView.as_view(), name="geocoding_job_status"),
+    path("locate/cache-stats/", LocateCacheStatsAPIView.as_view(), name="locate_cache_stats"),
+    path("locate/health/", VillageIndexHealthAPIView.as_view(), name="locate_health"),
+    path("boundaries/", VillageBoundaryLayerAPIView.as_view(), name="village_boundaries"),
+    path("boundaries/tiles/<int:z>/<int:x>/<int:y>/", VillageBoundaryTileAPIView.as_view(), name="village_boundary_tile"),
+    path("boundaries/packs/", BoundaryPackListAPIView.as_view(), name="village_boundary_packs"),
+    path("boundaries/packs/<slug:slug>.<str:content_hash>.json", BoundaryPackAPIView.as_view(), name="village_boundary_pack"),
     path('',include(router.urls)),
     path('join-community-by-coordinates/', JoinVillageByCoordinatesAPIView.as_view(), name='join-by-coordinates'),
   
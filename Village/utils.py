@@ -1,4 +1,6 @@
 # utils/api_response.py
+import gzip
+from django.http import HttpResponse
 from rest_framework.response import Response
 from urllib.parse import urlencode
 
@@ -59,4 +61,28 @@ def _get_page_url(request, page_number):
         
     params = request.query_params.copy()
     params['page'] = page_number
-    return f"{request.build_absolute_uri(request.path)}?{urlencode(params)}"
\ No newline at end of file
+    return f"{request.build_absolute_uri(request.path)}?{urlencode(params)}"
+
+
+def gzipped_response(request, body, etag, content_type="application/json", cache_control="public, max-age=86400"):
+    """
+    Serve a pre-gzipped body with a strong ETag.
+
+    Answers If-None-Match with 304 and decompresses for clients that do not accept gzip.
+    The gzip and identity representations get distinct ETags.
+    """
+    use_gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+    tag = f'"{etag}-gz"' if use_gzip else f'"{etag}"'
+    if_none_match = [t.strip() for t in request.META.get("HTTP_IF_NONE_MATCH", "").split(",")]
+
+    if tag in if_none_match or "*" in if_none_match:
+        response = HttpResponse(status=304)
+    elif use_gzip:
+        response = HttpResponse(body, content_type=content_type)
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(gzip.decompress(body), content_type=content_type)
+    response["ETag"] = tag
+    response["Cache-Control"] = cache_control
+    response["Vary"] = "Accept-Encoding"
+    return response
@@ -1,10 +1,11 @@
 from django.shortcuts import render
-import shapefile
-from shapely.geometry import Point, shape
+from .geo_index import get_village_index
+from event.query_budget import query_budget
 #postgresql://:@dpg-d31jvrjuibrs73928oc0-a.oregon-postgres.render.com/
 
 TAG = ["location"]
 
+@query_budget(queries=1)
 def locate_point(request):
     result = None
 
@@ -12,23 +13,7 @@ def locate_point(request):
         latitude = float(request.POST.get("latitude"))
         longitude = float(request.POST.get("longitude"))
 
-        # Load shapefile
-        # sf = shapefile.Reader(r"C:\Users\highe\OneDrive\Desktop\Capstone Project\Village_level_boundary\RWA_adm5.shp")
-        sf = shapefile.Reader(r"C:\Users\highe\OneDrive\Desktop\Capstone Project\Village level boundary\RWA_adm5.shp")
-
-        point = Point(longitude, latitude)
-
-        for record, shp in zip(sf.records(), sf.shapes()):
-            polygon = shape(shp.__geo_interface__)
-            if polygon.contains(point):
-                result = {
-                    "province": record[4],
-                    "district": record[6],
-                    "sector": record[8],
-                    "cell": record[10],
-                    "village": record[12],
-                }
-                break
+        result = get_village_index().locate(longitude, latitude)
 
     return render(request, "home/home.html", {"result": result})
 
@@ -40,11 +25,15 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 from django.db.models import Q
 
+from .hierarchy import bump_hierarchy_version, get_hierarchy
 from .models import Village
 from .serializers import LocationSerializer
+from .utils import gzipped_response
+from .village_search import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT
 from event.utils import success_response, error_response
 
 
+@query_budget(queries=3)
 class LocationViewSet(viewsets.ReadOnlyModelViewSet):
     """
     A ViewSet for viewing locations with hierarchical filtering.
@@ -80,52 +69,41 @@ class LocationViewSet(viewsets.ReadOnlyModelViewSet):
             sector = request.query_params.get('sector')
             cell = request.query_params.get('cell')
 
+            # Every level is served from this worker's in-memory tree
+            tree = get_hierarchy()
+
             # Return unique provinces
             if not any([province, district, sector, cell]):
-                provinces = Village.objects.values_list('province', flat=True).distinct()
                 return success_response(
-                    data={"provinces": sorted(provinces)},
+                    data={"provinces": tree.get()},
                     message="Provinces retrieved successfully"
                 )
 
             # Return districts for a province
             if province and not district and not sector and not cell:
-                districts = Village.objects.filter(province=province)\
-                    .values_list('district', flat=True).distinct()
                 return success_response(
-                    data={"districts": sorted(districts)},
+                    data={"districts": tree.get(province)},
                     message=f"Districts in {province} retrieved successfully"
                 )
 
             # Return sectors for a district
             if province and district and not sector and not cell:
-                sectors = Village.objects.filter(province=province, district=district)\
-                    .values_list('sector', flat=True).distinct()
                 return success_response(
-                    data={"sectors": sorted(sectors)},
+                    data={"sectors": tree.get(province, district)},
                     message=f"Sectors in {district}, {province} retrieved successfully"
                 )
 
             # Return cells for a sector
             if province and district and sector and not cell:
-                cells = Village.objects.filter(province=province, district=district, sector=sector)\
-                    .values_list('cell', flat=True).distinct()
                 return success_response(
-                    data={"cells": sorted(cells)},
+                    data={"cells": tree.get(province, district, sector)},
                     message=f"Cells in {sector}, {district} retrieved successfully"
                 )
 
             # Return villages for a cell
             if province and district and sector and cell:
-                villages = Village.objects.filter(
-                    province=province, 
-                    district=district, 
-                    sector=sector, 
-                    cell=cell
-                ).values('village_id', 'village')
                 return success_response(
-                    
-                    data={"villages": list(villages)},
+                    data={"villages": tree.get(province, district, sector, cell)},
                     message=f"Villages in {cell}, {sector} retrieved successfully"
                 )
 
@@ -142,6 +120,60 @@ class LocationViewSet(viewsets.ReadOnlyModelViewSet):
                 status_code=400
             )
 
+    @extend_schema(
+        summary="Download the whole location hierarchy",
+        description="""Every province, district, sector, cell and village (with its village_id)
+        as one gzipped JSON document, so registration forms can fill all dropdowns from a
+        single request. Keep the document and revalidate with If-None-Match: the server
+        answers 304 until a Village changes.""",
+        responses={200: OpenApiTypes.OBJECT, 304: None}
+    )
+    @action(detail=False, methods=['get'])
+    def snapshot(self, request):
+        body, etag = get_hierarchy().snapshot()
+        return gzipped_response(request, body, etag, cache_control="public, no-cache")
+
+    @extend_schema(
+        summary="Search villages by name",
+        description="""Typeahead over village names: prefix matches of the name or of any word in it,
+        then close spellings. Each result carries its full location and a label with the
+        cell and sector (plus district/province when still ambiguous) to tell apart villages
+        sharing a name.""",
+        parameters=[
+            OpenApiParameter(name='q', description='Beginning of the village name', required=True, type=OpenApiTypes.STR),
+            OpenApiParameter(name='limit', description=f'Maximum results (default {SEARCH_DEFAULT_LIMIT}, max {SEARCH_MAX_LIMIT})', required=False, type=OpenApiTypes.INT),
+            OpenApiParameter(name='province', description='Only villages in this province', required=False, type=OpenApiTypes.STR),
+            OpenApiParameter(name='district', description='Only villages in this district', required=False, type=OpenApiTypes.STR),
+        ],
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def typeahead(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return error_response(
+                message="Search text is required",
+                errors="Provide the beginning of a village name as 'q'",
+                status_code=400
+            )
+        try:
+            limit = min(max(int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+        except ValueError:
+            return error_response(message="Invalid limit", errors="limit must be an integer", status_code=400)
+
+        filters = {
+            level: request.query_params[level]
+            for level in ('province', 'district') if request.query_params.get(level)
+        }
+        villages = get_hierarchy().name_index().search(query, limit=limit, **filters)
+        return success_response(
+            data={"query": query, "count": len(villages), "villages": villages},
+            message="Villages retrieved successfully"
+        )
+
 
 
 ########## managing leaders
@@ -156,9 +188,12 @@ from django.db import transaction
 from .serializers import LeaderSerializer, PromoteToLeaderSerializer, UpdateLeaderSerializer
 from account.models import User, Person
 from Village.models import Village
+from .admin_units import unit_ids
+from Resident.utils import forget_led_villages
 from .permissions import IsSystemAdmin
 
 
+@query_budget(queries=3)
 class LeaderViewSet(mixins.RetrieveModelMixin,
                     mixins.ListModelMixin,
                     mixins.UpdateModelMixin,
@@ -169,7 +204,8 @@ class LeaderViewSet(mixins.RetrieveModelMixin,
     System admins can perform all actions except retrieving leaders (allowed for any authenticated user).
     """
     # queryset = User.objects.filter(role='leader', is_deleted=False)
-    queryset  = User.objects.filter(led_villages__isnull=False)
+    # The village of each leader comes from the village registry
+    queryset  = User.objects.filter(led_villages__isnull=False).select_related("person")
 
     serializer_class = LeaderSerializer
     
@@ -326,14 +362,10 @@ class LeaderViewSet(mixins.RetrieveModelMixin,
             if deleted_only:
                 leaders = leaders.filter(is_deleted=True)
 
-            if province:
-                leaders = leaders.filter(led_villages__province__iexact=province)
-            if district:
-                leaders = leaders.filter(led_villages__district__iexact=district)
-            if sector:
-                leaders = leaders.filter(led_villages__sector__iexact=sector)
-            if cell:
-                leaders = leaders.filter(led_villages__cell__iexact=cell)
+            # Names resolve to unit ids once; the leader query compares integers
+            for level, name in (("province", province), ("district", district), ("sector", sector), ("cell", cell)):
+                if name:
+                    leaders = leaders.filter(**{f"led_villages__{level}_ref_id__in": unit_ids(level, name)})
             if village_id:
                 leaders = leaders.filter(led_villages__village_id=village_id)
 
@@ -698,6 +730,10 @@ class LeaderViewSet(mixins.RetrieveModelMixin,
                 
                 # Remove from village
                 Village.objects.filter(leader=leader).update(leader=None)
+                # The update skips the Village signals
+                transaction.on_commit(bump_hierarchy_version)
+                forget_led_villages([leader.pk])
+                transaction.on_commit(lambda: forget_led_villages([leader.pk]))
                 
                 return Response({
                     "status": "success", 
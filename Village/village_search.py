@@ -0,0 +1,156 @@
+# Village/village_search.py
+"""
+Typeahead over village names.
+
+Names are normalized (accents and punctuation stripped, lower case) and
+grouped, since hundreds of villages share a name with others. Two indexes
+sit over the distinct names:
+
+- a prefix trie, stored flattened as the sorted list of every name and every
+  word suffix of a name ("kabeza i", "i"); the subtree under a prefix is the
+  contiguous range found by bisect, so completions need no per-node objects;
+- a trigram index mapping each trigram to the names containing it, used to
+  rank close spellings when the prefix alone finds too little.
+
+Each result is one village, labelled with its cell and sector (and district
+or province when those are still ambiguous) so identically named villages
+can be told apart.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+
+from .boundaries import ADMIN_LEVELS
+
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+# Minimum trigram similarity (Jaccard) of a fuzzy match
+SEARCH_MIN_SIMILARITY = 0.3
+# Ranks of the kinds of match; trigram matches score their similarity, below 1
+SCORE_EXACT, SCORE_PREFIX, SCORE_WORD_PREFIX = 3.0, 2.0, 1.5
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name):
+    """'Nyabugogo-Kabeza ' -> 'nyabugogo kabeza'."""
+    ascii_name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", ascii_name.lower()).strip()
+
+
+def trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def disambiguating_labels(villages):
+    """
+    Labels for villages sharing a name: the village with its cell and sector,
+    plus the district and province for as long as two labels still collide.
+    """
+    levels = ("cell", "sector", "district", "province")
+    for depth in range(2, len(levels) + 1):
+        labels = [", ".join([v["village"], *(v[level] for level in levels[:depth])]) for v in villages]
+        if len(set(labels)) == len(labels):
+            break
+    return labels
+
+
+class VillageNameIndex:
+    """
+    Prefix and trigram index over the names of ``villages``, a list of dicts with
+    the village_id, village and the administrative levels of each village.
+    """
+
+    def __init__(self, villages):
+        groups = defaultdict(list)
+        for village in villages:
+            groups[normalize_name(village["village"])].append(village)
+        groups.pop("", None)
+
+        self.names = sorted(groups)
+        self.name_lengths = np.array([len(name) for name in self.names], dtype=np.int32)
+        self.results = []
+        for name in self.names:
+            members = sorted(groups[name], key=lambda v: tuple(v[level] for level in ADMIN_LEVELS))
+            self.results.append([
+                dict(village, label=label)
+                for village, label in zip(members, disambiguating_labels(members))
+            ])
+
+        keys = []
+        for name_id, name in enumerate(self.names):
+            keys.append((name, name_id, 0))
+            for match in re.finditer(r" (?=\S)", name):
+                keys.append((name[match.end():], name_id, match.end()))
+        keys.sort()
+        self.keys = [key for key, _, _ in keys]
+        self.key_names = np.array([name_id for _, name_id, _ in keys], dtype=np.int32)
+        self.key_offsets = np.array([offset for _, _, offset in keys], dtype=np.int32)
+
+        postings = defaultdict(list)
+        self.trigram_counts = np.zeros(len(self.names), dtype=np.int32)
+        for name_id, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.trigram_counts[name_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(name_id)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefix_matches(self, query):
+        """{name_id: score} of names, or words within names, starting with query."""
+        lo = bisect_left(self.keys, query)
+        hi = bisect_left(self.keys, query + "\uffff", lo)
+        name_ids = self.key_names[lo:hi]
+        scores = np.where(self.key_offsets[lo:hi] == 0, SCORE_PREFIX, SCORE_WORD_PREFIX)
+        # Among prefix matches prefer the names completing the query most closely
+        scores = scores - self.name_lengths[name_ids] * 1e-3
+
+        matches = {}
+        for name_id, score in zip(name_ids.tolist(), scores.tolist()):
+            if score > matches.get(name_id, 0):
+                matches[name_id] = score
+        position = bisect_left(self.names, query)
+        if position < len(self.names) and self.names[position] == query:
+            matches[position] = SCORE_EXACT
+        return matches
+
+    def fuzzy_matches(self, query):
+        """{name_id: trigram similarity} of names close to query."""
+        grams = [self.postings[gram] for gram in trigrams(query) if gram in self.postings]
+        if not grams:
+            return {}
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.names))
+        similarity = shared / (len(trigrams(query)) + self.trigram_counts - shared)
+        name_ids = np.flatnonzero(similarity >= SEARCH_MIN_SIMILARITY)
+        return dict(zip(name_ids.tolist(), similarity[name_ids].tolist()))
+
+    def search(self, query, limit=SEARCH_DEFAULT_LIMIT, **filters):
+        """
+        Villages best matching query, at most limit of them. Filters (e.g.
+        district="Burera") restrict results to one branch of the hierarchy.
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        matches = self.prefix_matches(query)
+        if len(matches) < limit and len(query) >= 3:
+            for name_id, similarity in self.fuzzy_matches(query).items():
+                matches.setdefault(name_id, similarity)
+
+        ranked = sorted(matches.items(), key=lambda item: (-item[1], self.names[item[0]]))
+        results = []
+        for name_id, score in ranked:
+            for village in self.results[name_id]:
+                if all(village[level] == value for level, value in filters.items()):
+                    results.append(dict(village, score=round(score, 3)))
+                    if len(results) == limit:
+                        return results
+        return results
@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from Resident.models import Resident
+from Resident.utils import get_user_context
 
 
 class IsApprovedResident(permissions.BasePermission):
@@ -7,16 +7,7 @@ class IsApprovedResident(permissions.BasePermission):
     def has_permission(self, request, view):
         if not request.user.is_authenticated:
             return False
-            
-        try:
-            resident = Resident.objects.get(
-                person=request.user.person, 
-                is_deleted=False,
-                status='APPROVED'
-            )
-            return True
-        except Resident.DoesNotExist:
-            return False
+        return get_user_context(request).is_approved_resident
 
 
 class CanManageEvent(permissions.BasePermission):
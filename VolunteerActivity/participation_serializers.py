@@ -2,12 +2,12 @@
 
 from rest_framework import serializers
 from .models import VolunteerParticipation, VolunteeringEvent
-from Village.serializers import LocationSerializer  # adjust to your actual Village serializer
+from Village.serializers import VillageRecordField  # adjust to your actual Village serializer
 from account.serializers import UserListSerializer  # adjust to your actual User serializer
 
 # ---------------- Nested Event Serializer ----------------
 class VolunteeringEventNestedSerializer(serializers.ModelSerializer):
-    village = LocationSerializer(read_only=True)
+    village = VillageRecordField()
     organizer = UserListSerializer(read_only=True)
 
     class Meta:
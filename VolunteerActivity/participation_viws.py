@@ -14,6 +14,7 @@ from .models import VolunteerParticipation, VolunteeringEvent
 from .participation_serializers import VolunteerParticipationSerializer, VolunteerParticipationCreateSerializer,BulkParticipationUpdateSerializer
 
 from rest_framework.decorators import action
+from event.query_budget import query_budget
 # ---------------- Custom Paginator ----------------
 class ParticipationPagination(PageNumberPagination):
     """
@@ -42,6 +43,7 @@ class ParticipationPagination(PageNumberPagination):
 
 
 # ---------------- Volunteer Participation ViewSet ----------------
+@query_budget(queries=3)
 class VolunteerParticipationViewSet(viewsets.ModelViewSet):
     """
     ViewSet to manage volunteer participations, including:
@@ -50,7 +52,7 @@ class VolunteerParticipationViewSet(viewsets.ModelViewSet):
     - Approving/rejecting participations (single and bulk)
     - Counting approved participants
     """
-    queryset = VolunteerParticipation.objects.all()
+    queryset = VolunteerParticipation.objects.select_related("user__person", "event__organizer__person")
     serializer_class = VolunteerParticipationSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = ParticipationPagination
@@ -1,13 +1,13 @@
 # VolunteerActivity/serializers.py
 from rest_framework import serializers
 from .models import VolunteeringEvent
-from Village.serializers import LocationSerializer  # for village details
+from Village.serializers import VillageRecordField  # for village details
 from account.serializers import PersonSerializer 
 from account.serializers import UserListSerializer    # for organizer details
 
 class VolunteeringEventSerializer(serializers.ModelSerializer):
     # Use nested serializers for organizer and village
-    village = LocationSerializer(read_only=True)
+    village = VillageRecordField()
     organizer =UserListSerializer(read_only=True)
 
     class Meta:
@@ -9,6 +9,7 @@ from .models import VolunteeringEvent
 from .serializers import VolunteeringEventSerializer, VolunteeringEventCreateSerializer
 from Village.models import Village
 from Resident.models import Resident
+from event.query_budget import query_budget
 
 
 
@@ -62,8 +63,9 @@ class VolunteeringEventPagination(PageNumberPagination):
 # -------------------------
 # Volunteering Event ViewSet
 # -------------------------
+@query_budget(queries=3)
 class VolunteeringEventViewSet(viewsets.ModelViewSet):
-    queryset = VolunteeringEvent.objects.all()
+    queryset = VolunteeringEvent.objects.select_related("organizer__person")
     serializer_class = VolunteeringEventSerializer
     permission_classes = [IsAuthenticated, IsOrganizerOrLeader]
     pagination_class = VolunteeringEventPagination
@@ -382,6 +384,7 @@ class VolunteeringEventViewSet(viewsets.ModelViewSet):
 # Village Event ViewSet
 # -------------------------
 from .serializers import VillageMinimalSerializer,VolunteeringEventListSerializer
+@query_budget(queries=4)
 class VillageEventViewSet(viewsets.ViewSet):
     """
     ViewSet to list volunteering events of a specific village with role-based access.
@@ -479,7 +482,7 @@ class VillageEventViewSet(viewsets.ViewSet):
             return Response({"success": False, "message": "Village not found"}, status=status.HTTP_404_NOT_FOUND)
 
         user = request.user
-        queryset = VolunteeringEvent.objects.filter(village=village,status="APPROVED")
+        queryset = VolunteeringEvent.objects.filter(village=village,status="APPROVED").select_related("organizer__person")
 
 
         # --- Apply filters (status, category, date) ---
@@ -1,10 +1,18 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework import serializers
 from account.models import User 
-from Resident.models import Resident
+from account.token_claims import add_claims
+from event.dataloader import BatchListSerializer, get_loader
+from Resident.utils import NO_RESIDENCY, UserContext, get_user_context, load_residencies
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = 'phone_number'
 
+    @classmethod
+    def get_token(cls, user):
+        # Role and residency claims for TokenClaimsAuthentication
+        return add_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         data = super().validate(attrs)
 
@@ -30,6 +38,18 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
 
 
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh that re-stamps the role and residency claims from the current user."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is not None:
+            # The new access (and rotated refresh) token copy the refresh token's claims
+            attrs = dict(attrs, refresh=str(add_claims(refresh, user)))
+        return super().validate(attrs)
+
+
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -54,18 +74,31 @@ class UserSerializer(serializers.ModelSerializer):
             "person_type",
             "village"
         ]
+        list_serializer_class = BatchListSerializer
+
+    def residency_loader(self):
+        return get_loader(self.context, load_residencies, NO_RESIDENCY)
+
+    def register_loader_keys(self, obj):
+        self.residency_loader().register(obj.person_id)
+
     def get_village(self, obj):
         """Return the village of this user if they are a resident."""
-        resident = Resident.objects.filter(person=obj.person, is_deleted=False).first()
-        if resident:
+        request = self.context.get("request")
+        if request is not None and request.user == obj:
+            context = get_user_context(request)
+        else:
+            context = UserContext(obj, residency=self.residency_loader().load(obj.person_id))
+        village = context.village_record
+        if village:
             return {
-                "village_id": str(resident.village.village_id),
-                "name": resident.village.village,
-                "cell": resident.village.cell,
-                "sector": resident.village.sector,
-                "district": resident.village.district,
-                "province": resident.village.province,
-                "status": resident.status
+                "village_id": village.data["village_id"],
+                "name": village.village,
+                "cell": village.cell,
+                "sector": village.sector,
+                "district": village.district,
+                "province": village.province,
+                "status": context.residency_status
             }
         return None
 
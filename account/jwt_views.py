@@ -1,12 +1,12 @@
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.utils import extend_schema, OpenApiExample
-from .jwt_serializers import CustomTokenObtainPairSerializer
+from .jwt_serializers import CustomTokenObtainPairSerializer, ClaimsTokenRefreshSerializer
 from rest_framework.exceptions import ValidationError
 from event.utils import success_response
 from .error_responses import errorss__response
+from event.query_budget import query_budget
 
 
 # -----------------------------
@@ -72,7 +72,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 # Custom Token Refresh
 # -----------------------------
 @extend_schema(
-    request=TokenRefreshSerializer,
+    request=ClaimsTokenRefreshSerializer,
     examples=[
         OpenApiExample(
             "Refresh Token Request",
@@ -102,7 +102,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     ]
 )
 class CustomTokenRefreshView(TokenRefreshView):
-    serializer_class = TokenRefreshSerializer
+    serializer_class = ClaimsTokenRefreshSerializer
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -125,12 +125,13 @@ from .jwt_serializers import CustomTokenObtainPairSerializer, UserSerializer
 from rest_framework.views import APIView
 
 
+@query_budget(queries=1)
 class MeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        serializer = UserSerializer(user)
+        serializer = UserSerializer(user, context={"request": request})
         return Response({
             "status": "success",
             "message": "User profile retrieved",
@@ -135,6 +135,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     deleted_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped when the role or residency claims of issued tokens go stale (account.token_claims)
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'phone_number'
     REQUIRED_FIELDS = []
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import User
+from .token_claims import CLAIM_FIELDS, revoke_claims
+
+
+@receiver(post_save, sender=User)
+def revoke_user_claims(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Tokens issued before a change to the role, verification or person carry stale claims."""
+    if created or raw:
+        return
+    if update_fields is None or CLAIM_FIELDS.intersection(update_fields):
+        revoke_claims(user_pks=[instance.pk])
@@ -0,0 +1,99 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import User
+from account.token_claims import TokenClaimsAuthentication
+from Resident.models import Resident
+from Village.models import Village
+from Village.registry import reset_village_registry
+
+
+class TokenClaimsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_village_registry()
+        self.addCleanup(reset_village_registry)
+        self.village = Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Bugamba", village="Kirwa", leader=None,
+        )
+        self.user = User.objects.create_user(phone_number="0788000011", password="Pass1234@", first_name="Eric")
+        self.user.is_verified = True
+        self.user.save()
+        self.resident = Resident.objects.create(person=self.user.person, village=self.village, status="APPROVED")
+
+    def login(self):
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"phone_number": self.user.phone_number, "password": "Pass1234@"},
+        )
+        return response.data["data"]
+
+    def claims_user(self, access):
+        return TokenClaimsAuthentication().get_claims_user(AccessToken(access))
+
+    def test_login_token_carries_claims(self):
+        token = AccessToken(self.login()["access"])
+        self.assertEqual(token["role"], "resident")
+        self.assertTrue(token["is_verified"])
+        self.assertEqual(token["person_id"], self.user.person_id)
+        self.assertEqual(token["village_pk"], self.village.pk)
+        self.assertEqual(token["residency_status"], "APPROVED")
+        self.assertIsNone(token["led_village_pk"])
+
+    def test_reads_skip_user_and_resident_queries(self):
+        access = self.login()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.client.get("/alerts/").status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get("/alerts/").status_code, 200)
+        tables = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn('"account_user"', tables)
+        self.assertNotIn('"Resident_resident"', tables)
+
+        user = self.claims_user(access)
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.get_deferred_fields() & {"role", "person_id"}, set())
+
+    def test_leader_claim_seeds_the_led_village(self):
+        self.user.role = "leader"
+        self.user.save()
+        self.village.leader = self.user
+        self.village.save()
+        access = self.login()["access"]
+        self.assertEqual(AccessToken(access)["led_village_pk"], self.village.pk)
+
+        cache.clear()
+        request = Request(APIRequestFactory().get("/alerts/", HTTP_AUTHORIZATION=f"Bearer {access}"))
+        with CaptureQueriesContext(connection) as queries:
+            TokenClaimsAuthentication().authenticate(request)
+        self.assertEqual(request._user_context.led_village_id, self.village.pk)
+        self.assertNotIn('"Location_location"', " ".join(query["sql"] for query in queries.captured_queries))
+
+        self.village.leader = None
+        self.village.save()
+        self.assertIsNone(self.claims_user(access))
+
+    def test_changes_revoke_claims_until_refresh(self):
+        tokens = self.login()
+        self.assertIsNotNone(self.claims_user(tokens["access"]))
+
+        self.resident.status = "PENDING"
+        self.resident.save()
+        self.assertIsNone(self.claims_user(tokens["access"]))
+
+        refreshed = self.client.post(reverse("token_refresh"), {"refresh": tokens["refresh"]}).data["data"]
+        token = AccessToken(refreshed["access"])
+        self.assertEqual(token["residency_status"], "PENDING")
+        self.assertIsNotNone(self.claims_user(refreshed["access"]))
+
+        self.user.refresh_from_db()
+        self.user.role = "leader"
+        self.user.save()
+        self.assertIsNone(self.claims_user(refreshed["access"]))
@@ -0,0 +1,132 @@
+# account/token_claims.py
+"""
+Role and residency claims carried in the JWTs.
+
+Login and refresh stamp each token with what the role-based views need to
+decide access (role, verified flag, person, residency and led village) plus
+the user's ``auth_version``. TokenClaimsAuthentication trusts those claims
+on read-only requests, so a GET costs no User or Resident query: it builds a
+User with only the claimed fields loaded and seeds the request's UserContext.
+
+Changing a user's role, verification or residency, or the leader of a
+village, bumps ``auth_version`` (see account.signal, Resident.signal and
+Village.signal). Claims stamped with an older version
+are ignored and the request falls back to the normal database lookup until
+the client refreshes its token. The current version is cached for
+AUTH_VERSION_TTL seconds; set CACHE_REDIS_URL so every worker sees a bump at
+once rather than when its cached copy expires.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from Resident.utils import NO_LED_VILLAGE, UserContext
+
+from .models import User
+
+AUTH_VERSION_TTL = 60
+# User fields whose change revokes the claims of tokens already issued
+CLAIM_FIELDS = frozenset({"role", "is_verified", "is_active", "is_deleted", "person"})
+# Claims loaded into the token user, by User attname
+USER_CLAIMS = ("role", "is_verified", "person_id")
+AUTH_VERSION_CLAIM = "auth_version"
+
+
+def auth_version_key(user_pk):
+    return f"account-auth-version:{user_pk}"
+
+
+def get_auth_version(user_pk):
+    """Current auth_version of a user, cached; None if the user is gone or inactive."""
+    key = auth_version_key(user_pk)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_pk, is_active=True, is_deleted=False) \
+            .values_list("auth_version", flat=True).first()
+        cache.set(key, -1 if version is None else version, AUTH_VERSION_TTL)
+        return version
+    return None if version == -1 else version
+
+
+def forget_auth_versions(user_pks):
+    cache.delete_many([auth_version_key(pk) for pk in user_pks])
+
+
+def revoke_claims(user_pks=(), person_ids=()):
+    """
+    Invalidate the claims of every token issued so far to these users (or to
+    the users of these people); their next requests load the user again.
+    """
+    user_pks = list(user_pks)
+    if person_ids:
+        user_pks += User.objects.filter(person_id__in=person_ids).values_list("pk", flat=True)
+    if not user_pks:
+        return
+    User.objects.filter(pk__in=user_pks).update(auth_version=F("auth_version") + 1)
+    forget_auth_versions(user_pks)
+    # A request may re-cache the old version before this transaction commits
+    transaction.on_commit(lambda: forget_auth_versions(user_pks))
+
+
+def add_claims(token, user):
+    """Stamp a token with the user's role and residency claims."""
+    context = UserContext(user)
+    token["role"] = user.role
+    token["is_verified"] = user.is_verified
+    token["person_id"] = user.person_id
+    token["resident_pk"] = context.residency_id
+    token["residency_status"] = context.residency_status
+    token["village_pk"] = context.village_id
+    token["led_village_pk"] = context.led_village_id
+    token[AUTH_VERSION_CLAIM] = user.auth_version
+    return token
+
+
+class TokenClaimsAuthentication(JWTAuthentication):
+    """
+    JWT authentication that answers safe (read-only) requests from the token's
+    claims while they are current, and loads the user from the database
+    otherwise. The user it builds has only the pk and USER_CLAIMS loaded; any
+    other field is fetched on first access, so use it on views that decide
+    access from the role and the UserContext.
+    """
+
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = self.get_validated_token(raw_token)
+
+        user = self.get_claims_user(token)
+        if user is None:
+            return self.get_user(token), token
+        led_village_pk = token["led_village_pk"]
+        request._user_context = UserContext(
+            user,
+            residency=(token["resident_pk"], token["residency_status"], token["village_pk"]),
+            led_village=NO_LED_VILLAGE if led_village_pk is None else (led_village_pk,),
+        )
+        return user, token
+
+    def get_claims_user(self, token):
+        """A User built from current claims, or None when they are missing or revoked."""
+        if AUTH_VERSION_CLAIM not in token or api_settings.USER_ID_CLAIM not in token:
+            return None
+        user_pk = token[api_settings.USER_ID_CLAIM]
+        if get_auth_version(user_pk) != token[AUTH_VERSION_CLAIM]:
+            return None
+
+        claims = {field: token[field] for field in USER_CLAIMS}
+        claims[User._meta.pk.attname] = User._meta.pk.to_python(user_pk)
+        claims["is_active"] = True
+        fields = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+        return User.from_db("default", fields, [claims[field] for field in fields])
@@ -26,6 +26,7 @@ from .models import User
 from .tasks import send_verification_email_task
 from .permisions import IsAdminUser
 from .utils import generate_otp
+from event.query_budget import query_budget
 
 
 
@@ -261,6 +262,7 @@ class UserPagination(PageNumberPagination):
     max_page_size = 50
 
 
+@query_budget(queries=5)
 class AdminUserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserListSerializer
@@ -1,6 +1,6 @@
 from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
 from drf_spectacular.utils import extend_schema
-from Resident.utils import get_resident_location
+from Resident.utils import get_user_context
 
 class AlertRolePermissionMixin:
     """
@@ -21,10 +21,10 @@ class AlertRolePermissionMixin:
         if user.role == "admin":
             return qs
 
-        location = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if user.role == "leader":
-            return qs.filter(village=location) if location else qs.none()
+            return qs.filter(village_id=village_id) if village_id else qs.none()
 
         if user.role == "resident":
             return qs.filter(reporter=user)
@@ -34,12 +34,12 @@ class AlertRolePermissionMixin:
     def get_object(self):
         obj = super().get_object()
         user = self.request.user
-        location = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if not user.is_authenticated:
             raise PermissionDenied("You must be logged in.")
 
-        if user.role == "leader" and obj.village != location:
+        if user.role == "leader" and obj.village_id != village_id:
             raise PermissionDenied("Access denied to alerts from another village.")
 
         if user.role == "resident" and obj.reporter != user:
@@ -49,7 +49,7 @@ class AlertRolePermissionMixin:
 
     def perform_create(self, serializer):
         user = self.request.user
-        location = get_resident_location(user)
+        location = get_user_context(self.request).village
 
         if user.role in ["resident", "leader"]:
             if not location:
@@ -62,12 +62,12 @@ class AlertRolePermissionMixin:
 
     def perform_destroy(self, instance):
         user = self.request.user
-        location = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if user.role == "resident" and instance.reporter != user:
             raise PermissionDenied("You can only delete your own alerts.")
 
-        if user.role == "leader" and instance.village != location:
+        if user.role == "leader" and instance.village_id != village_id:
             raise PermissionDenied("You cannot delete alerts from another village.")
 
         instance.delete()
@@ -85,8 +85,8 @@ class AlertRolePermissionMixin:
             raise PermissionDenied("Only leaders and admins can update the status.")
 
         if user.role == "leader" and "status" in serializer.validated_data:
-            location = get_resident_location(user)
-            if instance.village != location:
+            village_id = get_user_context(self.request).village_id
+            if instance.village_id != village_id:
                 raise PermissionDenied("You cannot update status for alerts outside your village.")
 
         if user.role == "resident" and instance.reporter != user:
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import CommunityAlert
 from account.serializers import PersonSerializer
-from Village.serializers import LocationSerializer
+from Village.serializers import VillageRecordField
 from account.models import User
 
 class UserListSerializer(serializers.ModelSerializer):
@@ -12,7 +12,7 @@ class UserListSerializer(serializers.ModelSerializer):
 
 class CommunityAlertSerializer(serializers.ModelSerializer):
     reporter = UserListSerializer(read_only=True)
-    village = LocationSerializer(read_only=True)
+    village = VillageRecordField()
 
     class Meta:
         model = CommunityAlert
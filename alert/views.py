@@ -5,16 +5,21 @@ from .serializers import CommunityAlertSerializer
 from .utils import success_response, error_response
 from rest_framework import permissions
 from .mixins import AlertRolePermissionMixin
+from account.token_claims import TokenClaimsAuthentication
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.exceptions import MethodNotAllowed
+from event.query_budget import query_budget
 
 
 TAG = ["Community Alerts"]
 
 
+@query_budget(queries=3)
 class CommunityAlertViewSet(AlertRolePermissionMixin, viewsets.ModelViewSet):
-    queryset = CommunityAlert.objects.all().order_by("-created_at")
+    queryset = CommunityAlert.objects.select_related("reporter__person").order_by("-created_at")
     serializer_class = CommunityAlertSerializer
+    # Reads authorize from the token's role and village claims
+    authentication_classes = [TokenClaimsAuthentication]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'village', 'alert_type', 'urgency_level', 'incident_date']
     search_fields = ['title', 'description', 'alert_type']
@@ -1,5 +1,5 @@
 from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
-from Resident.utils import get_resident_location
+from Resident.utils import get_user_context
 from django.core.exceptions import PermissionDenied
 from drf_spectacular.utils import extend_schema
 
@@ -14,10 +14,10 @@ class ComplaintRolePermissionMixin:
         if user.role == "admin":
             return qs
 
-        location = get_resident_location(user)
+        location_id = get_user_context(self.request).village_id
 
         if user.role == "leader":
-            return qs.filter(location=location) if location else qs.none()
+            return qs.filter(location_id=location_id) if location_id else qs.none()
 
         if user.role == "resident":
             return qs.filter(complainant=user)
@@ -27,12 +27,12 @@ class ComplaintRolePermissionMixin:
     def get_object(self):
         obj = super().get_object()
         user = self.request.user
-        location = get_resident_location(user)
+        location_id = get_user_context(self.request).village_id
 
         if not user.is_authenticated:
             raise PermissionDenied("You must be logged in.")
 
-        if user.role == "leader" and obj.location != location:
+        if user.role == "leader" and obj.location_id != location_id:
             raise PermissionDenied("Access denied to complaints from another village.")
 
         if user.role == "resident" and obj.complainant != user.person:
@@ -42,7 +42,7 @@ class ComplaintRolePermissionMixin:
 
     def perform_create(self, serializer):
         user = self.request.user
-        location = get_resident_location(user)
+        location = get_user_context(self.request).village
 
         if user.role in ["resident", "leader"]:
             if not location:
@@ -56,10 +56,10 @@ class ComplaintRolePermissionMixin:
 
     def perform_destroy(self, instance):
         user = self.request.user
-        location = get_resident_location(user)
+        location_id = get_user_context(self.request).village_id
         if user.role == "resident" and instance.complainant != user:
             raise PermissionDenied("You can only delete your own complaints.")
-        if user.role == "leader" and instance.location != location:
+        if user.role == "leader" and instance.location_id != location_id:
             raise PermissionDenied("Cannot delete complaints from another village.")
         # Admins can delete any complaint
         instance.delete()
@@ -86,8 +86,8 @@ class ComplaintRolePermissionMixin:
 
         # Leaders can only update complaints in their village
         if user.role == "leader" and "status" in serializer.validated_data:
-            location = get_resident_location(user)
-            if instance.location != location:
+            location_id = get_user_context(self.request).village_id
+            if instance.location_id != location_id:
                 raise PermissionDenied("You cannot update status for complaints outside your village.")
 
         # Residents can only update their own complaints (e.g., description if you allow)
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Complaint
-from Village.serializers import LocationSerializer
+from Village.serializers import VillageRecordField
 from account.models import User 
 from account.serializers import PersonSerializer
 
@@ -13,7 +13,7 @@ class UserSerializer(serializers.ModelSerializer):
 
 class ComplaintSerializer(serializers.ModelSerializer):
     
-    location = LocationSerializer(read_only=True)
+    location = VillageRecordField()
     complainant = UserSerializer(read_only=True)
 
     class Meta:
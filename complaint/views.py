@@ -9,12 +9,14 @@ from Village.models import Village
 from .mixins import ComplaintRolePermissionMixin
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from rest_framework.response import Response
+from event.query_budget import query_budget
 
 
 TAG = ["Complaints"]
 
+@query_budget(queries=3)
 class ComplaintViewSet(viewsets.ModelViewSet, ComplaintRolePermissionMixin):
-    queryset = Complaint.objects.all().order_by('-date_submitted')
+    queryset = Complaint.objects.select_related('complainant__person').order_by('-date_submitted')
     serializer_class = ComplaintSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'location', 'date_submitted']
@@ -3,7 +3,7 @@ from rest_framework import serializers
 from .models import Contact
 from django.contrib.auth import get_user_model
 from Village.models import Village
-from Village.serializers import LocationSerializer
+from Village.serializers import VillageRecordField
 from account.serializers import UserListSerializer
 
 
@@ -16,7 +16,7 @@ from account.serializers import UserListSerializer
 
 class ContactSerializer(serializers.ModelSerializer):
     created_by = UserListSerializer(read_only=True)
-    village = LocationSerializer(read_only=True)
+    village = VillageRecordField()
 
     class Meta:
         model = Contact
@@ -5,6 +5,7 @@ from .models import Contact
 from .serializers import ContactSerializer
 from .permissions import IsLeaderOrAdmin
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from event.query_budget import query_budget
 
 
 TAG = ["Village contacts"]
@@ -16,8 +17,9 @@ TAG = ["Village contacts"]
     responses={200: ContactSerializer(many=True)},
     tags=TAG
 )
+@query_budget(queries=2)
 class ContactListView(generics.ListAPIView):
-    queryset = Contact.objects.all()
+    queryset = Contact.objects.select_related("created_by__person")
     serializer_class = ContactSerializer
     permission_classes = []  # Anyone can view
 
@@ -85,11 +87,13 @@ class ContactCreateView(generics.CreateAPIView):
         tags=TAG
     )
 )
+@query_budget(queries=2)
 class ContactDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Contact.objects.all()
+    queryset = Contact.objects.select_related("created_by__person")
     serializer_class = ContactSerializer
     permission_classes = [IsLeaderOrAdmin]
     lookup_field = "contact_id"  # ✅ use UUID instead of pk
+    lookup_url_kwarg = "pk"  # the route is contacts/<uuid:pk>/
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -0,0 +1,124 @@
+# event/dataloader.py
+"""
+Request-scoped batch loading for serializer fields.
+
+A field that needs one extra lookup per object (a count, a related row)
+asks a DataLoader for its key instead of querying. When a list serializer
+renders a page, BatchListSerializer first registers the keys of every
+object on the page, so the first load() resolves all of them with one
+batch function call (typically one ``IN`` query) and the rest are cache
+hits. Loaders live on the request, so nested serializers and both list
+and detail views share them; a single object still costs one query.
+
+A batch function takes a set of keys and returns {key: value}; keys it
+leaves out get the loader's default.
+"""
+from django.db.models import Count, Manager
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+
+
+class DataLoader:
+    def __init__(self, batch_fn, default=None):
+        self.batch_fn = batch_fn
+        self.default = default
+        self.values = {}
+        self.pending = set()
+
+    def register(self, key):
+        """Queue a key for the next batch."""
+        if key is not None and key not in self.values:
+            self.pending.add(key)
+
+    def load(self, key):
+        if key is None:
+            return self.default
+        if key not in self.values:
+            self.pending.add(key)
+            self.dispatch()
+        return self.values[key]
+
+    def dispatch(self):
+        """Resolve every queued key with one call of the batch function."""
+        keys, self.pending = self.pending, set()
+        if keys:
+            found = self.batch_fn(keys)
+            for key in keys:
+                self.values[key] = found.get(key, self.default)
+
+
+def get_loader(context, batch_fn, default=None):
+    """
+    The loader of batch_fn for this serializer context: shared across the
+    request when the context has one, else across this serializer tree.
+    """
+    request = context.get("request")
+    scope = getattr(request, "_request", request) if request is not None else None
+    if scope is not None:
+        loaders = scope.__dict__.setdefault("_dataloaders", {})
+    else:
+        loaders = context.setdefault("_dataloaders", {})
+    loader = loaders.get(batch_fn)
+    if loader is None:
+        loader = loaders[batch_fn] = DataLoader(batch_fn, default)
+    return loader
+
+
+def count_by(queryset, field):
+    """Batch function helper: {field value: number of rows} of queryset."""
+    return dict(queryset.order_by().values(field).annotate(n=Count("pk")).values_list(field, "n"))
+
+
+class LoaderField(serializers.ReadOnlyField):
+    """
+    Read-only field rendered by batch_fn from the object's ``source`` (its pk
+    by default), e.g. ``LoaderField(count_votes, default=0)``.
+    """
+
+    def __init__(self, batch_fn, default=None, **kwargs):
+        kwargs.setdefault("source", "pk")
+        self.batch_fn = batch_fn
+        self.loader_default = default
+        super().__init__(**kwargs)
+
+    @property
+    def loader(self):
+        return get_loader(self.context, self.batch_fn, self.loader_default)
+
+    def register(self, instance):
+        self.loader.register(self.get_attribute(instance))
+
+    def to_representation(self, value):
+        return self.loader.load(value)
+
+
+@extend_schema_field(OpenApiTypes.INT)
+class CountField(LoaderField):
+    """LoaderField of a count; objects the batch function leaves out count 0."""
+
+    def __init__(self, batch_fn, **kwargs):
+        super().__init__(batch_fn, default=0, **kwargs)
+
+
+class BatchListSerializer(serializers.ListSerializer):
+    """
+    List serializer that registers the loader keys of every object before
+    rendering any, so each loader runs once per page. Set it as the
+    ``list_serializer_class`` of a serializer with LoaderFields, or one whose
+    ``register_loader_keys(instance)`` queues its own keys.
+    """
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, Manager) else data)
+        register = getattr(self.child, "register_loader_keys", None)
+        loader_fields = [
+            field for field in self.child.fields.values()
+            if isinstance(field, LoaderField) and not field.write_only
+        ]
+        for instance in instances:
+            for field in loader_fields:
+                field.register(instance)
+            if register is not None:
+                register(instance)
+        return super().to_representation(instances)
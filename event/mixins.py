@@ -2,7 +2,7 @@
 from rest_framework.exceptions import PermissionDenied, MethodNotAllowed, NotAuthenticated
 from rest_framework.permissions import AllowAny
 from drf_spectacular.utils import extend_schema
-from Resident.utils import get_resident_location
+from Resident.utils import get_user_context
 
 class EventRolePermissionMixin:
     """
@@ -28,11 +28,11 @@ class EventRolePermissionMixin:
         if user.role == "admin":
             return qs
 
-        village = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if user.role == "leader":
             # Leader sees all events in their village
-            return qs.filter(village=village) if village else qs.none()
+            return qs.filter(village_id=village_id) if village_id else qs.none()
 
         if user.role == "resident":
             # Resident sees only events they organized
@@ -61,9 +61,9 @@ class EventRolePermissionMixin:
         if not hasattr(user, 'role'):
             raise PermissionDenied("Invalid user type.")
 
-        village = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
-        if user.role == "leader" and obj.village != village:
+        if user.role == "leader" and obj.village_id != village_id:
             raise PermissionDenied("Access denied to events from another village.")
 
         if user.role == "resident" and obj.organizer != user:
@@ -82,7 +82,7 @@ class EventRolePermissionMixin:
 
     def perform_create(self, serializer):
         user = self.check_user_authentication()
-        village = get_resident_location(user)
+        village = get_user_context(self.request).village
 
         if user.role in ["resident", "leader"]:
             if not village:
@@ -97,12 +97,12 @@ class EventRolePermissionMixin:
 
     def perform_destroy(self, instance):
         user = self.check_user_authentication()
-        village = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if user.role == "resident" and instance.organizer != user:
             raise PermissionDenied("You can only delete your own events.")
 
-        if user.role == "leader" and instance.village != village:
+        if user.role == "leader" and instance.village_id != village_id:
             raise PermissionDenied("You cannot delete events from another village.")
 
         # Admin can delete anything
@@ -123,8 +123,8 @@ class EventRolePermissionMixin:
 
         # Leader can update status only for their village
         if user.role == "leader" and "status" in serializer.validated_data:
-            village = get_resident_location(user)
-            if instance.village != village:
+            village_id = get_user_context(self.request).village_id
+            if instance.village_id != village_id:
                 raise PermissionDenied("You cannot update status for events outside your village.")
 
         # Residents can update other fields only for their own events
@@ -0,0 +1,41 @@
+# event/query_budget.py
+"""
+Query budgets of the API views.
+
+Each view that answers GET declares, next to its code, the most SQL queries
+(and milliseconds of SQL) one list or detail request may cost:
+
+    @query_budget(queries=4)
+    class ResidentsByVillageView(generics.ListAPIView):
+        ...
+
+SmartVillage/test_query_budgets.py seeds a dataset with full pages, requests
+every GET endpoint of the project's urls.py files and fails when one goes
+over its budget or has none, so a serializer change that adds per-row
+queries fails the test suite. Budgets are for an authenticated request, not
+counting the authentication itself.
+"""
+from collections import namedtuple
+
+QueryBudget = namedtuple("QueryBudget", ["queries", "sql_ms"])
+
+# SQL time allowed when a view does not declare its own; generous, since
+# query counts are what catches per-row lookups
+DEFAULT_SQL_MS = 250
+
+
+def query_budget(queries, sql_ms=DEFAULT_SQL_MS):
+    """Declare the query budget of a view class or function."""
+    def decorate(view):
+        view.query_budget = QueryBudget(queries, sql_ms)
+        return view
+    return decorate
+
+
+def get_query_budget(callback):
+    """The budget of a URL pattern's callback (as_view() result or function), or None."""
+    for view in (callback, getattr(callback, "cls", None), getattr(callback, "view_class", None)):
+        budget = getattr(view, "query_budget", None)
+        if budget is not None:
+            return budget
+    return None
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import Event
 from account.serializers import PersonSerializer
-from Village.serializers import LocationSerializer
+from Village.serializers import VillageRecordField
 from account.models import User
 # from account.serializers import UserListSerializer
 
@@ -15,7 +15,7 @@ class UserListSerializer(serializers.ModelSerializer):
 
 class EventSerializer(serializers.ModelSerializer):
     organizer=  UserListSerializer(read_only=True)   
-    village=LocationSerializer(read_only=True)
+    village=VillageRecordField()
     image_url = serializers.SerializerMethodField()  # Safe image URL
     # organizer = serializers.ReadOnlyField(source="organizer.email")
     # status = serializers.CharField(read_only=True)  # Default: read-only for everyone
@@ -62,7 +62,7 @@ class EventSerializer(serializers.ModelSerializer):
 
 
 class EventSerializer(serializers.ModelSerializer):
-    village = LocationSerializer(read_only=True) 
+    village = VillageRecordField()
     organizer=  UserListSerializer(read_only=True)   
 
     class Meta:
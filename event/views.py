@@ -7,6 +7,7 @@ from rest_framework import permissions
 from Resident.models import Resident
 from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
 from .mixins import EventRolePermissionMixin
+from account.token_claims import TokenClaimsAuthentication
 from Resident.utils import get_resident_location
 from rest_framework import viewsets, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
@@ -41,11 +42,13 @@ from drf_spectacular.types import OpenApiTypes
 from .models import Event
 from .serializers import EventSerializer,VillageEventsResponseSerializer
 from .models import STATUS_CHOICES, CATEGORY_CHOICES
+from .query_budget import query_budget
 
 
 TAG = ["Events"]
 
 
+@query_budget(queries=3)
 class EventsByVillageAPIView(APIView):
 
     @extend_schema(
@@ -97,11 +100,11 @@ class EventsByVillageAPIView(APIView):
         Returns all events for the given village_id (UUID).
         """
         try:
-            village = Village.objects.get(village_id=village_id)
+            village = Village.objects.select_related("leader__person").get(village_id=village_id)
         except Village.DoesNotExist:
             return Response({"detail": "Village not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        events = Event.objects.filter(village=village,status="APPROVED").order_by("-date")
+        events = Event.objects.filter(village=village,status="APPROVED").select_related("organizer__person").order_by("-date")
         event_serializer = EventSerializer(events, many=True)
 
         leader_data = None
@@ -138,9 +141,12 @@ class EventsByVillageAPIView(APIView):
 
 from .pagination import CustomPagination
 from rest_framework.permissions import IsAuthenticated, AllowAny
+@query_budget(queries=3)
 class EventViewSet(EventRolePermissionMixin, viewsets.ModelViewSet):
-    queryset = Event.objects.all().order_by("-created_at")
+    queryset = Event.objects.select_related("organizer__person").order_by("-created_at")
     serializer_class = EventSerializer
+    # Reads authorize from the token's role and village claims
+    authentication_classes = [TokenClaimsAuthentication]
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'category', 'date']
@@ -459,6 +465,7 @@ class EventFilter(django_filters.FilterSet):
         ]
 
 from .models import TYPE_CHOICES
+@query_budget(queries=4)
 class EventViewSetlist(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet to list events of a specific village with filters, searching, and pagination
@@ -521,7 +528,7 @@ class EventViewSetlist(viewsets.ReadOnlyModelViewSet):
             )
 
         # ✅ Base queryset
-        queryset = Event.objects.filter(village=village)
+        queryset = Event.objects.filter(village=village).select_related("organizer__person")
 
         # ✅ Apply filters, search, ordering
         queryset = self.filter_queryset(queryset)
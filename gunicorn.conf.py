@@ -0,0 +1,31 @@
+# gunicorn.conf.py
+import gc
+import os
+
+# Load Django, and with it the village boundary index, once in the master.
+# Workers are forked from the warm master and share the index copy-on-write.
+preload_app = True
+os.environ.setdefault("VILLAGE_INDEX_WARMUP", "True")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+
+
+def pre_fork(server, worker):
+    from django.db import connections
+
+    # The warm-up links villages with a query; workers must not inherit that connection
+    connections.close_all()
+    # Move everything loaded so far out of the collector's reach, so garbage
+    # collections in the workers don't write to (and un-share) those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from Village.geo_index import is_village_index_ready
+
+    if is_village_index_ready():
+        worker.log.info("Worker %s using the village index preloaded by the master", worker.pid)
+    else:
+        worker.log.warning("Village index not preloaded, worker %s will load it on first use", worker.pid)
@@ -1,3 +1,5 @@
 celery -A SmartVillage worker --loglevel=info --concurrency=1 &
 
-gunicorn SmartVillage.wsgi:application --bind 0.0.0.0:${PORT:-10000}
+python manage.py compile_boundaries || echo "Boundary compile failed, workers will read the shapefile"
+
+gunicorn SmartVillage.wsgi:application -c gunicorn.conf.py
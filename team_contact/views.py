@@ -6,7 +6,9 @@ from django.conf import settings
 from .models import TeamMember, ContactMessage, ContactReply
 from .serializers import TeamMemberSerializer, ContactMessageSerializer, ContactReplySerializer
 from .tasks import send_contact_reply_email
+from event.query_budget import query_budget
 
+@query_budget(queries=3)
 class TeamMemberViewSet(viewsets.ModelViewSet):
     queryset = TeamMember.objects.all().order_by('-created_at')
     serializer_class = TeamMemberSerializer
@@ -16,8 +18,9 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
             return [permissions.IsAdminUser()]
         return [permissions.AllowAny()]
 
+@query_budget(queries=5)
 class ContactMessageViewSet(viewsets.ModelViewSet):
-    queryset = ContactMessage.objects.all().order_by('-created_at')
+    queryset = ContactMessage.objects.prefetch_related('replies__replied_by').order_by('-created_at')
     serializer_class = ContactMessageSerializer
 
     def get_permissions(self):
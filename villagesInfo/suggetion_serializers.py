@@ -1,7 +1,16 @@
 from rest_framework import serializers
 from .models import Suggestion, Comment, Vote
-from Village.serializers import LocationSerializer
+from Village.serializers import VillageRecordField
 from account.serializers import UserListSerializer
+from event.dataloader import BatchListSerializer, CountField, count_by
+
+
+def count_votes(suggestion_ids):
+    return count_by(Vote.objects.filter(suggestion_id__in=suggestion_ids), "suggestion_id")
+
+
+def count_comments(suggestion_ids):
+    return count_by(Comment.objects.filter(suggestion_id__in=suggestion_ids), "suggestion_id")
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -16,9 +25,10 @@ class CommentSerializer(serializers.ModelSerializer):
 
 class SuggestionSerializer(serializers.ModelSerializer):
     author = serializers.SerializerMethodField()
-    votes_count = serializers.IntegerField(source="votes.count", read_only=True)
-    comments_count = serializers.IntegerField(source="comments.count", read_only=True)
-    village=LocationSerializer(read_only=True)
+    # Counted for the whole page at once
+    votes_count = CountField(count_votes)
+    comments_count = CountField(count_comments)
+    village=VillageRecordField()
 
     class Meta:
         model = Suggestion
@@ -29,6 +39,7 @@ class SuggestionSerializer(serializers.ModelSerializer):
             "village", "created_at", "updated_at"
         ]
         read_only_fields = ["resident", "village"]
+        list_serializer_class = BatchListSerializer
 
     def get_author(self, obj):
         return obj.author_display()
@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from .models import Suggestion, Vote, Comment
 from .suggetion_serializers import SuggestionSerializer, SuggestionDetailSerializer, CommentSerializer
+from event.query_budget import query_budget
 
 # ----------------------------
 # 1. POST /api/suggestions → Create a new suggestion
@@ -64,12 +65,13 @@ class SuggestionCreateView(generics.CreateAPIView):
 )
 
 
+@query_budget(queries=5)
 class SuggestionListView(generics.ListAPIView):
     serializer_class = SuggestionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Suggestion.objects.all().order_by("-created_at")
+        queryset = Suggestion.objects.select_related("resident__person").order_by("-created_at")
         status_param = self.request.query_params.get("status")
         category_param = self.request.query_params.get("category")
         if status_param:
@@ -106,6 +108,7 @@ class SuggestionListView(generics.ListAPIView):
     ],
     tags=["Suggestions"]
 )
+@query_budget(queries=9)
 class SuggestionDetailView(generics.RetrieveAPIView):
     serializer_class = SuggestionDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -247,6 +250,7 @@ class CommentCreateView(generics.CreateAPIView):
     },
     tags=["Comments"]
 )
+@query_budget(queries=5)
 class CommentListView(generics.ListAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -1,3 +1,61 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from account.models import User
+from Resident.models import Resident
+from Village.models import Village
+from Village.registry import reset_village_registry
+
+from .models import Comment, Suggestion, Vote
+
+
+class SuggestionListQueriesTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_village_registry()
+        self.addCleanup(reset_village_registry)
+        self.village = Village.objects.create(
+            province="Amajyaruguru", district="Burera", sector="Kinyababa",
+            cell="Bugamba", village="Kirwa", leader=None,
+        )
+        self.user = User.objects.create_user(phone_number="0788000020", password="Pass1234@", first_name="Diane")
+        self.resident = Resident.objects.create(person=self.user.person, village=self.village, status="APPROVED")
+        self.voters = [
+            User.objects.create_user(phone_number=f"078800003{i}", password="Pass1234@") for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def add_suggestion(self, votes, comments):
+        suggestion = Suggestion.objects.create(
+            resident=self.resident, village=self.village, title="Water point",
+            description="A second tap", category="infrastructure",
+        )
+        for voter in self.voters[:votes]:
+            Vote.objects.create(suggestion=suggestion, user=voter)
+        for _ in range(comments):
+            Comment.objects.create(suggestion=suggestion, user=self.user, text="Agreed")
+        return suggestion
+
+    def list_suggestions(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("suggestion-list"))
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"], len(queries)
+
+    def test_counts_are_loaded_once_per_page(self):
+        self.add_suggestion(votes=2, comments=1)
+        self.add_suggestion(votes=0, comments=0)
+        self.list_suggestions()  # builds the village registry
+        results, few = self.list_suggestions()
+        self.assertEqual(
+            sorted((row["votes_count"], row["comments_count"]) for row in results), [(0, 0), (2, 1)]
+        )
+
+        for votes in range(4):
+            self.add_suggestion(votes=votes % 3, comments=votes)
+        results, many = self.list_suggestions()
+        self.assertEqual(len(results), 6)
+        self.assertEqual(many, few)
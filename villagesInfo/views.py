@@ -7,11 +7,13 @@ from event.models import Event
 from .serializers import ResidentSerializer, EventSerializer, LocationSerializer,VolunteeringEventSerializer
 from drf_spectacular.utils import extend_schema, OpenApiExample
 from VolunteerActivity.models import VolunteeringEvent
+from event.query_budget import query_budget
 
 
 
 TAG = ["Village Info"]
 
+@query_budget(queries=10)
 class VillageNewsAPIView(APIView):
 
     @extend_schema(
@@ -3,7 +3,7 @@ from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
 from drf_spectacular.utils import extend_schema
 from account.models import Person
 from .models import Visitor
-from Resident.utils import get_resident_location  # same util you used
+from Resident.utils import get_user_context  # same util you used
 from .tasks import send_new_visitor_email  # (optional) for leader notification
 
 
@@ -27,10 +27,10 @@ class VisitorRolePermissionMixin:
         if user.role == 'admin':
             return qs
 
-        Village = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if user.role == 'leader':
-            return qs.filter(visitor_location=Village) if Village else qs.none()
+            return qs.filter(visitor_location_id=village_id) if village_id else qs.none()
 
         if user.role == 'resident':
             return qs.filter(host__added_by=user)
@@ -89,12 +89,12 @@ class VisitorRolePermissionMixin:
 
     def perform_destroy(self, instance):
         user = self.request.user
-        Village = get_resident_location(user)
+        village_id = get_user_context(self.request).village_id
 
         if user.role == 'resident' and instance.host.added_by != user:
             raise PermissionDenied("You can only delete your own visitors.")
 
-        if user.role == 'leader' and instance.visitor_location != Village:
+        if user.role == 'leader' and instance.visitor_location_id != village_id:
             raise PermissionDenied("You cannot delete visitors from another village.")
 
         # Admin can delete anything
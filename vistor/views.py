@@ -7,6 +7,7 @@ from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse
 from .models import Visitor
 from .serializers import VisitorSerializer
 from account.models import User
+from event.query_budget import query_budget
 
 # -------------------------
 # Role-based Permission
@@ -62,8 +63,9 @@ class VisitorPagination(PageNumberPagination):
 # -------------------------
 # Visitor ViewSet
 # -------------------------
+@query_budget(queries=3)
 class VisitorViewSet(viewsets.ModelViewSet):
-    queryset = Visitor.objects.all().order_by('-created_at')
+    queryset = Visitor.objects.select_related('resident__person').order_by('-created_at')
     serializer_class = VisitorSerializer
     permission_classes = [IsAuthenticated, IsResidentOrLeader]
     pagination_class = VisitorPagination